@@ -0,0 +1,216 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi.responses import Response, StreamingResponse
+
+from db.generations import PROJECTS, read_generation
+
+# memory | redis | off
+API_CACHE_BACKEND = os.getenv("API_CACHE_BACKEND", "memory")
+API_CACHE_REDIS_URL = os.getenv("API_CACHE_REDIS_URL", "redis://localhost:6379/0")
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+# Total size of the bodies the in-process cache keeps
+API_CACHE_MAX_BYTES = int(os.getenv("API_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Larger responses (e.g. a full-table stream) are served but not stored
+API_CACHE_MAX_ENTRY_BYTES = int(os.getenv("API_CACHE_MAX_ENTRY_BYTES", str(32 * 1024 * 1024)))
+# How long a read of the generation counter is trusted before asking the DB again
+API_CACHE_GENERATION_TTL_SECONDS = float(os.getenv("API_CACHE_GENERATION_TTL_SECONDS", "1"))
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("link", "x-next-after-id")
+
+
+class MemoryBackend:
+    """LRU of cached responses in this process, capped in entries and in body bytes."""
+
+    def __init__(self, max_entries=API_CACHE_MAX_ENTRIES, max_bytes=API_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[0])
+            self._entries[key] = entry
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+class RedisBackend:
+    """Cache shared by several API workers; needs the optional `redis` package."""
+
+    def __init__(self, url=API_CACHE_REDIS_URL, ttl=3600):
+        self.url = url
+        self.ttl = ttl
+        self._client = None
+
+    @property
+    def client(self):
+        # Imported and connected on first use, not while the app is imported.
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def get(self, key):
+        value = self.client.get(f"api-cache:{key}")
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, entry):
+        self.client.set(f"api-cache:{key}", pickle.dumps(entry), ex=self.ttl)
+
+    def clear(self):
+        # Keys carry the generation, so stale entries are never read again;
+        # they expire after `ttl`.
+        pass
+
+
+def make_backend(name=API_CACHE_BACKEND):
+    if name == "off":
+        return None
+    if name == "redis":
+        return RedisBackend()
+    return MemoryBackend()
+
+
+class ResponseCache:
+    """
+    Caches GET responses per data generation (see db.generations).
+
+    Every response gets an ETag derived from the generation and the request,
+    and a Last-Modified of the generation's bump, so a conditional request
+    is answered with 304 without touching the data. A scrape that commits
+    changes bumps the generation, which retires every cached entry.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        generation_name=PROJECTS,
+        generation_ttl=API_CACHE_GENERATION_TTL_SECONDS,
+        max_entry_bytes=API_CACHE_MAX_ENTRY_BYTES,
+    ):
+        self.backend = backend
+        self.generation_name = generation_name
+        self.generation_ttl = generation_ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+        self._generation = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def generation(self):
+        """Current (generation, updated_at), re-read at most every `generation_ttl`."""
+        with self._lock:
+            now = time.monotonic()
+            if self._generation is None or now - self._checked_at >= self.generation_ttl:
+                current = read_generation(self.generation_name)
+                if self._generation and current[0] != self._generation[0] and self.backend:
+                    self.backend.clear()
+                self._generation = current
+                self._checked_at = now
+            return self._generation
+
+    def invalidate(self):
+        with self._lock:
+            self._generation = None
+            if self.backend:
+                self.backend.clear()
+
+    def respond(self, request, build):
+        """Serve `request` from the cache or a 304, else from `build()`."""
+        generation, modified = self.generation()
+        query = "&".join(sorted(str(request.query_params).split("&")))
+        key = f"{generation}:{request.url.path}?{query}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        validators = {"ETag": f'W/"{generation}-{digest}"'}
+        if modified is not None:
+            validators["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+        if self.not_modified(request, validators["ETag"], modified):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=validators)
+
+        entry = self.backend.get(key) if self.backend else None
+        if entry is not None:
+            self.stats["hits"] += 1
+            body, media_type, headers = entry
+            return Response(body, media_type=media_type, headers={**headers, **validators})
+
+        self.stats["misses"] += 1
+        response = build()
+        response.headers.update(validators)
+        if self.backend and response.status_code == 200:
+            headers = {
+                name: response.headers[name]
+                for name in STORED_HEADERS
+                if name in response.headers
+            }
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = self._store_stream(
+                    key, response.body_iterator, response.media_type, headers
+                )
+            elif len(response.body) <= self.max_entry_bytes:
+                self.backend.set(key, (response.body, response.media_type, headers))
+        return response
+
+    async def _store_stream(self, key, chunks, media_type, headers):
+        """Pass a stream through, keeping a copy if it completes within the size cap."""
+        body, size = [], 0
+        async for chunk in chunks:
+            if body is not None:
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                size += len(data)
+                if size <= self.max_entry_bytes:
+                    body.append(data)
+                else:
+                    body = None
+            yield chunk
+        if body is not None:
+            self.backend.set(key, (b"".join(body), media_type, headers))
+
+    @staticmethod
+    def not_modified(request, etag, modified):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates have whole-second precision.
+            return modified.replace(microsecond=0) <= since
+        return False
@@ -0,0 +1,199 @@
+"""
+Bulk exports of whole datasets as Parquet, Arrow IPC stream or CSV.
+
+Rows are read from a server-side cursor in chunks of `EXPORT_CHUNK_SIZE`,
+turned into Arrow record batches and written straight to the response, so
+memory stays bounded by one chunk whatever the table size. Completed
+exports are kept under `EXPORT_SNAPSHOT_DIR` per data generation and
+served from disk until the data changes. Needs the `pyarrow` package.
+"""
+
+import glob
+import os
+import uuid
+from email.utils import format_datetime
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer, Numeric
+
+from api.cache import ResponseCache
+from db.database import SessionLocal
+from db.generations import read_generation
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "50000"))
+# Empty disables snapshots
+EXPORT_SNAPSHOT_DIR = os.getenv("EXPORT_SNAPSHOT_DIR", "data/exports")
+
+FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+    "csv": ("csv", "text/csv"),
+}
+DEFAULT_COMPRESSION = {"parquet": "zstd", "arrow": "zstd", "csv": "none"}
+
+
+class ExportDataset:
+    """
+    A named export: `columns` maps output names to SQLAlchemy columns (whose
+    types give the Arrow schema) and `chunks(session, chunk_size)` yields
+    lists of row tuples or Arrow record batches in that column order.
+    """
+
+    def __init__(self, name, generation, columns, chunks):
+        self.name = name
+        self.generation = generation
+        self.columns = columns
+        self.chunks = chunks
+
+    def schema(self):
+        import pyarrow as pa
+
+        return pa.schema(
+            [(name, arrow_type(column.type)) for name, column in self.columns.items()]
+        )
+
+
+def arrow_type(column_type):
+    import pyarrow as pa
+
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Numeric):
+        if column_type.precision is None:
+            return pa.float64()
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+class ChunkSink:
+    """Write-only file that hands what was written back out in pieces."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def write_export(dataset, format, compression, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the encoded export of `dataset` piece by piece."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    schema = dataset.schema()
+    codec = None if compression == "none" else compression
+    sink = ChunkSink()
+    stream = None
+    if format == "parquet":
+        # One row group per chunk
+        writer = pq.ParquetWriter(sink, schema, compression=compression)
+    elif format == "arrow":
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression=codec))
+    else:
+        stream = pa.CompressedOutputStream(sink, codec) if codec else sink
+        writer = pacsv.CSVWriter(stream, schema)
+
+    session = SessionLocal()
+    try:
+        for chunk in dataset.chunks(session, chunk_size):
+            if isinstance(chunk, pa.RecordBatch):
+                chunk = chunk.cast(schema)
+            elif chunk:
+                arrays = [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(zip(*chunk), schema)
+                ]
+                chunk = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            else:
+                continue
+            writer.write_batch(chunk)
+            data = sink.drain()
+            if data:
+                yield data
+        writer.close()
+        if stream is not None and stream is not sink:
+            stream.close()
+        yield sink.drain()
+    finally:
+        session.close()
+
+
+def save_snapshot(chunks, path, stale):
+    """
+    Pass an export through while writing it to `path`. The file only
+    appears once the export completes; it then replaces the snapshots of
+    older generations (those matching the `stale` glob).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    try:
+        with open(partial, "wb") as f:
+            for data in chunks:
+                f.write(data)
+                yield data
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    for old in glob.glob(stale):
+        if old != path:
+            os.remove(old)
+
+
+def export_response(request, dataset, format, compression=None):
+    """
+    Serve an export of `dataset`: 304 when the client has this generation,
+    the saved snapshot when there is one, else a fresh stream.
+    """
+    compression = compression or DEFAULT_COMPRESSION[format]
+    generation, modified = read_generation(dataset.generation)
+    extension, media_type = FORMATS[format]
+    filename = f"{dataset.name}.{extension}"
+    if format == "csv" and compression != "none":
+        filename, media_type = f"{filename}.zst", "application/zstd"
+    etag = f'W/"{generation}-{dataset.name}-{format}-{compression}"'
+    headers = {"ETag": etag, "Content-Disposition": f'attachment; filename="{filename}"'}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    if ResponseCache.not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+
+    chunks = write_export(dataset, format, compression)
+    if EXPORT_SNAPSHOT_DIR:
+        snapshot = os.path.join(EXPORT_SNAPSHOT_DIR, f"{dataset.name}-{{}}-{compression}-{filename}")
+        path = snapshot.format(generation)
+        if os.path.exists(path):
+            return FileResponse(path, media_type=media_type, headers=headers)
+        chunks = save_snapshot(chunks, path, snapshot.format("*"))
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -1,20 +1,58 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
+from sqlalchemy import outerjoin, select
 from sqlalchemy.orm import Session
 
-from scraper.detail_scraper import scrape_projects  # your existing scraper, updated to accept pages param
-from db.database import SessionLocal
+from api.cache import ResponseCache, make_backend
+from api.export import ExportDataset, export_response
+from db.database import SessionLocal, dispose_engine, get_engine, pool_status
+from db.generations import NAV, PROJECTS
+from db.jobs import cancel_job, enqueue_job, get_job
+from db.migrate import migrate_on_startup
 from db.models import Project as ProjectModel
+from db.models import Promoter as PromoterModel
+from db.models import SchemeNav, SchemeNavLatest
+from db.nav_store import NAV_FIELDS, history_chunks, latest_navs, navs_on, scheme_history
+from telemetry.metrics import CONTENT_TYPE, gauge_lines, histogram, render
+from telemetry.profiling import job_profile_path
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Importing the app never touches the database; the pool is set up here,
+    # once per worker, and closed on shutdown.
+    get_engine()
+    migrate_on_startup()
+    yield
+    dispose_engine()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+response_cache = ResponseCache(make_backend())
+nav_cache = ResponseCache(make_backend(), generation_name=NAV)
+request_seconds = histogram(
+    "api_request_seconds",
+    "API request latency by route, until the response starts.",
+    ("method", "route", "status"),
+)
+
+STREAM_CHUNK_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
 
 
 # Pydantic model for serialization
 class Project(BaseModel):
     project_name: str
     rera_no: str
+    promoter_id: Optional[int] = None
     promoter_address: Optional[str] = None
     promoter_name: Optional[str] = None
     promoter_company_name: Optional[str] = None
@@ -28,6 +66,21 @@ class Project(BaseModel):
     promoter_gst_no: Optional[str] = None
 
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # The route template, not the raw path, keeps the label set small.
+    route = request.scope.get("route")
+    request_seconds.observe(
+        time.perf_counter() - started,
+        request.method,
+        route.path if route else "unmatched",
+        str(response.status_code),
+    )
+    return response
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -36,21 +89,386 @@ def get_db():
         db.close()
 
 
-@app.post("/scrape-projects/")
-async def scrape_projects_endpoint(background_tasks: BackgroundTasks, pages: int = 5):
+def job_status(job):
+    """Progress of a `CrawlJob` as returned by the /jobs endpoints."""
+
+    def utc(value):
+        # SQLite hands back naive datetimes; they were stored as UTC.
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    started_at, finished_at = utc(job.started_at), utc(job.finished_at)
+    processed = job.inserted + job.updated + job.unchanged + job.failed
+    elapsed = None
+    rate = None
+    if started_at:
+        elapsed = ((finished_at or datetime.now(timezone.utc)) - started_at).total_seconds()
+        rate = round(processed / elapsed * 60, 2) if elapsed > 0 else None
+    return {
+        "id": job.id,
+        "source": job.source,
+        "status": job.status,
+        "cancel_requested": job.cancel_requested,
+        "pages": job.pages,
+        "pages_done": job.current_page,
+        "incremental": job.incremental,
+        "queued": job.queued,
+        "inserted": job.inserted,
+        "updated": job.updated,
+        "unchanged": job.unchanged,
+        "failed": job.failed,
+        "projects_per_minute": rate,
+        "elapsed_seconds": elapsed,
+        "worker": job.worker,
+        "attempts": job.attempts,
+        "error": job.error,
+        "profile": f"{job_profile_path(job.id)}.prof" if job.profile else None,
+        "created_at": utc(job.created_at),
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "heartbeat_at": utc(job.heartbeat_at),
+    }
+
+
+@app.post("/scrape-projects/", status_code=202)
+def scrape_projects_endpoint(
+    pages: int = Query(5, ge=1), incremental: bool = False, profile: bool = False
+):
     """
-    Trigger scraping of `pages` number of pages, runs in background.
+    Queue a scrape of `pages` listing pages for the job workers
+    (`python -m scraper.worker`). If a scrape is already queued or running,
+    that job is returned instead of starting another. With `profile`, the
+    worker saves a cProfile dump of the run (see the job's `profile`).
     """
-    background_tasks.add_task(scrape_projects, pages)
-    return {"message": f"Started scraping {pages} pages of projects."}
+    job_id, created = enqueue_job("rera", pages, incremental, profile=profile)
+    if created:
+        message = f"Queued scraping of {pages} pages of projects."
+    else:
+        message = f"Scrape job {job_id} is already queued or running."
+    return {"message": message, "job_id": job_id, "created": created}
 
 
-@app.get("/projects/", response_model=List[Project])
-def get_all_projects():
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: int):
     """
-    Fetch all projects stored in DB.
+    Status and progress of a scrape job: pages done, projects inserted,
+    updated, unchanged and failed, and the processing rate.
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job_endpoint(job_id: int):
+    """
+    Cancel a queued job, or stop a running one after its current page.
+    """
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in ("completed", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job_status(job)
+
+
+# Response field -> column; promoter details live on the promoters table.
+PROJECT_COLUMNS = {
+    "id": ProjectModel.id,
+    "project_name": ProjectModel.project_name,
+    "rera_no": ProjectModel.rera_no,
+    "promoter_id": ProjectModel.promoter_id,
+    "promoter_address": ProjectModel.promoter_address,
+    "promoter_name": PromoterModel.name,
+    "promoter_company_name": PromoterModel.company_name,
+    "promoter_registration_no": PromoterModel.registration_no,
+    "promoter_correspondence_office_address": PromoterModel.correspondence_office_address,
+    "promoter_registered_office_address": PromoterModel.registered_office_address,
+    "promoter_entity": PromoterModel.entity,
+    "promoter_email": PromoterModel.email,
+    "promoter_mobile": PromoterModel.mobile,
+    "promoter_telephone": PromoterModel.telephone,
+    "promoter_gst_no": PromoterModel.gst_no,
+}
+PROJECT_FIELDS = list(PROJECT_COLUMNS)
+
+
+def select_projects():
+    """Projects joined to their promoter; columns are picked per request."""
+    return select(ProjectModel.id).select_from(
+        outerjoin(ProjectModel, PromoterModel, ProjectModel.promoter_id == PromoterModel.id)
+    )
+
+
+def project_fields(fields):
+    """Validate a ?fields=a,b projection; defaults to every `Project` field."""
+    if not fields:
+        return list(Project.model_fields)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(PROJECT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}")
+    return names
+
+
+def dump_json(value):
+    """JSON encoded as JSONResponse does it (compact), so every mode returns the same bytes."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def stream_rows(stmt, names, format):
+    """
+    Encode rows from a server-side cursor as they arrive, in chunks. Uses its
+    own session: the stream outlives the request's `get_db` dependency.
     """
     db = SessionLocal()
-    projects = db.query(ProjectModel).all()
-    db.close()
-    return projects
+    try:
+        result = db.execute(
+            stmt.execution_options(yield_per=STREAM_CHUNK_SIZE)
+        ).mappings()
+        first = True
+        if format == "json":
+            yield "["
+        for partition in result.partitions():
+            lines = [dump_json({name: row[name] for name in names}) for row in partition]
+            if format == "ndjson":
+                yield "\n".join(lines) + "\n"
+            else:
+                yield ("" if first else ",") + ",".join(lines)
+            first = False
+        if format == "json":
+            yield "]"
+    finally:
+        db.close()
+
+
+def project_response(request, db, stmt, fields, after_id, limit, format):
+    """
+    Run a projects query as a keyset page (with `limit`) or a full stream.
+
+    Rows are ordered by id; the next page starts at the `X-Next-After-Id`
+    header (also given as a `Link: rel="next"` URL).
+    """
+    names = project_fields(fields)
+    columns = {"id": ProjectModel.id}
+    columns.update((name, PROJECT_COLUMNS[name]) for name in names)
+    stmt = stmt.with_only_columns(
+        *(column.label(name) for name, column in columns.items())
+    )
+    stmt = stmt.where(ProjectModel.id > after_id).order_by(ProjectModel.id)
+
+    if limit is None:
+        return StreamingResponse(
+            stream_rows(stmt, names, format), media_type=MEDIA_TYPES[format]
+        )
+
+    rows = db.execute(stmt.limit(limit)).mappings().all()
+    items = [{name: row[name] for name in names} for row in rows]
+    headers = {}
+    if len(rows) == limit:
+        next_after_id = rows[-1]["id"]
+        next_url = request.url.include_query_params(after_id=next_after_id)
+        headers = {"X-Next-After-Id": str(next_after_id), "Link": f'<{next_url}>; rel="next"'}
+
+    if format == "ndjson":
+        body = "".join(dump_json(item) + "\n" for item in items)
+        return Response(body, media_type=MEDIA_TYPES["ndjson"], headers=headers)
+    return JSONResponse(items, headers=headers)
+
+
+def contains(value):
+    """ILIKE pattern matching `value` anywhere, with wildcards escaped."""
+    value = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{value}%"
+
+
+@app.get("/projects/", response_model=List[Project])
+def get_all_projects(
+    request: Request,
+    q: Optional[str] = Query(None, description="Substring of the project name"),
+    address: Optional[str] = Query(None, description="Substring of the promoter address, e.g. a district"),
+    promoter_name: Optional[str] = None,
+    promoter_id: Optional[int] = None,
+    promoter_entity: Optional[str] = Query(None, description="Entity type, e.g. Company"),
+    promoter_gst_no: Optional[str] = None,
+    after_id: int = Query(0, ge=0, description="Return projects with id > after_id"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated projection"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch projects stored in DB, ordered by id, optionally filtered.
+
+    Exact filters use the B-tree indexes on the promoter columns; `q` and
+    `address` are case-insensitive substring searches backed by trigram
+    indexes on PostgreSQL. Without `limit` the result is streamed.
+    """
+    stmt = select_projects()
+    if q:
+        stmt = stmt.where(ProjectModel.project_name.ilike(contains(q), escape="\\"))
+    if address:
+        stmt = stmt.where(ProjectModel.promoter_address.ilike(contains(address), escape="\\"))
+    exact = {
+        PromoterModel.name: promoter_name,
+        ProjectModel.promoter_id: promoter_id,
+        PromoterModel.entity: promoter_entity,
+        PromoterModel.gst_no: promoter_gst_no,
+    }
+    for column, value in exact.items():
+        if value is not None:
+            stmt = stmt.where(column == value)
+    return response_cache.respond(
+        request, lambda: project_response(request, db, stmt, fields, after_id, limit, format)
+    )
+
+
+@app.get("/promoters/{promoter_id}/projects", response_model=List[Project])
+def get_promoter_projects(
+    request: Request,
+    promoter_id: int,
+    after_id: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch the projects of one promoter, paged and projected like `/projects/`.
+    """
+
+    def build():
+        if db.get(PromoterModel, promoter_id) is None:
+            raise HTTPException(status_code=404, detail="Promoter not found")
+
+        stmt = select_projects().where(ProjectModel.promoter_id == promoter_id)
+        return project_response(request, db, stmt, fields, after_id, limit, format)
+
+    return response_cache.respond(request, build)
+
+
+def nav_item(row):
+    item = dict(row)
+    item["nav_date"] = item["nav_date"].isoformat()
+    item["nav"] = float(item["nav"])
+    return item
+
+
+@app.get("/nav")
+def get_navs(
+    request: Request,
+    day: Optional[date] = Query(None, alias="date", description="NAV date (YYYY-MM-DD)"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    NAV of every scheme on `date`, or each scheme's latest NAV without it.
+    Archived months are read from their Parquet snapshot.
+    """
+
+    def build():
+        rows = latest_navs(db) if day is None else navs_on(db, day)
+        items = [nav_item(row) for row in rows]
+        if format == "ndjson":
+            body = "".join(dump_json(item) + "\n" for item in items)
+            return Response(body, media_type=MEDIA_TYPES["ndjson"])
+        return JSONResponse(items)
+
+    return nav_cache.respond(request, build)
+
+
+@app.get("/nav/{scheme_code}")
+def get_scheme_navs(
+    request: Request,
+    scheme_code: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    One scheme's details and NAV history between `start` and `end`
+    (inclusive, default all), oldest first.
+    """
+
+    def build():
+        scheme = db.get(SchemeNavLatest, scheme_code)
+        if scheme is None:
+            raise HTTPException(status_code=404, detail="Scheme not found")
+        history = scheme_history(db, scheme_code, start, end)
+        return JSONResponse(
+            {
+                "scheme_code": scheme.scheme_code,
+                "scheme_name": scheme.scheme_name,
+                "fund_house": scheme.fund_house,
+                "category": scheme.category,
+                "isin_growth": scheme.isin_growth,
+                "isin_reinvestment": scheme.isin_reinvestment,
+                "history": [nav_item(row) for row in history],
+            }
+        )
+
+    return nav_cache.respond(request, build)
+
+
+def project_chunks(session, chunk_size):
+    stmt = select_projects().with_only_columns(*PROJECT_COLUMNS.values())
+    result = session.execute(stmt.execution_options(yield_per=chunk_size))
+    yield from result.partitions()
+
+
+def nav_latest_chunks(session, chunk_size):
+    stmt = select(*(SchemeNavLatest.__table__.c[name] for name in NAV_FIELDS))
+    yield from session.execute(stmt.execution_options(yield_per=chunk_size)).partitions()
+
+
+EXPORT_DATASETS = {
+    "projects": ExportDataset("projects", PROJECTS, PROJECT_COLUMNS, project_chunks),
+    "nav": ExportDataset(
+        "nav", NAV, {name: SchemeNav.__table__.c[name] for name in NAV_FIELDS}, history_chunks
+    ),
+    "nav_latest": ExportDataset(
+        "nav_latest",
+        NAV,
+        {name: SchemeNavLatest.__table__.c[name] for name in NAV_FIELDS},
+        nav_latest_chunks,
+    ),
+}
+
+
+@app.get("/export/{dataset}")
+def export_dataset(
+    request: Request,
+    dataset: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow|csv)$"),
+    compression: Optional[str] = Query(None, pattern="^(zstd|none)$"),
+):
+    """
+    Download a whole dataset (`projects`, `nav` history or `nav_latest`) as
+    Parquet, an Arrow IPC stream or CSV. Parquet and Arrow default to zstd
+    compression; CSV with `compression=zstd` is sent as `.csv.zst`.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset {dataset!r}")
+    return export_response(request, EXPORT_DATASETS[dataset], format, compression)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus metrics of this API process: request latency histograms and
+    connection pool gauges. Scraper stage timings are served by the workers,
+    on WORKER_METRICS_PORT (9101).
+    """
+    pool_lines = gauge_lines("db_pool", pool_status(), "Connection pool state")
+    return PlainTextResponse(render(pool_lines), media_type=CONTENT_TYPE)
+
+
+@app.get("/metrics/db-pool")
+def get_db_pool_metrics():
+    """
+    Connection pool state: size, connections checked in/out, overflow in use,
+    and counts of connections opened, checkouts and invalidations.
+    """
+    return pool_status()
@@ -0,0 +1,121 @@
+"""
+How long a fresh API worker takes to come up, against a budget.
+
+    DB_URL=postgresql://... python -m benchmarks.bench_cold_start --runs 5
+
+Each run is a new interpreter that imports `api.main`, runs the app's
+lifespan startup (engine creation) and checks out its first connection,
+i.e. what an autoscaled replica does before it can answer. The median of
+the runs must stay under `API_COLD_START_BUDGET_MS`, and none of the
+scraper stack may have been imported on the way: the run exits non-zero
+otherwise, and lists the slowest imports to look at.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API_COLD_START_BUDGET_MS = float(os.getenv("API_COLD_START_BUDGET_MS", "1500"))
+
+# Modules the read API must start without: scraping runs in scraper.worker.
+FORBIDDEN_MODULES = ("selenium", "bs4", "lxml", "pyarrow", "pandas", "scraper")
+
+STARTUP_SCRIPT = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+
+async def startup():
+    async with api.main.lifespan(api.main.app):
+        from db.database import get_engine
+        with get_engine().connect():
+            pass
+        ready.append(time.perf_counter())
+
+ready = []
+asyncio.run(startup())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready[0] - imported) * 1000,
+    "total_ms": (ready[0] - started) * 1000,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def cold_start(importtime=False):
+    """One fresh-interpreter startup: timings in ms plus the modules it loaded."""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    result = subprocess.run(command + ["-c", STARTUP_SCRIPT], capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"API startup failed:\n{result.stderr.strip()}")
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        run["importtime"] = result.stderr
+    return run
+
+
+def forbidden_imports(modules):
+    return sorted(m for m in modules if m.split(".")[0] in FORBIDDEN_MODULES)
+
+
+def slowest_imports(importtime, top=15):
+    """
+    The imports with the largest cumulative time from -X importtime output,
+    one level down from the top, i.e. what `api.main` itself pulls in.
+    """
+    imports = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth != 1 or not cumulative.strip().isdigit():
+            continue
+        imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def bench_cold_start(runs):
+    """Median timings over `runs` cold starts, and any forbidden modules loaded."""
+    samples = [cold_start() for _ in range(runs)]
+    timings = {
+        key: statistics.median(run[key] for run in samples)
+        for key in ("import_ms", "startup_ms", "total_ms")
+    }
+    return timings, forbidden_imports(samples[0]["modules"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=API_COLD_START_BUDGET_MS)
+    args = parser.parse_args()
+
+    timings, forbidden = bench_cold_start(args.runs)
+    print(
+        f"[📊] Cold start over {args.runs} runs: import {timings['import_ms']:.0f} ms, "
+        f"startup {timings['startup_ms']:.0f} ms, total {timings['total_ms']:.0f} ms "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+    failed = False
+    if forbidden:
+        print(f"[❌] The API imported the scraper stack: {', '.join(forbidden[:10])}")
+        failed = True
+    if timings["total_ms"] > args.budget_ms:
+        print("[❌] Over budget; slowest imports (cumulative ms):")
+        for ms, name in slowest_imports(cold_start(importtime=True)["importtime"]):
+            print(f"    {ms:8.1f}  {name}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("[✅] Within budget")
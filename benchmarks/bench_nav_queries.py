@@ -0,0 +1,115 @@
+"""
+p50/p99 latency of the /nav endpoints against seeded NAV history.
+
+    DB_URL=postgresql://... python -m benchmarks.bench_nav_queries --schemes 14000 --days 1250
+
+Seeds `--days` weekdays of synthetic NAVs (ending today) for `--schemes`
+schemes into an empty `scheme_nav`, archives the months older than
+`NAV_HOT_MONTHS` to Parquet, then times the latest-NAV, by-date and
+per-scheme history queries through the FastAPI app. Point it at a scratch
+database and NAV_ARCHIVE_DIR; the seeded rows are left in place for re-runs.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from api.main import app, nav_cache
+from db.database import SessionLocal, engine
+from db.migrate import upgrade
+from db.models import NavArchive, SchemeNav
+from db.nav_store import add_months, archive_old_months, ensure_partitions, month_start, refresh_latest
+from benchmarks.bench_project_queries import bench, percentile
+
+SEED_CHUNK_SIZE = 20000
+FIRST_SCHEME = 100000
+
+
+def weekdays(count, last=None):
+    days = []
+    day = last or date.today()
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return sorted(days)
+
+
+def seed(schemes, days):
+    upgrade()
+    session = SessionLocal()
+    try:
+        seeded = session.execute(select(func.count()).select_from(SchemeNav)).scalar()
+        seeded += session.execute(select(func.coalesce(func.sum(NavArchive.rows), 0))).scalar()
+        if seeded:
+            return
+        dates = weekdays(days)
+        ensure_partitions(session, dates[0], dates[-1])
+        rng = random.Random(schemes)
+        started = time.monotonic()
+        chunk = []
+        for code in range(FIRST_SCHEME, FIRST_SCHEME + schemes):
+            nav = rng.uniform(10, 500)
+            for day in dates:
+                nav *= 1 + rng.gauss(0.0003, 0.01)
+                chunk.append(
+                    {
+                        "scheme_code": code,
+                        "nav_date": day,
+                        "scheme_name": f"Bench Fund {code} - Direct - Growth",
+                        "nav": Decimal(f"{nav:.4f}"),
+                        "isin_growth": f"INFBENCH{code:06d}",
+                        "fund_house": f"Bench AMC {code % 40}",
+                        "category": "Open Ended Schemes(Equity Scheme - Large Cap Fund)",
+                    }
+                )
+                if len(chunk) >= SEED_CHUNK_SIZE:
+                    session.execute(insert(SchemeNav), chunk)
+                    chunk = []
+        if chunk:
+            session.execute(insert(SchemeNav), chunk)
+        refresh_latest(session, dates[0], dates[-1])
+        session.commit()
+        print(f"[🌱] Seeded {schemes * days} NAVs in {time.monotonic() - started:.1f}s")
+    finally:
+        session.close()
+    archive_old_months()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schemes", type=int, default=14000)
+    parser.add_argument("--days", type=int, default=260)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    seed(args.schemes, args.days)
+    recent = weekdays(3)[0]
+    archived = weekdays(1, add_months(month_start(date.today()), -6))[0]
+    scheme = FIRST_SCHEME + args.schemes // 2
+    five_years_ago = date.today() - timedelta(days=5 * 365)
+    queries = {
+        "latest (all schemes)": "/nav",
+        "by date (hot)": f"/nav?date={recent}",
+        "by date (archived)": f"/nav?date={archived}",
+        "scheme, 5 years": f"/nav/{scheme}?start={five_years_ago}",
+        "scheme, last month": f"/nav/{scheme}?start={date.today() - timedelta(days=31)}",
+    }
+
+    # Time the queries, not the response cache.
+    nav_cache.backend = None
+    client = TestClient(app)
+    print(f"[📊] {args.repeat} requests per query on {engine.dialect.name}")
+    print(f"{'query':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, path in queries.items():
+        samples = bench(client, path, args.repeat)
+        print(
+            f"{name:<22}{percentile(samples, 50):>10.2f}"
+            f"{percentile(samples, 99):>10.2f}{statistics.mean(samples):>10.2f}"
+        )
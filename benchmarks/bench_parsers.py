@@ -0,0 +1,121 @@
+"""
+Listing and promoter parsing: the old BeautifulSoup path against lxml.
+
+    python -m benchmarks.bench_parsers --page-kb 300 --cards 9
+
+Builds pages from the fixtures in scraper/fixtures: the listing repeated to
+`--cards` cards, and both pages padded with `--page-kb` of navigation,
+inline scripts and footer like a browser's page_source. Times the old
+parse of the whole page (BeautifulSoup html.parser, one label search per
+promoter field), the lxml parsers on the whole page, and the lxml parsers
+on the subtree the scraper now pulls from the browser.
+"""
+
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scraper.parsers import PROMOTER_FIELDS, parse_listing_html, parse_promoter_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "scraper" / "fixtures"
+CARD_PATTERN = re.compile(r'<div class="card project-card mb-3">.*?View Details</a>\s*</div>\s*</div>', re.S)
+SECTION_PATTERN = re.compile(r'<div class="card-body">.*?</div>\s*</div>\s*</div>', re.S)
+
+
+def legacy_listing(html):
+    soup = BeautifulSoup(html, "html.parser")
+    projects = []
+    for card in soup.find_all("div", class_="card project-card mb-3"):
+        projects.append(
+            {
+                "project_name": card.find("h5", class_="card-title").get_text(strip=True),
+                "promoter_name": card.find("small").get_text(strip=True).replace("by ", ""),
+                "address": card.find("label", string="Address").find_next("strong").get_text(strip=True),
+                "rera_no": card.find("span", class_="fw-bold").get_text(strip=True),
+            }
+        )
+    return projects
+
+
+def legacy_promoter(html):
+    section = BeautifulSoup(html, "html.parser").find("div", class_="card-body")
+    details = {}
+    for key, label_name in PROMOTER_FIELDS.items():
+        label = section.find("label", string=label_name)
+        strong = label.find_next("strong") if label else None
+        details[key] = strong.get_text(strip=True) if strong else None
+    return details
+
+
+def padding(kb):
+    """Page chrome of roughly `kb` KiB: menus, inline script and a footer."""
+    menu = "".join(
+        f'<li class="nav-item"><a class="nav-link" href="/menu/{i}">Menu item {i}</a></li>'
+        for i in range(40)
+    )
+    block = (
+        f'<nav class="navbar"><ul class="navbar-nav">{menu}</ul></nav>'
+        '<script>window.dataLayer = window.dataLayer || [];'
+        + "function gtag(){dataLayer.push(arguments);}" * 20
+        + "</script>"
+        '<footer class="footer"><div class="row">'
+        + '<div class="col"><p>Odisha Real Estate Regulatory Authority</p></div>' * 20
+        + "</div></footer>"
+    )
+    return block * max(1, kb * 1024 // len(block))
+
+
+def build_pages(page_kb, cards):
+    listing = (FIXTURES / "rera_project_list.html").read_text()
+    details = (FIXTURES / "rera_project_details.html").read_text()
+    card_html = CARD_PATTERN.findall(listing)
+    all_cards = "".join(card_html[i % len(card_html)] for i in range(cards))
+    chrome = padding(page_kb // 2)  # before and after the content
+    listing_page = f"<html><body>{chrome}<div class='container'>{all_cards}</div>{chrome}</body></html>"
+    section = SECTION_PATTERN.search(details).group(0)
+    details_page = details.replace("<body>", f"<body>{chrome}", 1).replace("</body>", f"{chrome}</body>")
+    return listing_page, all_cards, details_page, section
+
+
+def bench(parse, html, repeat):
+    parse(html)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-kb", type=int, default=300)
+    parser.add_argument("--cards", type=int, default=9)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    listing_page, cards_html, details_page, section_html = build_pages(args.page_kb, args.cards)
+    assert [p["rera_no"] for p in parse_listing_html(listing_page)] == [
+        p["rera_no"] for p in legacy_listing(listing_page)
+    ]
+    assert parse_promoter_html(section_html) == legacy_promoter(details_page)
+
+    cases = [
+        ("listing", "bs4, whole page", legacy_listing, listing_page),
+        ("listing", "lxml, whole page", parse_listing_html, listing_page),
+        ("listing", "lxml, cards only", parse_listing_html, cards_html),
+        ("promoter", "bs4, whole page", legacy_promoter, details_page),
+        ("promoter", "lxml, whole page", parse_promoter_html, details_page),
+        ("promoter", "lxml, section only", parse_promoter_html, section_html),
+    ]
+    print(f"[📊] median of {args.repeat} parses, pages of ~{len(listing_page) // 1024} KiB")
+    print(f"{'page':<10}{'parser':<22}{'KiB':>8}{'ms':>10}{'speed-up':>10}")
+    baseline = {}
+    for page, name, parse, html in cases:
+        ms = bench(parse, html, args.repeat)
+        baseline.setdefault(page, ms)
+        print(f"{page:<10}{name:<22}{len(html) / 1024:>8.1f}{ms:>10.3f}{baseline[page] / ms:>9.1f}x")
@@ -0,0 +1,124 @@
+"""
+p50/p99 latency of the /projects/ filters against a seeded table.
+
+    DB_URL=postgresql://... python -m benchmarks.bench_project_queries --rows 100000
+
+Seeds synthetic projects (rera_no prefixed BENCH-) until the table holds
+`--rows` of them, then times each query through the FastAPI app. Point it
+at a scratch database: the seeded rows are left in place for re-runs.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, text
+
+from api.main import app
+from db.database import SessionLocal, engine
+from db.migrate import upgrade
+from db.models import Project, Promoter
+
+DISTRICTS = ["Khurda", "Cuttack", "Puri", "Ganjam", "Sambalpur", "Balasore"]
+ENTITIES = ["Company", "Partnership", "Individual", "LLP"]
+WORDS = ["Green", "Royal", "Sai", "Jagannath", "Lake", "Heights", "Enclave", "City"]
+SEED_CHUNK_SIZE = 5000
+
+
+def seed(rows, promoters):
+    upgrade()
+    session = SessionLocal()
+    try:
+        prefix = Project.rera_no.like("BENCH-%")
+        existing = session.execute(select(func.count()).where(prefix)).scalar()
+        if existing >= rows:
+            return
+        known = {p.id for p in session.execute(select(Promoter)).scalars()}
+        missing = [
+            {
+                "id": i,
+                "name": f"Bench Promoter {i}",
+                "name_key": f"bench promoter {i}",
+                "entity": ENTITIES[i % len(ENTITIES)],
+                "gst_no": f"21BENCH{i:06d}Z",
+            }
+            for i in range(1, promoters + 1)
+            if i not in known
+        ]
+        if missing:
+            session.execute(insert(Promoter), missing)
+            if engine.dialect.name == "postgresql":
+                # Explicit ids leave the sequence behind; scraper inserts come later.
+                session.execute(
+                    text(
+                        "SELECT setval(pg_get_serial_sequence('promoters', 'id'), "
+                        "(SELECT max(id) FROM promoters))"
+                    )
+                )
+
+        rng = random.Random(existing)
+        started = time.monotonic()
+        for start in range(existing, rows, SEED_CHUNK_SIZE):
+            chunk = []
+            for n in range(start, min(rows, start + SEED_CHUNK_SIZE)):
+                chunk.append(
+                    {
+                        "project_name": " ".join(rng.sample(WORDS, 3)) + f" {n}",
+                        "rera_no": f"BENCH-{n:08d}",
+                        "promoter_id": rng.randint(1, promoters),
+                        "promoter_address": f"Plot {n}, {rng.choice(DISTRICTS)}, Odisha",
+                    }
+                )
+            session.execute(insert(Project), chunk)
+            session.commit()
+        print(f"[🌱] Seeded {rows - existing} projects in {time.monotonic() - started:.1f}s")
+    finally:
+        session.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def bench(client, path, repeat):
+    client.get(path)  # warm up caches and the connection
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--promoters", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    seed(args.rows, args.promoters)
+    queries = {
+        "page (limit=100)": "/projects/?limit=100",
+        "deep keyset page": f"/projects/?limit=100&after_id={args.rows // 2}",
+        "promoter_name": "/projects/?limit=100&promoter_name=Bench Promoter 42",
+        "promoter_gst_no": "/projects/?limit=100&promoter_gst_no=21BENCH000042Z",
+        "promoter_entity": "/projects/?limit=100&promoter_entity=LLP",
+        "q (project name)": "/projects/?limit=100&q=lake heights",
+        "address (district)": "/projects/?limit=100&address=sambalpur",
+        "promoter projects": "/promoters/42/projects?limit=100",
+    }
+
+    client = TestClient(app)
+    print(f"[📊] {args.repeat} requests per query on {engine.dialect.name}")
+    print(f"{'query':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, path in queries.items():
+        samples = bench(client, path, args.repeat)
+        print(
+            f"{name:<22}{percentile(samples, 50):>10.2f}"
+            f"{percentile(samples, 99):>10.2f}{statistics.mean(samples):>10.2f}"
+        )
@@ -0,0 +1,277 @@
+"""
+End-to-end throughput and latency, saved as JSON to compare between commits.
+
+    DB_URL=postgresql://... python -m benchmarks.bench_suite --projects 10000
+    DB_URL=postgresql://... python -m benchmarks.bench_suite --compare data/benchmarks/<commit>.json
+
+Starts the stub server with `--projects` synthetic RERA projects and
+`--nav-schemes` NAV schemes, then measures:
+
+* scrape: a full HTTP-mode crawl of the synthetic listing (pages/s,
+  projects/s), promoter lookups included;
+* db: BatchWriter upserts of synthetic projects and a NAV ingest (rows/s);
+* api: `/projects/` p50/p99 at each of `--sizes` rows in the table;
+* cold_start: a fresh API worker's import and startup time (see
+  benchmarks.bench_cold_start).
+
+Results go to `--output` (default data/benchmarks/<commit>.json). With
+`--compare`, every metric is checked against an earlier results file and
+the run exits non-zero if one got worse by more than `--threshold`. Point
+it at a scratch database: synthetic rows are deleted after each stage, but
+the api stage's seeded projects are left in place for re-runs.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from scraper.stub_server import serve_fixtures, synthetic_nav_lines, synthetic_project
+
+API_QUERIES = {
+    "page": "/projects/?limit=100",
+    "deep_page": "/projects/?limit=100&after_id={middle}",
+    "promoter_name": "/projects/?limit=100&promoter_name=Bench Promoter 42",
+    "q": "/projects/?limit=100&q=lake heights",
+}
+HIGHER, LOWER = "higher", "lower"
+
+
+def metric(value, unit, better):
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Swallow the per-row progress lines the scraper prints."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def delete_synthetic_projects():
+    """Delete the synthetic projects and promoters; returns how many projects there were."""
+    from sqlalchemy import delete
+
+    from db.database import SessionLocal
+    from db.models import Project, Promoter
+
+    session = SessionLocal()
+    try:
+        deleted = session.execute(delete(Project).where(Project.rera_no.like("RP/SYN/%"))).rowcount
+        session.execute(delete(Promoter).where(Promoter.name.like("SYNTHETIC PROMOTER %")))
+        session.commit()
+    finally:
+        session.close()
+    return deleted
+
+
+def bench_scrape(base_url, projects, page_size, workers, verbose):
+    # The fetcher reads these when scraper.http_fetch is first imported.
+    os.environ["RERA_LISTING_URL"] = f"{base_url}/api/projects"
+    os.environ["RERA_PROMOTER_URL"] = f"{base_url}/api/promoter?rera_no={{rera_no}}"
+    from scraper.detail_scraper import scrape_projects
+
+    pages = -(-projects // page_size)
+    delete_synthetic_projects()
+    started = time.perf_counter()
+    with quiet(not verbose):
+        scrape_projects(pages=pages, workers=workers, fetch_mode="http")
+    elapsed = time.perf_counter() - started
+    scraped = delete_synthetic_projects()
+    print(f"[📊] scrape: {pages} pages, {scraped} projects in {elapsed:.1f}s")
+    if scraped != projects:
+        print(f"[⚠️] Expected {projects} projects, the crawl saved {scraped}")
+    return {
+        "scrape.pages_per_sec": metric(pages / elapsed, "pages/s", HIGHER),
+        "scrape.projects_per_sec": metric(scraped / elapsed, "projects/s", HIGHER),
+    }
+
+
+def bench_db(rows, nav_schemes, verbose):
+    from sqlalchemy import delete
+
+    from db.database import SessionLocal
+    from db.models import SchemeNav, SchemeNavLatest
+    from db.writer import project_writer
+    from scraper.nav_ingest import ingest_nav_lines
+    from scraper.stub_server import SYNTHETIC_SCHEME_CODE
+
+    delete_synthetic_projects()
+    writer = project_writer()
+    batch = []
+    for n in range(rows):
+        project = synthetic_project(n)
+        batch.append(
+            {
+                "rera_no": project["rera_no"],
+                "project_name": project["project_name"],
+                "promoter_address": project["address"],
+            }
+        )
+    started = time.perf_counter()
+    with quiet(not verbose):
+        writer.write(batch)
+    write_elapsed = time.perf_counter() - started
+    delete_synthetic_projects()
+
+    lines = list(synthetic_nav_lines(nav_schemes))
+    started = time.perf_counter()
+    with quiet(not verbose):
+        ingest_nav_lines(lines)
+    nav_elapsed = time.perf_counter() - started
+    session = SessionLocal()
+    try:
+        for model in (SchemeNav, SchemeNavLatest):
+            session.execute(delete(model).where(model.scheme_code >= SYNTHETIC_SCHEME_CODE))
+        session.commit()
+    finally:
+        session.close()
+    print(f"[📊] db: {rows} project upserts in {write_elapsed:.2f}s, {nav_schemes} NAVs in {nav_elapsed:.2f}s")
+    return {
+        "db.project_rows_per_sec": metric(rows / write_elapsed, "rows/s", HIGHER),
+        "db.nav_rows_per_sec": metric(nav_schemes / nav_elapsed, "rows/s", HIGHER),
+    }
+
+
+def bench_api(sizes, repeat):
+    from fastapi.testclient import TestClient
+
+    from api.main import app, response_cache
+    from benchmarks.bench_project_queries import bench, percentile, seed
+
+    # Time the queries, not the response cache.
+    response_cache.backend = None
+    client = TestClient(app)
+    results = {}
+    for size in sorted(sizes):
+        with quiet():
+            seed(size, max(10, size // 50))
+        for name, path in API_QUERIES.items():
+            samples = bench(client, path.format(middle=size // 2), repeat)
+            for pct in (50, 99):
+                results[f"api.projects.{size}.{name}.p{pct}_ms"] = metric(
+                    percentile(samples, pct), "ms", LOWER
+                )
+        page = results[f"api.projects.{size}.page.p50_ms"]["value"]
+        print(f"[📊] api: {size} rows, /projects/?limit=100 p50 {page:.2f} ms")
+    return results
+
+
+def bench_startup(runs):
+    from benchmarks.bench_cold_start import bench_cold_start
+
+    timings, forbidden = bench_cold_start(runs)
+    if forbidden:
+        print(f"[⚠️] The API imported the scraper stack: {', '.join(forbidden[:10])}")
+    print(f"[📊] cold_start: {timings['total_ms']:.0f} ms to the first connection")
+    return {f"cold_start.{key}": metric(value, "ms", LOWER) for key, value in timings.items()}
+
+
+def compare(results, baseline, threshold):
+    """Print each metric against `baseline`; returns the names that regressed."""
+    regressions = []
+    print(f"{'metric':<46}{'before':>12}{'after':>12}{'change':>10}")
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if not previous or not previous["value"]:
+            print(f"{name:<46}{'-':>12}{current['value']:>12.2f}{'new':>10}")
+            continue
+        change = current["value"] / previous["value"] - 1
+        worse = -change if current["better"] == HIGHER else change
+        flag = ""
+        if worse > threshold:
+            flag = " ❌"
+            regressions.append(name)
+        print(
+            f"{name:<46}{previous['value']:>12.2f}{current['value']:>12.2f}{change:>+10.1%}{flag}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--projects", type=int, default=10000, help="synthetic projects to crawl")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--nav-schemes", type=int, default=20000)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="table sizes for the api stage")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--cold-starts", type=int, default=5, help="runs for the cold_start stage")
+    parser.add_argument("--only", choices=("scrape", "db", "api", "cold_start"), action="append")
+    parser.add_argument("--output", help="results file (default data/benchmarks/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to check against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    parser.add_argument("--verbose", action="store_true", help="keep the scraper's output")
+    args = parser.parse_args()
+
+    from db.database import engine
+    from db.migrate import upgrade
+
+    upgrade()
+    stages = args.only or ["scrape", "db", "api", "cold_start"]
+    server, base_url = serve_fixtures(projects=args.projects, page_size=args.page_size)
+    results = {}
+    try:
+        if "scrape" in stages:
+            results.update(bench_scrape(base_url, args.projects, args.page_size, args.workers, args.verbose))
+        if "db" in stages:
+            results.update(bench_db(args.projects, args.nav_schemes, args.verbose))
+        if "api" in stages:
+            sizes = [int(size) for size in args.sizes.split(",") if size]
+            results.update(bench_api(sizes, args.repeat))
+        if "cold_start" in stages:
+            results.update(bench_startup(args.cold_starts))
+    finally:
+        server.shutdown()
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "dialect": engine.dialect.name,
+        "python": platform.python_version(),
+        "args": vars(args),
+        "results": results,
+    }
+    output = args.output or os.path.join("data", "benchmarks", f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[💾] Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"[📊] Against {baseline.get('commit')} ({baseline.get('dialect')}):")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"[❌] {len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("[✅] No regressions")
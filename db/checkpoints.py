@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from db.database import SessionLocal
+from db.models import CrawlCheckpoint
+
+
+def start_checkpoint(source, session_factory=SessionLocal):
+    """Mark a crawl of `source` as started; returns the previous completion time."""
+    session = session_factory()
+    try:
+        checkpoint = session.get(CrawlCheckpoint, source)
+        if checkpoint is None:
+            checkpoint = CrawlCheckpoint(source=source)
+            session.add(checkpoint)
+        previous = checkpoint.completed_at
+        checkpoint.started_at = datetime.now(timezone.utc)
+        session.commit()
+        return previous
+    finally:
+        session.close()
+
+
+def finish_checkpoint(source, session_factory=SessionLocal, **counters):
+    """Record a completed crawl of `source` with its page/refresh counters."""
+    session = session_factory()
+    try:
+        checkpoint = session.get(CrawlCheckpoint, source)
+        if checkpoint is None:
+            checkpoint = CrawlCheckpoint(source=source)
+            session.add(checkpoint)
+        checkpoint.completed_at = datetime.now(timezone.utc)
+        for name, value in counters.items():
+            setattr(checkpoint, name, value)
+        session.commit()
+    finally:
+        session.close()
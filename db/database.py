@@ -1,23 +1,130 @@
 import os
+import threading
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from db.models import Base
 
 load_dotenv()
 DB_URL = os.getenv("DB_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 = none
 
-engine = create_engine(DB_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url=DB_URL):
+    """create_engine() keyword arguments for the configured pool and timeouts."""
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and ":memory:" in url:
+        return options  # single-connection pool, nothing to size
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if url.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class LazySessionmaker(sessionmaker):
+    """A sessionmaker that creates the engine the first time a session is made."""
+
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionmaker(autocommit=False, autoflush=False)
+
+
+_pool_events = {"connects": 0, "checkouts": 0, "invalidated": 0}
+
+
+def _count_connect(*args):
+    _pool_events["connects"] += 1
+
+
+def _count_checkout(*args):
+    _pool_events["checkouts"] += 1
+
+
+def _count_invalidate(*args):
+    _pool_events["invalidated"] += 1
+
+
+def get_engine():
+    """
+    The process's engine, created on first use rather than at import, so
+    importing db (and the API) stays cheap and needs no database. The API
+    creates it in its lifespan; scripts and workers on their first session.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if not DB_URL:
+                    raise RuntimeError("DB_URL is not set")
+                engine = create_engine(DB_URL, **engine_options())
+                event.listen(engine, "connect", _count_connect)
+                event.listen(engine, "checkout", _count_checkout)
+                event.listen(engine, "invalidate", _count_invalidate)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def dispose_engine():
+    """Close the pool's connections; the next session creates a fresh engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+def __getattr__(name):
+    # `from db.database import engine` keeps working, creating it on demand.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def pool_status():
+    """Connection pool gauges and counters, e.g. for the API's /metrics/db-pool."""
+    pool = get_engine().pool
+    status = {"pool": type(pool).__name__, **_pool_events}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout=pool.timeout(),
+        )
+    return status
 
 
 def init():
-    Base.metadata.drop_all(engine)  # Optional: clear existing tables for fresh start
-    Base.metadata.create_all(engine)
-    print("[✅] Tables created")
+    """Bring the schema up to date; existing rows are kept (see db.migrate)."""
+    from db.migrate import upgrade
+
+    upgrade()
+    print("[✅] Tables up to date")
 
 
 if __name__ == "__main__":
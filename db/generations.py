@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from db.database import SessionLocal
+from db.models import DataGeneration
+
+# Bumped whenever projects or promoters visible through the API change
+PROJECTS = "projects"
+# Bumped whenever the NAV ingest changes scheme_nav
+NAV = "nav"
+
+
+def bump_generation(session, name=PROJECTS):
+    """
+    Increment `name`'s generation inside the caller's transaction, so readers
+    (e.g. the API response cache) see the bump exactly when the data commits.
+    """
+    # Imported here: db.writer bumps generations itself.
+    from db.writer import DIALECT_INSERTS
+
+    now = datetime.now(timezone.utc)
+    insert = DIALECT_INSERTS[session.get_bind().dialect.name]
+    # One statement, so two writers making the first bump cannot both insert.
+    stmt = insert(DataGeneration).values(name=name, generation=1, updated_at=now)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"generation": DataGeneration.generation + 1, "updated_at": now},
+        )
+    )
+
+
+def read_generation(name=PROJECTS, session_factory=SessionLocal):
+    """(generation, updated_at) of `name`; (0, None) before the first bump."""
+    session = session_factory()
+    try:
+        row = session.get(DataGeneration, name)
+        if row is None:
+            return 0, None
+        updated_at = row.updated_at
+        if updated_at is not None and updated_at.tzinfo is None:
+            # SQLite hands back naive datetimes; they were stored as UTC.
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return row.generation, updated_at
+    finally:
+        session.close()
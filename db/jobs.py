@@ -0,0 +1,336 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from db.database import SessionLocal
+from db.models import CrawlJob
+
+ACTIVE_STATUSES = ("queued", "running")
+RESUMABLE_STATUSES = ("failed",)
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+COUNTERS = ("queued", "failed", "inserted", "updated", "unchanged")
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+# A running job whose heartbeat is older than this is taken to have crashed
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+# Crashed jobs go back on the queue until they have been claimed this often
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+
+class DuplicateJob(Exception):
+    """`source` already has a queued or running job."""
+
+    def __init__(self, job_id):
+        super().__init__(f"Job {job_id} is already queued or running")
+        self.job_id = job_id
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def active_job(source, session_factory=SessionLocal):
+    session = session_factory()
+    try:
+        return session.execute(
+            select(CrawlJob).where(
+                CrawlJob.source == source, CrawlJob.status.in_(ACTIVE_STATUSES)
+            )
+        ).scalar_one_or_none()
+    finally:
+        session.close()
+
+
+def reap_stale_jobs(session_factory=SessionLocal, max_attempts=JOB_MAX_ATTEMPTS):
+    """
+    Handle running jobs whose worker stopped heartbeating: re-queue those
+    with pages left that have been claimed fewer than `max_attempts` times
+    (a worker resumes them after their checkpoint), and mark the rest as
+    failed (resumable by hand).
+    """
+    cutoff = _now() - timedelta(seconds=JOB_STALE_SECONDS)
+    stale = (CrawlJob.status == "running", CrawlJob.heartbeat_at < cutoff)
+    session = session_factory()
+    try:
+        requeued = session.execute(
+            update(CrawlJob)
+            .where(
+                *stale,
+                CrawlJob.current_page < CrawlJob.pages,
+                CrawlJob.attempts < max_attempts,
+                CrawlJob.cancel_requested.is_(False),
+            )
+            .values(status="queued", worker=None, error="Worker stopped heartbeating; re-queued")
+        ).rowcount
+        failed = session.execute(
+            update(CrawlJob)
+            .where(*stale)
+            .values(status="failed", error="Worker stopped heartbeating", finished_at=_now())
+        ).rowcount
+        session.commit()
+        if requeued:
+            print(f"[🧟] Re-queued {requeued} stale jobs")
+        if failed:
+            print(f"[🧟] Marked {failed} stale jobs as failed")
+        return requeued + failed
+    finally:
+        session.close()
+
+
+def create_job(
+    source,
+    pages,
+    incremental=False,
+    status="running",
+    session_factory=SessionLocal,
+    profile=False,
+):
+    """
+    Insert a job and return its id. Raises DuplicateJob if `source` already
+    has a queued or running job (enforced by a partial unique index). With
+    `profile`, the worker saves a cProfile dump of the run.
+    """
+    reap_stale_jobs(session_factory)
+    session = session_factory()
+    try:
+        job = CrawlJob(
+            source=source,
+            pages=pages,
+            incremental=incremental,
+            profile=profile,
+            status=status,
+            started_at=_now() if status == "running" else None,
+            attempts=1 if status == "running" else 0,
+            heartbeat_at=_now(),
+        )
+        session.add(job)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            existing = active_job(source, session_factory)
+            if existing is None:
+                raise
+            raise DuplicateJob(existing.id)
+        return job.id
+    finally:
+        session.close()
+
+
+def enqueue_job(source, pages, incremental=False, session_factory=SessionLocal, profile=False):
+    """Queue a job for the workers; returns (job_id, created)."""
+    try:
+        return create_job(source, pages, incremental, "queued", session_factory, profile), True
+    except DuplicateJob as e:
+        return e.job_id, False
+
+
+def claim_job(worker=None, session_factory=SessionLocal):
+    """
+    Take the oldest queued job for this worker, or None. Concurrent workers
+    skip each other's locked rows (FOR UPDATE SKIP LOCKED on PostgreSQL).
+    """
+    reap_stale_jobs(session_factory)
+    session = session_factory()
+    try:
+        job = session.execute(
+            select(CrawlJob)
+            .where(CrawlJob.status == "queued")
+            .order_by(CrawlJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if job is None:
+            session.rollback()
+            return None
+        job.status = "running"
+        job.worker = worker or worker_name()
+        job.attempts += 1
+        job.started_at = job.heartbeat_at = _now()
+        session.commit()
+        return job.id
+    finally:
+        session.close()
+
+
+def cancel_job(job_id, session_factory=SessionLocal):
+    """
+    Cancel a queued job outright, or ask a running one to stop after the
+    page in progress. Returns the job, or None if it does not exist.
+    """
+    session = session_factory()
+    try:
+        job = session.get(CrawlJob, job_id, with_for_update=True)
+        if job is not None and job.status in ACTIVE_STATUSES:
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished_at = _now()
+            job.cancel_requested = True
+            session.commit()
+            session.refresh(job)
+        return job
+    finally:
+        session.close()
+
+
+def heartbeat(job_id, session_factory=SessionLocal):
+    """Record that the job is alive; returns True if it was asked to cancel."""
+    session = session_factory()
+    try:
+        job = session.get(CrawlJob, job_id)
+        job.heartbeat_at = _now()
+        session.commit()
+        return job.cancel_requested
+    finally:
+        session.close()
+
+
+def get_job(job_id, session_factory=SessionLocal):
+    session = session_factory()
+    try:
+        return session.get(CrawlJob, job_id)
+    finally:
+        session.close()
+
+
+def find_resumable_job(source, session_factory=SessionLocal):
+    """The most recent job for `source` that crashed or never finished."""
+    reap_stale_jobs(session_factory)
+    session = session_factory()
+    try:
+        return session.execute(
+            select(CrawlJob)
+            .where(
+                CrawlJob.source == source,
+                CrawlJob.status.in_(RESUMABLE_STATUSES),
+            )
+            .order_by(CrawlJob.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+    finally:
+        session.close()
+
+
+def update_job(job_id, session_factory=SessionLocal, **fields):
+    """
+    Set `fields` on a job. Raises DuplicateJob when making it active would
+    make a second active job for its source.
+    """
+    if fields.get("status") in FINISHED_STATUSES:
+        fields.setdefault("finished_at", _now())
+    session = session_factory()
+    try:
+        job = session.get(CrawlJob, job_id)
+        for name, value in fields.items():
+            setattr(job, name, value)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            existing = None
+            if fields.get("status") in ACTIVE_STATUSES:
+                existing = active_job(job.source, session_factory)
+            if existing is None:
+                raise
+            raise DuplicateJob(existing.id)
+    finally:
+        session.close()
+
+
+class JobHeartbeat:
+    """
+    Background thread that keeps a running job's heartbeat fresh and sets
+    `cancelled` once the job is asked to stop (see cancel_job).
+    """
+
+    def __init__(self, job_id, interval=JOB_HEARTBEAT_SECONDS):
+        self.job_id = job_id
+        self.interval = interval
+        self.cancelled = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                if heartbeat(self.job_id):
+                    self.cancelled.set()
+            except Exception as e:
+                print(f"[⚠️] Heartbeat for job {self.job_id} failed: {e}")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+class JobProgress:
+    """
+    Tracks which listing pages of a job are fully done (listed, every queued
+    project scraped or given up on, rows flushed) and checkpoints the last
+    contiguous one, so a resumed job starts right after it.
+    """
+
+    def __init__(self, job_id, start_page, writer, job=None):
+        self.job_id = job_id
+        self.writer = writer
+        # Counters from earlier attempts of a resumed job
+        self._base = {name: getattr(job, name) or 0 if job else 0 for name in COUNTERS}
+        self.completed_page = start_page - 1
+        self.queued = 0
+        self.failed = 0
+        self._outstanding = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def project_queued(self, page):
+        with self._lock:
+            self._outstanding[page] = self._outstanding.get(page, 0) + 1
+            self.queued += 1
+
+    def page_listed(self, page, cursor):
+        with self._lock:
+            self._outstanding.setdefault(page, 0)
+            self._cursors[page] = cursor
+            self._advance()
+
+    def project_done(self, page, failed=False):
+        with self._lock:
+            self._outstanding[page] -= 1
+            if failed:
+                self.failed += 1
+            self._advance()
+
+    def _advance(self):
+        page = self.completed_page
+        cursor = None
+        while self._outstanding.get(page + 1) == 0 and page + 1 in self._cursors:
+            page += 1
+            del self._outstanding[page]
+            cursor = self._cursors.pop(page)
+        if page == self.completed_page:
+            return
+
+        # Rows must be durable before the checkpoint says the page is done.
+        self.writer.flush()
+        self.completed_page = page
+        self.save(current_page=page, cursor=cursor)
+        print(f"[📌] Job {self.job_id}: pages 1-{page} done")
+
+    def save(self, **fields):
+        counters = {"queued": self.queued, "failed": self.failed, **self.writer.totals}
+        update_job(
+            self.job_id,
+            **{name: self._base[name] + counters[name] for name in COUNTERS},
+            **fields,
+        )
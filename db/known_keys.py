@@ -0,0 +1,143 @@
+import hashlib
+import math
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from db.database import SessionLocal
+from db.models import Project
+
+# Above this many rows the keys go into a Bloom filter instead of a set
+BLOOM_THRESHOLD = int(os.getenv("KNOWN_KEYS_BLOOM_THRESHOLD", "2000000"))
+# False-positive rate of the Bloom filter, i.e. the share of new projects
+# that would be mistaken for known ones (about 3.6 bytes per key at 1e-6)
+BLOOM_ERROR_RATE = float(os.getenv("KNOWN_KEYS_BLOOM_ERROR_RATE", "1e-6"))
+LOAD_CHUNK_SIZE = 10000
+# Incremental mode re-fetches a project at least this often
+REFRESH_TTL_HOURS = float(os.getenv("SCRAPER_REFRESH_TTL_HOURS", "168"))
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class KnownKeys:
+    """
+    Unique keys already stored in a table, loaded once so the scraper can skip
+    known projects without a query per card. Writers add newly inserted keys.
+    """
+
+    def __init__(self, keys=None, expected=0, bloom_threshold=BLOOM_THRESHOLD):
+        if expected >= bloom_threshold:
+            # Headroom so inserts made during the run keep the error rate.
+            self._keys = BloomFilter(capacity=expected * 2)
+        else:
+            self._keys = set()
+        self._lock = threading.Lock()
+        self.count = 0
+        for key in keys or ():
+            self.add(key)
+
+    @classmethod
+    def load(cls, column=Project.rera_no, session_factory=SessionLocal, **kwargs):
+        session = session_factory()
+        try:
+            expected = session.execute(select(func.count(column))).scalar() or 0
+            rows = session.execute(
+                select(column).execution_options(yield_per=LOAD_CHUNK_SIZE)
+            ).scalars()
+            known = cls(rows, expected=expected, **kwargs)
+        finally:
+            session.close()
+        kind = "Bloom filter" if known.is_bloom else "set"
+        print(f"[🧠] Loaded {known.count} known {column.key} values into a {kind}")
+        return known
+
+    @property
+    def is_bloom(self):
+        return isinstance(self._keys, BloomFilter)
+
+    def add(self, key):
+        with self._lock:
+            if key not in self._keys:
+                self._keys.add(key)
+                self.count += 1
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return self.count
+
+
+class ProjectFingerprints:
+    """
+    Card hash and last detail fetch per stored project, for incremental
+    crawls: a project is re-fetched only when it is new, its listing card
+    changed, or its details are older than `ttl`.
+    """
+
+    def __init__(self, rows=(), ttl=timedelta(hours=REFRESH_TTL_HOURS)):
+        self.ttl = ttl
+        self._projects = {}
+        for rera_no, card_hash, last_fetched in rows:
+            if last_fetched is not None and last_fetched.tzinfo is None:
+                # SQLite hands back naive datetimes; they were stored as UTC.
+                last_fetched = last_fetched.replace(tzinfo=timezone.utc)
+            self._projects[rera_no] = (card_hash, last_fetched)
+
+    @classmethod
+    def load(cls, session_factory=SessionLocal, **kwargs):
+        session = session_factory()
+        try:
+            rows = session.execute(
+                select(
+                    Project.rera_no, Project.card_hash, Project.last_fetched
+                ).execution_options(yield_per=LOAD_CHUNK_SIZE)
+            )
+            fingerprints = cls(rows, **kwargs)
+        finally:
+            session.close()
+        print(f"[🧠] Loaded fingerprints for {len(fingerprints)} projects")
+        return fingerprints
+
+    def needs_refresh(self, rera_no, card_hash, now=None):
+        stored = self._projects.get(rera_no)
+        if stored is None:
+            return True
+        stored_hash, last_fetched = stored
+        if stored_hash != card_hash or last_fetched is None:
+            return True
+        return (now or datetime.now(timezone.utc)) - last_fetched >= self.ttl
+
+    def __contains__(self, rera_no):
+        return rera_no in self._projects
+
+    def __len__(self):
+        return len(self._projects)
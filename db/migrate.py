@@ -0,0 +1,302 @@
+"""
+Versioned schema migrations (Alembic), replacing drop-and-recreate.
+
+    python -m db.migrate                 # upgrade to the newest revision
+    python -m db.migrate --current       # show the database's revision
+    alembic revision --autogenerate -m "add projects.foo"
+
+The revisions live in db/migrations/versions. The API, the job workers and
+the scheduler upgrade on startup unless `DB_MIGRATE_ON_STARTUP=0`. On
+PostgreSQL an advisory lock makes concurrent starts wait for the first one
+rather than race it. A database created before migrations existed (by
+create_all) is compared with the schema snapshots in
+db/migrations/snapshots.py; one that matches is stamped with that revision
+and upgraded from there, keeping its rows, and any other is refused.
+
+Migrations should use the helpers below for anything that scales with the
+data: `create_index`/`drop_index` build indexes CONCURRENTLY on PostgreSQL,
+and `backfill`/`backfill_rows` update existing rows in committed batches,
+so neither locks a large table for the length of the change. Whatever a
+revision did before one of those is committed even if it then fails, so
+keep such steps re-runnable (`if_not_exists=True`, a `where` that skips
+rows already done).
+"""
+
+import argparse
+import os
+import re
+
+from sqlalchemy import inspect, text
+
+from db.database import get_engine
+
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "1") == "1"
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "5000"))
+# Migration DDL gives up instead of queueing every other query behind its lock
+DB_MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("DB_MIGRATION_LOCK_TIMEOUT_MS", "10000"))
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_LOCK_KEY = 0x0E7A_0001  # pg_advisory_lock key, shared by every process
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["connection"] = connection
+    return config
+
+
+def prepare_connection(connection):
+    """Session settings for running migrations on `connection`."""
+    if connection.dialect.name == "postgresql":
+        # Index builds and backfills outlast the API's statement timeout.
+        connection.execute(text("SET statement_timeout = 0"))
+        connection.execute(text(f"SET lock_timeout = {DB_MIGRATION_LOCK_TIMEOUT_MS}"))
+
+
+# Made at runtime, not by migrations: monthly NAV partitions (db.nav_store)
+# and the ingest's staging table.
+UNMANAGED_TABLES = re.compile(r"scheme_nav_\d{4}_\d{2}$|scheme_nav_staging$")
+
+
+class SchemaMismatch(RuntimeError):
+    pass
+
+
+def schema_filter(dialect):
+    """An Alembic include_object hook for comparing schemas on `dialect`."""
+
+    def include_object(obj, name, type_, reflected, compare_to):
+        if type_ == "table" and reflected and UNMANAGED_TABLES.match(name):
+            return False
+        # Indexes declared .ddl_if(dialect=...), e.g. the trigram ones, only exist there.
+        ddl_if = getattr(obj, "_ddl_if", None)
+        if ddl_if is not None and ddl_if.dialect not in (None, dialect):
+            return False
+        return True
+
+    return include_object
+
+
+def schema_differences(connection, metadata):
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+
+    context = MigrationContext.configure(
+        connection,
+        opts={"include_object": schema_filter(connection.dialect.name), "compare_type": True},
+    )
+    return compare_metadata(context, metadata)
+
+
+def describe_difference(diff):
+    # Column changes come as a list of (op, schema, table, column, ...) tuples.
+    if isinstance(diff, list):
+        diff = diff[0]
+    names = [
+        getattr(part, "name", part)
+        for part in diff[1:]
+        if isinstance(part, str) or hasattr(part, "name")
+    ]
+    return f"{diff[0]} {'.'.join(str(name) for name in names if name)}"
+
+
+def adoptable_revision(connection):
+    """
+    The revision whose snapshot an unversioned database's tables match
+    exactly. Raises SchemaMismatch, listing what differs from the newest
+    snapshot, when none does.
+    """
+    from db.migrations.snapshots import SNAPSHOTS
+
+    newest = None
+    for revision, schema in reversed(SNAPSHOTS.items()):
+        differences = schema_differences(connection, schema())
+        if not differences:
+            return revision
+        if newest is None:
+            newest = (revision, differences)
+    revision, differences = newest
+    listed = "\n".join(f"  {describe_difference(diff)}" for diff in differences[:30])
+    raise SchemaMismatch(
+        "The database has tables but no migration revision, and they match no known "
+        f"schema. Differences from revision {revision} (as operations it would need):\n"
+        f"{listed}\nBring the tables in line by hand, then run `python -m db.migrate`."
+    )
+
+
+def current_revision(connection):
+    from alembic.runtime.migration import MigrationContext
+
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def upgrade(revision="head"):
+    """Upgrade the database to `revision`; returns the revision it ended at."""
+    from alembic import command
+
+    with get_engine().connect() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            prepare_connection(connection)
+            connection.commit()
+            config = alembic_config(connection)
+            before = current_revision(connection)
+            if before is None and inspect(connection).has_table("projects"):
+                # Tables from create_all, before migrations: adopt them as they are.
+                before = adoptable_revision(connection)
+                command.stamp(config, before)
+                connection.commit()
+                print(f"[🏷️] Existing tables stamped as revision {before}")
+            command.upgrade(config, revision)
+            connection.commit()
+            after = current_revision(connection)
+        finally:
+            if postgresql:
+                connection.rollback()
+                # Back to the pool's timeouts before the connection is reused.
+                connection.execute(text("RESET statement_timeout"))
+                connection.execute(text("RESET lock_timeout"))
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+    if after != before:
+        print(f"[✅] Database migrated from {before or 'empty'} to {after}")
+    return after
+
+
+def migrate_on_startup():
+    if DB_MIGRATE_ON_STARTUP:
+        upgrade()
+
+
+# Helpers for use inside migrations
+
+
+def _drop_invalid_index(name):
+    """Drop `name` if an interrupted CONCURRENTLY build left it invalid."""
+    from alembic import op
+
+    invalid = op.get_bind().execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_index(name, table, columns, **kw):
+    """
+    op.create_index without blocking writes: CREATE INDEX CONCURRENTLY
+    outside the migration's transaction on PostgreSQL. Safe to re-run after
+    an interrupted build.
+    """
+    from alembic import op
+
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(name, table, columns, if_not_exists=True, **kw)
+        return
+    with op.get_context().autocommit_block():
+        _drop_invalid_index(name)
+        op.create_index(
+            name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw
+        )
+
+
+def drop_index(name, table):
+    from alembic import op
+
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def backfill(table, values, where=None, key="id", batch_size=BACKFILL_BATCH_SIZE):
+    """
+    UPDATE `table` SET `values` ({column: SQL expression}) for the rows
+    matching `where`, `batch_size` ids at a time, committing each batch so
+    locks stay short. `where` should skip rows already done (e.g.
+    "foo IS NULL"), which lets an interrupted backfill pick up where it
+    stopped. Returns the rows updated.
+    """
+    from alembic import op
+
+    assignments = ", ".join(f"{column} = {expression}" for column, expression in values.items())
+    condition = f" AND ({where})" if where else ""
+    statement = text(
+        f"UPDATE {table} SET {assignments} WHERE {key} >= :start AND {key} < :stop{condition}"
+    )
+    updated = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        low, high = connection.execute(text(f"SELECT min({key}), max({key}) FROM {table}")).one()
+        if low is None:
+            return 0
+        for start in range(low, high + 1, batch_size):
+            updated += connection.execute(
+                statement, {"start": start, "stop": start + batch_size}
+            ).rowcount
+        print(f"[🔁] Backfilled {updated} rows of {table}")
+    return updated
+
+
+def backfill_rows(table, columns, compute, where=None, key="id", batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Batched backfill for values computed in Python, e.g. hashes: reads
+    `key` and `columns` for `batch_size` rows at a time and writes back the
+    dict `compute(row)` returns (skipping rows it returns None for), one
+    committed batch at a time. Returns the rows updated.
+    """
+    from alembic import op
+
+    condition = f" AND ({where})" if where else ""
+    read = text(
+        f"SELECT {key}, {', '.join(columns)} FROM {table} "
+        f"WHERE {key} > :after{condition} ORDER BY {key} LIMIT {batch_size}"
+    )
+    updated = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        after = connection.execute(text(f"SELECT min({key}) - 1 FROM {table}")).scalar()
+        while after is not None:
+            rows = connection.execute(read, {"after": after}).mappings().all()
+            if not rows:
+                break
+            changes = {}
+            for row in rows:
+                change = compute(row)
+                if change:
+                    changes.setdefault(tuple(sorted(change)), []).append({**change, "_key": row[key]})
+            for names, params in changes.items():
+                assignments = ", ".join(f"{name} = :{name}" for name in names)
+                connection.execute(
+                    text(f"UPDATE {table} SET {assignments} WHERE {key} = :_key"), params
+                )
+                updated += len(params)
+            after = rows[-1][key]
+        print(f"[🔁] Backfilled {updated} rows of {table}")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("revision", nargs="?", default="head", help="revision to upgrade to")
+    parser.add_argument("--current", action="store_true", help="print the current revision and exit")
+    args = parser.parse_args()
+
+    if args.current:
+        with get_engine().connect() as connection:
+            print(current_revision(connection) or "empty")
+    else:
+        upgrade(args.revision)
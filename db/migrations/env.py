@@ -0,0 +1,44 @@
+"""Alembic environment: runs revisions against the app's engine (see db.migrate)."""
+
+from alembic import context
+
+from db.database import get_engine
+from db.migrate import prepare_connection, schema_filter
+from db.models import Base
+
+
+def run_migrations(connection):
+    # Alembic leaves an already-open transaction to its caller, and then
+    # can't commit around CONCURRENTLY builds; start from a clean slate.
+    connection.commit()
+    context.configure(
+        connection=connection,
+        target_metadata=Base.metadata,
+        include_object=schema_filter(connection.dialect.name),
+        compare_type=True,
+        # SQLite can't ALTER most things; batch mode copies the table instead.
+        render_as_batch=connection.dialect.name == "sqlite",
+        # Each revision commits on its own, as CONCURRENTLY index builds need.
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    context.configure(
+        url=get_engine().url.render_as_string(hide_password=False),
+        target_metadata=Base.metadata,
+        literal_binds=True,
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+elif context.config.attributes.get("connection") is not None:
+    run_migrations(context.config.attributes["connection"])
+else:
+    # The alembic command line (alembic.ini)
+    with get_engine().connect() as connection:
+        prepare_connection(connection)
+        run_migrations(connection)
+        connection.commit()
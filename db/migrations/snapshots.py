@@ -0,0 +1,220 @@
+"""
+Frozen copies of the schema at the revisions an unversioned database can be
+adopted at (see db.migrate.adoptable_revision). They never follow
+db.models: a revision that changes the schema adds a new snapshot instead.
+"""
+
+import sqlalchemy as sa
+
+SEARCH_COLUMNS = ("project_name", "promoter_address")  # trigram-indexed on PostgreSQL
+ORIGINAL_PROMOTER_COLUMNS = (
+    "promoter_name",
+    "promoter_company_name",
+    "promoter_registration_no",
+    "promoter_correspondence_office_address",
+    "promoter_registered_office_address",
+    "promoter_entity",
+    "promoter_email",
+    "promoter_mobile",
+    "promoter_telephone",
+    "promoter_gst_no",
+)
+
+
+def original_schema():
+    """The tables create_all built before this project had migrations."""
+    metadata = sa.MetaData()
+    sa.Table(
+        "promoters",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+    )
+    sa.Table(
+        "projects",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_name", sa.String(), nullable=False),
+        sa.Column("rera_no", sa.String(), nullable=False, unique=True),
+        sa.Column("promoter_address", sa.String()),
+        sa.Column("promoter_id", sa.Integer(), sa.ForeignKey("promoters.id")),
+        *(sa.Column(name, sa.String()) for name in ORIGINAL_PROMOTER_COLUMNS),
+    )
+    return metadata
+
+
+def promoters_table(metadata):
+    return sa.Table(
+        "promoters",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, index=True),
+        sa.Column("name_key", sa.String(), nullable=False, index=True),
+        sa.Column("company_name", sa.String()),
+        sa.Column("registration_no", sa.String(), unique=True),
+        sa.Column("correspondence_office_address", sa.String()),
+        sa.Column("registered_office_address", sa.String()),
+        sa.Column("entity", sa.String(), index=True),
+        sa.Column("email", sa.String()),
+        sa.Column("mobile", sa.String()),
+        sa.Column("telephone", sa.String()),
+        sa.Column("gst_no", sa.String(), index=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True)),
+    )
+
+
+def schema_0002():
+    """Normalised promoters, incremental crawl state, jobs, scheduler and NAV tables."""
+    metadata = sa.MetaData()
+    promoters_table(metadata)
+    sa.Table(
+        "projects",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_name", sa.String(), nullable=False),
+        sa.Column("rera_no", sa.String(), nullable=False, unique=True),
+        sa.Column("promoter_address", sa.String()),
+        sa.Column("promoter_id", sa.Integer(), sa.ForeignKey("promoters.id"), index=True),
+        sa.Column("card_hash", sa.String(64)),
+        sa.Column("content_hash", sa.String(64)),
+        sa.Column("last_seen", sa.DateTime(timezone=True)),
+        sa.Column("last_fetched", sa.DateTime(timezone=True)),
+        sa.Column("last_changed", sa.DateTime(timezone=True)),
+        *(
+            sa.Index(
+                f"ix_projects_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in SEARCH_COLUMNS
+        ),
+    )
+    sa.Table(
+        "olx_products",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False, unique=True),
+        sa.Column("item_id", sa.String(), index=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("price", sa.String()),
+        sa.Column("price_value", sa.BigInteger()),
+        sa.Column("location", sa.String()),
+        sa.Column("query", sa.String(), index=True),
+        sa.Column("last_seen", sa.DateTime(timezone=True)),
+        sa.Column("last_changed", sa.DateTime(timezone=True)),
+    )
+    sa.Table(
+        "crawl_checkpoints",
+        metadata,
+        sa.Column("source", sa.String(), primary_key=True),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+        sa.Column("pages", sa.Integer()),
+        sa.Column("refreshed", sa.Integer()),
+        sa.Column("unchanged", sa.Integer()),
+    )
+    active = sa.text("status IN ('queued', 'running')")
+    sa.Table(
+        "crawl_jobs",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("pages", sa.Integer(), nullable=False),
+        sa.Column("incremental", sa.Boolean(), nullable=False),
+        sa.Column("current_page", sa.Integer(), nullable=False),
+        sa.Column("cursor", sa.String()),
+        sa.Column("queued", sa.Integer(), nullable=False),
+        sa.Column("inserted", sa.Integer(), nullable=False),
+        sa.Column("updated", sa.Integer(), nullable=False),
+        sa.Column("unchanged", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String()),
+        sa.Column("worker", sa.String()),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False),
+        sa.Column("profile", sa.Boolean(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Index(
+            "uq_crawl_jobs_active_source",
+            "source",
+            unique=True,
+            postgresql_where=active,
+            sqlite_where=active,
+        ),
+    )
+    sa.Table(
+        "data_generations",
+        metadata,
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    sa.Table(
+        "scheduler_runs",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job", sa.String(), nullable=False, index=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("scheduled_for", sa.DateTime(timezone=True)),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("found", sa.Integer()),
+        sa.Column("factor", sa.Float(), nullable=False),
+        sa.Column("error", sa.String()),
+    )
+    # Partitions are created by db.nav_store as data arrives.
+    sa.Table(
+        "scheme_nav",
+        metadata,
+        sa.Column("scheme_code", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("nav_date", sa.Date(), primary_key=True),
+        sa.Column("scheme_name", sa.String(), nullable=False),
+        sa.Column("nav", sa.Numeric(20, 6), nullable=False),
+        sa.Column("isin_growth", sa.String()),
+        sa.Column("isin_reinvestment", sa.String()),
+        sa.Column("fund_house", sa.String()),
+        sa.Column("category", sa.String()),
+        sa.Column("ingested_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Index("ix_scheme_nav_nav_date", "nav_date"),
+        postgresql_partition_by="RANGE (nav_date)",
+    )
+    sa.Table(
+        "scheme_nav_latest",
+        metadata,
+        sa.Column("scheme_code", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("nav_date", sa.Date(), nullable=False),
+        sa.Column("scheme_name", sa.String(), nullable=False),
+        sa.Column("nav", sa.Numeric(20, 6), nullable=False),
+        sa.Column("isin_growth", sa.String()),
+        sa.Column("isin_reinvestment", sa.String()),
+        sa.Column("fund_house", sa.String()),
+        sa.Column("category", sa.String()),
+    )
+    sa.Table(
+        "nav_archives",
+        metadata,
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("rows", sa.Integer(), nullable=False),
+        sa.Column("bytes", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    return metadata
+
+
+def schema_0003():
+    """crawl_jobs.attempts."""
+    metadata = schema_0002()
+    metadata.tables["crawl_jobs"].append_column(
+        sa.Column("attempts", sa.Integer(), nullable=False)
+    )
+    return metadata
+
+
+# revision -> the schema a database at that revision has, oldest first
+SNAPSHOTS = {"0001": original_schema, "0002": schema_0002, "0003": schema_0003}
@@ -0,0 +1,27 @@
+"""original schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:04:27.945493
+
+The two tables create_all built before migrations: promoters by name, and
+projects carrying their promoter's details in promoter_* columns.
+"""
+
+from alembic import op
+
+from db.migrations.snapshots import original_schema
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    original_schema().create_all(op.get_bind())
+
+
+def downgrade():
+    op.drop_table("projects")
+    op.drop_table("promoters")
@@ -0,0 +1,175 @@
+"""promoters, crawl state, job, scheduler and NAV tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:30:02.117804
+
+Promoter details move out of projects into promoters (one row per
+registration number, or per normalised name without one), which keeps
+every scraped project. Projects gain their incremental crawl columns, and
+the tables added since the original schema are created. Re-runnable: each
+step checks what an interrupted run already did.
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.migrate import backfill_rows, create_index
+from db.migrations.snapshots import ORIGINAL_PROMOTER_COLUMNS, SEARCH_COLUMNS, schema_0002
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# projects.promoter_* -> promoters column
+PROMOTER_DETAILS = {
+    "promoter_name": "name",
+    "promoter_company_name": "company_name",
+    "promoter_registration_no": "registration_no",
+    "promoter_correspondence_office_address": "correspondence_office_address",
+    "promoter_registered_office_address": "registered_office_address",
+    "promoter_entity": "entity",
+    "promoter_email": "email",
+    "promoter_mobile": "mobile",
+    "promoter_telephone": "telephone",
+    "promoter_gst_no": "gst_no",
+}
+NEW_TABLES = (
+    "olx_products",
+    "crawl_checkpoints",
+    "crawl_jobs",
+    "data_generations",
+    "scheduler_runs",
+    "scheme_nav",
+    "scheme_nav_latest",
+    "nav_archives",
+)
+# SQLite reflects create_all's unique constraints without a name; batch
+# mode needs one to drop them.
+UNIQUE_NAMES = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def name_key(name):
+    # As db.promoters.name_key was when this revision was written
+    key = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+    return re.sub(r"^m s ", "", key)
+
+
+def columns_of(table):
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def unique_constraint(table, column):
+    """Name of the unique constraint on exactly `column`, or None."""
+    for constraint in sa.inspect(op.get_bind()).get_unique_constraints(table):
+        if constraint["column_names"] == [column]:
+            return constraint["name"] or UNIQUE_NAMES["uq"] % {
+                "table_name": table,
+                "column_0_name": column,
+            }
+    return None
+
+
+def promoter_linker():
+    """backfill_rows() callback: the promoter_id for a project's promoter_* values."""
+    promoters = sa.table(
+        "promoters",
+        sa.column("id"),
+        sa.column("name_key"),
+        *map(sa.column, PROMOTER_DETAILS.values()),
+    )
+    ids = {}
+
+    def link(row):
+        registration_no = row["promoter_registration_no"]
+        if registration_no:
+            column, value = "registration_no", registration_no
+        else:
+            column, value = "name_key", name_key(row["promoter_name"])
+        if (column, value) not in ids:
+            connection = op.get_bind()
+            promoter_id = connection.execute(
+                sa.select(promoters.c.id)
+                .where(promoters.c[column] == value)
+                .order_by(promoters.c.id)
+                .limit(1)
+            ).scalar()
+            if promoter_id is None:
+                values = {new: row[old] for old, new in PROMOTER_DETAILS.items()}
+                promoter_id = connection.execute(
+                    sa.insert(promoters)
+                    .values(name_key=name_key(row["promoter_name"]), **values)
+                    .returning(promoters.c.id)
+                ).scalar()
+            ids[column, value] = promoter_id
+        return {"promoter_id": ids[column, value]}
+
+    return link
+
+
+def upgrade():
+    bind = op.get_bind()
+    postgresql = bind.dialect.name == "postgresql"
+    schema = schema_0002()
+
+    # promoters: the detail columns, names no longer unique, registration numbers unique
+    existing = columns_of("promoters")
+    name_unique = unique_constraint("promoters", "name")
+    registration_unique = unique_constraint("promoters", "registration_no")
+    with op.batch_alter_table("promoters", naming_convention=UNIQUE_NAMES) as batch:
+        for column in schema.tables["promoters"].columns:
+            if column.name not in existing:
+                batch.add_column(sa.Column(column.name, column.type, nullable=True))
+        if name_unique:
+            batch.drop_constraint(name_unique, type_="unique")
+        if not registration_unique:
+            batch.create_unique_constraint("promoters_registration_no_key", ["registration_no"])
+    backfill_rows(
+        "promoters",
+        ["name"],
+        lambda row: {"name_key": name_key(row["name"])},
+        where="name_key IS NULL",
+    )
+    with op.batch_alter_table("promoters") as batch:
+        batch.alter_column("name_key", existing_type=sa.String(), nullable=False)
+    for column in ("name", "name_key", "entity", "gst_no"):
+        create_index(f"ix_promoters_{column}", "promoters", [column])
+
+    # projects: crawl bookkeeping, and promoter details replaced by promoter_id
+    existing = columns_of("projects")
+    for column in ("card_hash", "content_hash", "last_seen", "last_fetched", "last_changed"):
+        if column not in existing:
+            op.add_column("projects", schema.tables["projects"].c[column].copy())
+    if "promoter_name" in existing:
+        backfill_rows(
+            "projects",
+            ORIGINAL_PROMOTER_COLUMNS,
+            promoter_linker(),
+            where="promoter_id IS NULL AND promoter_name IS NOT NULL",
+        )
+        with op.batch_alter_table("projects") as batch:
+            for column in ORIGINAL_PROMOTER_COLUMNS:
+                batch.drop_column(column)
+    create_index("ix_projects_promoter_id", "projects", ["promoter_id"])
+    if postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in SEARCH_COLUMNS:
+            create_index(
+                f"ix_projects_{column}_trgm",
+                "projects",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+    for name in NEW_TABLES:
+        schema.tables[name].create(bind, checkfirst=True)
+
+
+def downgrade():
+    raise NotImplementedError(
+        "0002 moves promoter details out of projects; restore a backup to go back to 0001"
+    )
@@ -0,0 +1,29 @@
+"""crawl_jobs.attempts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:10:41.532906
+
+Counts how often a worker claimed a job, so a job whose worker died can be
+re-queued a limited number of times (see db.jobs.reap_stale_jobs).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "crawl_jobs",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("crawl_jobs") as batch:
+        batch.drop_column("attempts")
@@ -1,4 +1,19 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    event,
+    func,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -8,8 +23,19 @@ Base = declarative_base()
 class Promoter(Base):
     __tablename__ = "promoters"
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False, unique=True)
+    name = Column(String, nullable=False, index=True)  # as shown on listing cards
+    name_key = Column(String, nullable=False, index=True)  # see db.promoters.name_key
     projects = relationship("Project", back_populates="promoter")
+    company_name = Column(String, nullable=True)
+    registration_no = Column(String, nullable=True, unique=True)
+    correspondence_office_address = Column(String, nullable=True)
+    registered_office_address = Column(String, nullable=True)
+    entity = Column(String, nullable=True, index=True)
+    email = Column(String, nullable=True)
+    mobile = Column(String, nullable=True)
+    telephone = Column(String, nullable=True)
+    gst_no = Column(String, nullable=True, index=True)
+    fetched_at = Column(DateTime(timezone=True), nullable=True)  # last detail scrape
 
 
 class Project(Base):
@@ -19,14 +45,167 @@ class Project(Base):
     rera_no = Column(String, unique=True, nullable=False)
     promoter = relationship("Promoter", back_populates="projects")  # relationship
     promoter_address = Column(String)
-    promoter_id = Column(Integer, ForeignKey("promoters.id"))
-    promoter_name = Column(String)
-    promoter_company_name = Column(String, nullable=True)
-    promoter_registration_no = Column(String, nullable=True)
-    promoter_correspondence_office_address = Column(String, nullable=True)
-    promoter_registered_office_address = Column(String, nullable=True)
-    promoter_entity = Column(String, nullable=True)
-    promoter_email = Column(String, nullable=True)
-    promoter_mobile = Column(String, nullable=True)
-    promoter_telephone = Column(String, nullable=True)
-    promoter_gst_no = Column(String, nullable=True)
\ No newline at end of file
+    promoter_id = Column(Integer, ForeignKey("promoters.id"), index=True)
+    # Incremental crawl bookkeeping
+    card_hash = Column(String(64), nullable=True)  # listing-card fingerprint
+    content_hash = Column(String(64), nullable=True)  # all scraped fields, promoter details included
+    last_seen = Column(DateTime(timezone=True), nullable=True)
+    last_fetched = Column(DateTime(timezone=True), nullable=True)
+    last_changed = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Trigram indexes serve the API's substring (ILIKE '%...%') searches.
+        Index(
+            "ix_projects_project_name_trgm",
+            "project_name",
+            postgresql_using="gin",
+            postgresql_ops={"project_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_projects_promoter_address_trgm",
+            "promoter_address",
+            postgresql_using="gin",
+            postgresql_ops={"promoter_address": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    Project.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class OlxProduct(Base):
+    """An OLX listing seen in search results, keyed on its URL."""
+
+    __tablename__ = "olx_products"
+    id = Column(Integer, primary_key=True)
+    url = Column(String, unique=True, nullable=False)
+    item_id = Column(String, nullable=True, index=True)  # the iid-... in the URL
+    title = Column(String, nullable=False)
+    price = Column(String, nullable=True)  # as shown, e.g. "₹ 1,200"
+    price_value = Column(BigInteger, nullable=True)
+    location = Column(String, nullable=True)
+    query = Column(String, nullable=True, index=True)  # search that last listed it
+    last_seen = Column(DateTime(timezone=True), nullable=True)
+    last_changed = Column(DateTime(timezone=True), nullable=True)
+
+
+class CrawlCheckpoint(Base):
+    __tablename__ = "crawl_checkpoints"
+    source = Column(String, primary_key=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    pages = Column(Integer, default=0)
+    refreshed = Column(Integer, default=0)
+    unchanged = Column(Integer, default=0)
+
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    # queued -> running -> completed | failed | cancelled
+    status = Column(String, nullable=False, default="running")
+    pages = Column(Integer, nullable=False)  # pages requested
+    incremental = Column(Boolean, nullable=False, default=False)
+    current_page = Column(Integer, nullable=False, default=0)  # last fully done page
+    cursor = Column(String, nullable=True)  # where current_page was read from
+    queued = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    worker = Column(String, nullable=True)  # host:pid running the job
+    attempts = Column(Integer, nullable=False, default=0)  # times a worker claimed it
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    profile = Column(Boolean, nullable=False, default=False)  # dump a cProfile of the run
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        # At most one queued or running job per source
+        Index(
+            "uq_crawl_jobs_active_source",
+            "source",
+            unique=True,
+            postgresql_where=status.in_(("queued", "running")),
+            sqlite_where=status.in_(("queued", "running")),
+        ),
+    )
+
+
+class DataGeneration(Base):
+    __tablename__ = "data_generations"
+    name = Column(String, primary_key=True)  # dataset, e.g. "projects"
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_runs"
+    id = Column(Integer, primary_key=True)
+    job = Column(String, nullable=False, index=True)  # scheduled job name
+    status = Column(String, nullable=False)  # running | ok | failed | skipped
+    scheduled_for = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    found = Column(Integer, nullable=True)  # new or changed rows the run reported
+    factor = Column(Float, nullable=False, default=1.0)  # interval multiplier afterwards
+    error = Column(String, nullable=True)
+
+
+class SchemeNav(Base):
+    """
+    Daily NAV history. On PostgreSQL the table is range-partitioned by month
+    of `nav_date` (partitions are created by db.nav_store as data arrives),
+    and old months are archived to Parquet and dropped.
+    """
+
+    __tablename__ = "scheme_nav"
+    __table_args__ = (
+        Index("ix_scheme_nav_nav_date", "nav_date"),
+        {"postgresql_partition_by": "RANGE (nav_date)"},
+    )
+    scheme_code = Column(Integer, primary_key=True)
+    nav_date = Column(Date, primary_key=True)
+    scheme_name = Column(String, nullable=False)
+    nav = Column(Numeric(20, 6), nullable=False)
+    isin_growth = Column(String, nullable=True)  # ISIN Div Payout / ISIN Growth
+    isin_reinvestment = Column(String, nullable=True)  # ISIN Div Reinvestment
+    fund_house = Column(String, nullable=True)
+    category = Column(String, nullable=True)  # e.g. Open Ended Schemes(Equity Scheme - ...)
+    ingested_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SchemeNavLatest(Base):
+    """Newest NAV of every scheme, kept up to date by the NAV ingest."""
+
+    __tablename__ = "scheme_nav_latest"
+    scheme_code = Column(Integer, primary_key=True, autoincrement=False)
+    nav_date = Column(Date, nullable=False)
+    scheme_name = Column(String, nullable=False)
+    nav = Column(Numeric(20, 6), nullable=False)
+    isin_growth = Column(String, nullable=True)
+    isin_reinvestment = Column(String, nullable=True)
+    fund_house = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+
+
+class NavArchive(Base):
+    """A month of `scheme_nav` moved out of the database into a Parquet file."""
+
+    __tablename__ = "nav_archives"
+    month = Column(Date, primary_key=True)  # first day of the month
+    path = Column(String, nullable=False)
+    rows = Column(Integer, nullable=False)
+    bytes = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,289 @@
+"""
+NAV history storage: monthly partitions of `scheme_nav`, the
+`scheme_nav_latest` table, and Parquet archives of old months.
+
+    python -m db.nav_store --archive   # archive months older than NAV_HOT_MONTHS
+
+Recent months stay in the database (one partition per month on
+PostgreSQL). Older months are written to one zstd-compressed Parquet file
+each under `NAV_ARCHIVE_DIR`, sorted by scheme so one scheme's rows fall in
+a few row groups, recorded in `nav_archives` and dropped from the table.
+The read helpers answer from whichever side holds the dates asked for.
+Archives need the optional `pyarrow` package.
+"""
+
+import argparse
+import os
+from datetime import date
+
+from sqlalchemy import delete, func, select, text, tuple_
+
+from db.database import SessionLocal
+from db.models import NavArchive, SchemeNav, SchemeNavLatest
+from db.writer import DIALECT_INSERTS
+
+NAV_ARCHIVE_DIR = os.getenv("NAV_ARCHIVE_DIR", "data/nav_archive")
+# Months before the current one kept in the database
+NAV_HOT_MONTHS = int(os.getenv("NAV_HOT_MONTHS", "3"))
+NAV_ARCHIVE_ROW_GROUP = int(os.getenv("NAV_ARCHIVE_ROW_GROUP", "8192"))
+ARCHIVE_CHUNK_SIZE = 50000
+
+NAV_FIELDS = (
+    "scheme_code",
+    "nav_date",
+    "scheme_name",
+    "nav",
+    "isin_growth",
+    "isin_reinvestment",
+    "fund_house",
+    "category",
+)
+HISTORY_FIELDS = ("nav_date", "nav")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"scheme_nav_{month:%Y_%m}"
+
+
+def ensure_partitions(session, first, last):
+    """Create the monthly partitions of `scheme_nav` covering first..last (PostgreSQL)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    month = month_start(first)
+    while month <= last:
+        session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF scheme_nav "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+        )
+        month = add_months(month, 1)
+
+
+def archived_months(session):
+    """{first day of month: Parquet path} of every archived month."""
+    return dict(session.execute(select(NavArchive.month, NavArchive.path)).all())
+
+
+def archived_until(session):
+    """First day after the newest archived month, or None before any archive."""
+    newest = session.execute(select(func.max(NavArchive.month))).scalar()
+    return add_months(newest, 1) if newest else None
+
+
+def refresh_latest(session, first, last):
+    """Move `scheme_nav_latest` forward to each scheme's newest NAV dated first..last."""
+    in_range = SchemeNav.nav_date.between(first, last)
+    newest = (
+        select(SchemeNav.scheme_code, func.max(SchemeNav.nav_date))
+        .where(in_range)
+        .group_by(SchemeNav.scheme_code)
+    )
+    rows = select(*(SchemeNav.__table__.c[name] for name in NAV_FIELDS)).where(
+        in_range, tuple_(SchemeNav.scheme_code, SchemeNav.nav_date).in_(newest)
+    )
+    insert = DIALECT_INSERTS[session.get_bind().dialect.name]
+    stmt = insert(SchemeNavLatest).from_select(NAV_FIELDS, rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scheme_code"],
+        set_={name: stmt.excluded[name] for name in NAV_FIELDS if name != "scheme_code"},
+        where=SchemeNavLatest.nav_date <= stmt.excluded.nav_date,
+    )
+    session.execute(stmt)
+
+
+def read_archive(paths, filters, columns=None):
+    """
+    Rows of one or more archive files matching `filters`; row groups whose
+    statistics rule the filters out are skipped. Files are read in parallel.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    expression = pq.filters_to_expression(filters)
+    dataset = ds.dataset(paths, format="parquet")
+    return dataset.to_table(columns=columns, filter=expression).to_pylist()
+
+
+def latest_navs(session):
+    """The newest NAV of every scheme, by scheme code."""
+    columns = [SchemeNavLatest.__table__.c[name] for name in NAV_FIELDS]
+    stmt = select(*columns).order_by(SchemeNavLatest.scheme_code)
+    return [dict(zip(NAV_FIELDS, row)) for row in session.execute(stmt).all()]
+
+
+def navs_on(session, day):
+    """Every scheme's NAV on `day`, by scheme code."""
+    archives = archived_months(session)
+    path = archives.get(month_start(day))
+    if path:
+        rows = read_archive([path], [("nav_date", "=", day)])
+        return sorted(rows, key=lambda row: row["scheme_code"])
+
+    columns = [SchemeNav.__table__.c[name] for name in NAV_FIELDS]
+    stmt = select(*columns).where(SchemeNav.nav_date == day).order_by(SchemeNav.scheme_code)
+    # Plain tuples: a whole market's rows are noticeably slower through .mappings()
+    return [dict(zip(NAV_FIELDS, row)) for row in session.execute(stmt).all()]
+
+
+def scheme_history(session, scheme_code, start=None, end=None):
+    """(nav_date, nav) rows of one scheme between start and end inclusive, oldest first."""
+    paths = [
+        path
+        for month, path in sorted(archived_months(session).items())
+        if not (start and add_months(month, 1) <= start) and not (end and month > end)
+    ]
+    rows = []
+    if paths:
+        filters = [("scheme_code", "=", scheme_code)]
+        if start:
+            filters.append(("nav_date", ">=", start))
+        if end:
+            filters.append(("nav_date", "<=", end))
+        rows = read_archive(paths, filters, columns=list(HISTORY_FIELDS))
+        rows.sort(key=lambda row: row["nav_date"])
+
+    stmt = (
+        select(SchemeNav.nav_date, SchemeNav.nav)
+        .where(SchemeNav.scheme_code == scheme_code)
+        .order_by(SchemeNav.nav_date)
+    )
+    if start:
+        stmt = stmt.where(SchemeNav.nav_date >= start)
+    if end:
+        stmt = stmt.where(SchemeNav.nav_date <= end)
+    rows.extend(dict(row) for row in session.execute(stmt).mappings())
+    return rows
+
+
+def history_chunks(session, chunk_size):
+    """
+    All NAV history for a bulk export: Arrow record batches from the
+    archive files, oldest month first, then lists of row tuples from the
+    table (in no particular order).
+    """
+    import pyarrow.parquet as pq
+
+    for month, path in sorted(archived_months(session).items()):
+        yield from pq.ParquetFile(path).iter_batches(
+            batch_size=chunk_size, columns=list(NAV_FIELDS)
+        )
+    columns = [SchemeNav.__table__.c[name] for name in NAV_FIELDS]
+    stmt = select(*columns).execution_options(yield_per=chunk_size)
+    yield from session.execute(stmt).partitions()
+
+
+def archive_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("scheme_code", pa.int32()),
+            ("nav_date", pa.date32()),
+            ("scheme_name", pa.string()),
+            ("nav", pa.decimal128(20, 6)),
+            ("isin_growth", pa.string()),
+            ("isin_reinvestment", pa.string()),
+            ("fund_house", pa.string()),
+            ("category", pa.string()),
+        ]
+    )
+
+
+def archive_month(session, month, directory=NAV_ARCHIVE_DIR):
+    """
+    Write one month of `scheme_nav` to Parquet, record it in `nav_archives`
+    and drop it from the table, in the caller's transaction. Rows are read
+    from a server-side cursor in chunks. Returns (rows, bytes), or None if
+    the month is empty.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = archive_schema()
+    columns = [SchemeNav.__table__.c[name] for name in NAV_FIELDS]
+    in_month = (SchemeNav.nav_date >= month, SchemeNav.nav_date < add_months(month, 1))
+    stmt = (
+        select(*columns)
+        .where(*in_month)
+        .order_by(SchemeNav.scheme_code, SchemeNav.nav_date)
+        .execution_options(yield_per=ARCHIVE_CHUNK_SIZE)
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{partition_name(month)}.parquet")
+    partial = path + ".partial"
+    rows = 0
+    writer = None
+    try:
+        try:
+            for chunk in session.execute(stmt).mappings().partitions():
+                table = pa.Table.from_pylist([dict(row) for row in chunk], schema=schema)
+                if writer is None:
+                    writer = pq.ParquetWriter(partial, schema, compression="zstd")
+                writer.write_table(table, row_group_size=NAV_ARCHIVE_ROW_GROUP)
+                rows += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if rows:
+            os.replace(partial, path)
+    finally:
+        # Left behind only if the write failed
+        if os.path.exists(partial):
+            os.remove(partial)
+    if not rows:
+        return None
+
+    size = os.path.getsize(path)
+    session.add(NavArchive(month=month, path=path, rows=rows, bytes=size))
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+    else:
+        session.execute(delete(SchemeNav).where(*in_month))
+    return rows, size
+
+
+def archive_old_months(hot_months=NAV_HOT_MONTHS, today=None, session_factory=SessionLocal):
+    """Archive every month older than `hot_months` before the current one."""
+    cutoff = add_months(month_start(today or date.today()), -hot_months)
+    archived = []
+    session = session_factory()
+    try:
+        oldest = session.execute(select(func.min(SchemeNav.nav_date))).scalar()
+        month = month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            result = archive_month(session, month)
+            session.commit()
+            if result:
+                rows, size = result
+                print(f"[🗄️] Archived {month:%Y-%m}: {rows} NAVs, {size / 1024:.0f} KiB")
+                archived.append(month)
+            month = add_months(month, 1)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    return archived
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--archive", action="store_true", help="archive old months")
+    parser.add_argument("--hot-months", type=int, default=NAV_HOT_MONTHS)
+    args = parser.parse_args()
+
+    if args.archive:
+        archive_old_months(args.hot_months)
+    else:
+        parser.print_help()
@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from db.database import SessionLocal
+from db.generations import PROJECTS, bump_generation
+from db.models import Promoter
+
+PROMOTER_CACHE_SIZE = int(os.getenv("PROMOTER_CACHE_SIZE", "10000"))
+# A promoter's details are scraped again only once they are older than this
+PROMOTER_REFRESH_TTL_HOURS = float(os.getenv("PROMOTER_REFRESH_TTL_HOURS", "168"))
+
+# scraper.parsers.PROMOTER_FIELDS key -> Promoter column
+PROMOTER_COLUMNS = {
+    "company_name": "company_name",
+    "registration_no": "registration_no",
+    "correspondence_office_address": "correspondence_office_address",
+    "registered_office_address": "registered_office_address",
+    "entity": "entity",
+    "email_id": "email",
+    "mobile": "mobile",
+    "telephone_no": "telephone",
+    "gst_no": "gst_no",
+}
+
+_MISSING = object()
+
+
+def name_key(name):
+    """Promoter name folded for matching: case, punctuation and an "M/s" prefix dropped."""
+    key = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+    return re.sub(r"^m s ", "", key)
+
+
+class PromoterResolver:
+    """
+    Maps promoters to `Promoter` rows through an LRU cache in front of the DB.
+
+    Lookups go by registration number when the details are known, otherwise
+    by normalised name (all a listing card shows). `save()` writes through to
+    the DB and the cache; `fresh()` returns the stored record while its details
+    are younger than `ttl`, so the scraper can skip the promoter tab.
+    Safe to share between worker threads.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        size=PROMOTER_CACHE_SIZE,
+        ttl=timedelta(hours=PROMOTER_REFRESH_TTL_HOURS),
+    ):
+        self.session_factory = session_factory
+        self.size = size
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "saved": 0}
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+
+    def lock_for(self, name):
+        """Per-promoter lock, so only one thread scrapes a given promoter."""
+        with self._lock:
+            return self._key_locks.setdefault(name_key(name), threading.Lock())
+
+    def _cached(self, key):
+        record = self._cache.get(key, _MISSING)
+        if record is not _MISSING:
+            self._cache.move_to_end(key)
+        return record
+
+    def _remember(self, key, record):
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _record(promoter):
+        return {
+            "id": promoter.id,
+            "details": {
+                field: getattr(promoter, column)
+                for field, column in PROMOTER_COLUMNS.items()
+            },
+            "fetched_at": promoter.fetched_at,
+        }
+
+    def _find(self, session, name, registration_no):
+        if registration_no:
+            promoter = session.execute(
+                select(Promoter).where(Promoter.registration_no == registration_no)
+            ).scalar_one_or_none()
+            if promoter:
+                return promoter
+        stmt = select(Promoter).where(Promoter.name_key == name_key(name))
+        if registration_no:
+            # Not a different promoter that happens to share the name
+            stmt = stmt.where(Promoter.registration_no.is_(None))
+        return session.execute(stmt.order_by(Promoter.id).limit(1)).scalar_one_or_none()
+
+    def lookup(self, name):
+        """Cached record ({id, details, fetched_at}) for a card's promoter name, or None."""
+        key = name_key(name)
+        with self._lock:
+            record = self._cached(key)
+            if record is not _MISSING:
+                self.stats["hits"] += 1
+                return record
+            self.stats["misses"] += 1
+
+            session = self.session_factory()
+            try:
+                promoter = self._find(session, name, None)
+                record = self._record(promoter) if promoter else None
+            finally:
+                session.close()
+            self._remember(key, record)
+            return record
+
+    def fresh(self, name, now=None):
+        """The cached record if its details were scraped within `ttl`, else None."""
+        record = self.lookup(name)
+        if not record or record["fetched_at"] is None:
+            return None
+        fetched_at = record["fetched_at"]
+        if fetched_at.tzinfo is None:
+            # SQLite hands back naive datetimes; they were stored as UTC.
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        if (now or datetime.now(timezone.utc)) - fetched_at >= self.ttl:
+            return None
+        return record
+
+    def save(self, name, details):
+        """Insert or update the promoter behind `name`/`details`; returns its record."""
+        details = details or {}
+        registration_no = details.get("registration_no")
+        with self._lock:
+            session = self.session_factory()
+            try:
+                promoter = self._find(session, name, registration_no)
+                changed = promoter is None
+                if promoter is None:
+                    promoter = Promoter(name=name, name_key=name_key(name))
+                    session.add(promoter)
+                if any(details.values()):
+                    for field, column in PROMOTER_COLUMNS.items():
+                        changed |= getattr(promoter, column) != details.get(field)
+                        setattr(promoter, column, details.get(field))
+                    promoter.fetched_at = datetime.now(timezone.utc)
+                if changed:
+                    bump_generation(session, PROJECTS)
+                session.commit()
+                record = self._record(promoter)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+            self.stats["saved"] += 1
+            self._remember(name_key(name), record)
+            return record
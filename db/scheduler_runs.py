@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from db.database import SessionLocal
+from db.models import SchedulerRun
+
+
+def start_run(job, scheduled_for, status="running", session_factory=SessionLocal):
+    """Record a scheduled run (or a skipped one, with status="skipped"); returns its id."""
+    now = datetime.now(timezone.utc)
+    session = session_factory()
+    try:
+        run = SchedulerRun(
+            job=job,
+            status=status,
+            scheduled_for=scheduled_for,
+            started_at=now,
+            finished_at=now if status == "skipped" else None,
+        )
+        session.add(run)
+        session.commit()
+        return run.id
+    finally:
+        session.close()
+
+
+def finish_run(run_id, session_factory=SessionLocal, **fields):
+    session = session_factory()
+    try:
+        run = session.get(SchedulerRun, run_id)
+        run.finished_at = datetime.now(timezone.utc)
+        for name, value in fields.items():
+            setattr(run, name, value)
+        session.commit()
+    finally:
+        session.close()
+
+
+def last_factor(job, session_factory=SessionLocal):
+    """Adaptive interval multiplier left by `job`'s last finished run (1.0 if none)."""
+    session = session_factory()
+    try:
+        factor = session.execute(
+            select(SchedulerRun.factor)
+            .where(
+                SchedulerRun.job == job,
+                SchedulerRun.status.in_(("ok", "failed")),
+            )
+            .order_by(SchedulerRun.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        return factor or 1.0
+    finally:
+        session.close()
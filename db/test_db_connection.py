@@ -1,32 +1,42 @@
-from sqlalchemy.orm import sessionmaker
-from db.models import Promoter, Project
-from db.database import engine, init
+"""
+Smoke test for the database connection and models.
 
-# Initialize DB schema (creates tables)
-init()
+    python -m db.test_db_connection
 
-Session = sessionmaker(bind=engine)
-session = Session()
+Migrates the schema to the newest revision, inserts a promoter and a
+linked project, reads them back through the relationship and rolls them
+back, so it is safe to run against a database with data in it.
+"""
 
-# Create a promoter
-promoter = Promoter(name="M/S. NEELACHAL INFRA DEVELOPERS PVT. LTD")
-session.add(promoter)
-session.commit()
+from db.database import SessionLocal
+from db.migrate import upgrade
+from db.models import Project, Promoter
+from db.promoters import name_key
 
-# Create a project linked to promoter
-project = Project(
-    name="Basanti Enclave",
-    rera_id="RP/01/2025/01362",
-    address="Angul",
-    promoter_id=promoter.id,
-)
-session.add(project)
-session.commit()
+upgrade()
 
-# Query back to verify
-result = session.query(Project).filter_by(name="Basanti Enclave").first()
-print(f"Project: {result.name}, RERA: {result.rera_id}, Address: {result.address}")
-print(f"Promoter: {result.promoter.name}")
+session = SessionLocal()
+try:
+    # Create a promoter
+    promoter_name = "M/S. NEELACHAL INFRA DEVELOPERS PVT. LTD"
+    promoter = Promoter(name=promoter_name, name_key=name_key(promoter_name))
+    session.add(promoter)
+    session.flush()
 
-# Close session
-session.close()
+    # Create a project linked to promoter
+    project = Project(
+        project_name="Basanti Enclave (connection test)",
+        rera_no="TEST/CONNECTION/0001",
+        promoter_address="Angul",
+        promoter_id=promoter.id,
+    )
+    session.add(project)
+    session.flush()
+
+    # Query back to verify
+    result = session.query(Project).filter_by(rera_no="TEST/CONNECTION/0001").one()
+    print(f"[✅] Project: {result.project_name}, RERA: {result.rera_no}, Address: {result.promoter_address}")
+    print(f"[✅] Promoter: {result.promoter.name} (id {result.promoter_id})")
+finally:
+    session.rollback()
+    session.close()
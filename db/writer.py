@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.database import SessionLocal
+from db.generations import PROJECTS, bump_generation
+from db.models import Project
+from telemetry.metrics import span
+
+BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "200"))
+FLUSH_SECONDS = float(os.getenv("DB_FLUSH_SECONDS", "30"))
+
+DIALECT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def upsert_statement(dialect, model, rows, key, update_columns, compare=None):
+    """
+    INSERT ... ON CONFLICT (key) DO UPDATE for PostgreSQL and SQLite; `key`
+    is a column name or a tuple of them for a composite unique key. With
+    `compare`, conflicting rows are only updated when one of those columns
+    differs, so unchanged rows are not rewritten (or counted in rowcount).
+    """
+    try:
+        insert = DIALECT_INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+    keys = [key] if isinstance(key, str) else list(key)
+    stmt = insert(model).values(rows)
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=keys)
+    where = None
+    if compare:
+        table = model.__table__
+        where = or_(*(table.c[c].is_distinct_from(stmt.excluded[c]) for c in compare))
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: stmt.excluded[column] for column in update_columns},
+        where=where,
+    )
+
+
+class BatchWriter:
+    """
+    Buffers scraped rows and upserts them in batches keyed on a unique column.
+
+    A batch costs one SELECT (to tell inserts, updates and no-ops apart) and
+    one INSERT ... ON CONFLICT DO UPDATE, instead of a query and a commit per
+    row. Rows are flushed every `batch_size` rows, after `flush_seconds`, and
+    on `close()`. Safe to share between worker threads: a flush talks to the
+    database without holding up `add()`, and a failed one puts its rows back
+    in the buffer for the next flush.
+
+    Columns in `ignore` (e.g. fetch timestamps) are written but do not make a
+    row count as changed; `changed_at` names a column stamped only when a row
+    is inserted or really changed. When set, the `generation` named
+    (see db.generations) is bumped in every commit that changed rows.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        model=Project,
+        key="rera_no",
+        batch_size=BATCH_SIZE,
+        flush_seconds=FLUSH_SECONDS,
+        known=None,
+        ignore=(),
+        changed_at=None,
+        generation=None,
+    ):
+        self.session_factory = session_factory
+        self.model = model
+        self.key = key
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        # Optional db.known_keys.KnownKeys kept in step with inserted rows
+        self.known = known
+        self.ignore = set(ignore)
+        self.changed_at = changed_at
+        self.generation = generation
+        self.totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self._rows = {}
+        self._first_buffered = None
+        self._lock = threading.Lock()  # guards the buffer
+        # One flush at a time, so an older batch never lands after a newer one
+        self._flush_lock = threading.Lock()
+
+    def add(self, row):
+        with self._lock:
+            if not self._rows:
+                self._first_buffered = time.monotonic()
+            # The same key twice in one statement is an error in ON CONFLICT.
+            self._rows[row[self.key]] = row
+            due = len(self._rows) >= self.batch_size or (
+                time.monotonic() - self._first_buffered >= self.flush_seconds
+            )
+        if due:
+            return self.flush()
+        return None
+
+    def write(self, rows):
+        """Upsert `rows` right away, in batches of `batch_size`."""
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for row in rows:
+            flushed = self.add(row)
+            for name, count in (flushed or {}).items():
+                stats[name] += count
+        for name, count in (self.flush() or {}).items():
+            stats[name] += count
+        return stats
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                buffered, self._rows = self._rows, {}
+            if not buffered:
+                return None
+            try:
+                return self._flush(list(buffered.values()))
+            except Exception:
+                with self._lock:
+                    if not self._rows:
+                        self._first_buffered = time.monotonic()
+                    # Rows added since are newer and win.
+                    for key, row in buffered.items():
+                        self._rows.setdefault(key, row)
+                raise
+
+    def _flush(self, rows):
+        columns = sorted(set().union(*rows) - {self.key, self.changed_at})
+        compared = [name for name in columns if name not in self.ignore]
+        # Every row in a multi-row VALUES needs the same keys.
+        rows = [{name: row.get(name) for name in [self.key, *columns]} for row in rows]
+
+        session = self.session_factory()
+        try:
+            with span("db_dedupe"):
+                stats, changed, touched, inserted = self._compare(
+                    session, rows, columns, compared
+                )
+            with span("db_commit"):
+                self._write(session, changed, touched, columns)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        if self.known is not None:
+            self.known.update(inserted)
+        for name, count in stats.items():
+            self.totals[name] += count
+        print(
+            f"[💾] Batch of {len(rows)}: {stats['inserted']} inserted, "
+            f"{stats['updated']} updated, {stats['unchanged']} unchanged"
+        )
+        return stats
+
+    def _compare(self, session, rows, columns, compared):
+        """Split rows into inserts, updates and no-ops against what is stored."""
+        table = self.model.__table__
+        key_column = table.c[self.key]
+        existing = {
+            record[self.key]: record
+            for record in session.execute(
+                select(key_column, *(table.c[name] for name in compared)).where(
+                    key_column.in_([row[self.key] for row in rows])
+                )
+            ).mappings()
+        }
+
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        changed = []
+        touched = []
+        inserted = []
+        for row in rows:
+            current = existing.get(row[self.key])
+            if current is None:
+                stats["inserted"] += 1
+                inserted.append(row[self.key])
+            elif any(current[name] != row[name] for name in compared):
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+                if self.ignore & set(columns):
+                    touched.append(row)
+                continue
+            changed.append(row)
+        return stats, changed, touched, inserted
+
+    def _write(self, session, changed, touched, columns):
+        """Upsert changed rows, touch unchanged ones and commit."""
+        dialect = session.get_bind().dialect.name
+        if changed:
+            changed_columns = columns
+            if self.changed_at:
+                now = datetime.now(timezone.utc)
+                changed = [{**row, self.changed_at: now} for row in changed]
+                changed_columns = [*columns, self.changed_at]
+            session.execute(
+                upsert_statement(
+                    dialect, self.model, changed, self.key, changed_columns
+                )
+            )
+        if touched:
+            # Unchanged rows only get their ignored (bookkeeping) columns.
+            session.execute(
+                upsert_statement(
+                    dialect,
+                    self.model,
+                    touched,
+                    self.key,
+                    [name for name in columns if name in self.ignore],
+                )
+            )
+        if changed and self.generation:
+            bump_generation(session, self.generation)
+        if changed or touched:
+            session.commit()
+
+    def touch(self, keys, **values):
+        """Set `values` on existing rows by key in one UPDATE, e.g. last_seen."""
+        keys = list(keys)
+        if not keys:
+            return
+        key_column = self.model.__table__.c[self.key]
+        session = self.session_factory()
+        try:
+            session.execute(
+                update(self.model).where(key_column.in_(keys)).values(**values)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def close(self):
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def project_writer(**kwargs):
+    """BatchWriter for `Project` rows as built by scraper.parsers.project_row."""
+    kwargs.setdefault("ignore", ("last_seen", "last_fetched"))
+    kwargs.setdefault("changed_at", "last_changed")
+    kwargs.setdefault("generation", PROJECTS)
+    return BatchWriter(**kwargs)
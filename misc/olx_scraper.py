@@ -1,14 +1,33 @@
+"""
+Selenium scraper for OLX search results.
+
+    python -m misc.olx_scraper car-cover bike-cover --workers 4 --pages 3
+
+Queries run in parallel, one per pooled driver. Each results page is read
+with a single script call that returns every new card as JSON, then "load
+more" is clicked (or the page scrolled) for up to `--pages` rounds. Products
+are upserted into `olx_products` in batches as they are found.
+"""
+
+import argparse
+import json
 import logging
 import os
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from urllib.parse import quote
 
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+from db.models import OlxProduct
+from db.writer import BatchWriter
+from scraper.browser import new_driver
+from scraper.driver_pool import POOL_SIZE, DriverPool
+from scraper.sources.olx import OLX_SEARCH_URL
+from scraper.waits import page_timer, wait_until
 
 # Configure logging to show timestamp and message
 logging.basicConfig(
@@ -16,116 +35,164 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+OLX_MAX_PAGES = int(os.getenv("OLX_MAX_PAGES", "5"))  # load-more rounds per query
+OLX_LOAD_TIMEOUT = float(os.getenv("OLX_LOAD_TIMEOUT", "10"))
+SCROLL_SETTLE_SECONDS = 2
+
+CARD_SELECTOR = "[data-aut-id='itemBox3']"
+LOAD_MORE_SELECTOR = "[data-aut-id='btnLoadMore']"
+ITEM_ID = re.compile(r"iid-(\d+)")
+
+# Cards from index arguments[1] on, as one JSON string.
+EXTRACT_CARDS_JS = """
+const text = (card, id) => {
+    const el = card.querySelector(`[data-aut-id='${id}']`);
+    return el ? el.textContent.trim() : null;
+};
+const cards = Array.from(document.querySelectorAll(arguments[0])).slice(arguments[1]);
+return JSON.stringify(cards.map(card => {
+    const link = card.querySelector('a[href]');
+    return {
+        title: text(card, 'itemTitle'),
+        price: text(card, 'itemPrice'),
+        location: text(card, 'item-location'),
+        url: link ? link.href : null,
+    };
+}));
+"""
+
+# Scroll to the end (infinite scroll) and click "load more" if it is there.
+LOAD_MORE_JS = """
+window.scrollTo(0, document.body.scrollHeight);
+const button = document.querySelector(arguments[0]);
+if (!button || button.disabled) { return false; }
+button.scrollIntoView({block: 'center'});
+button.click();
+return true;
+"""
+
+COUNT_CARDS_JS = "return document.querySelectorAll(arguments[0]).length;"
+
 
 def setup_driver():
     """Setup and return configured Chrome WebDriver"""
-    chrome_binary_path = "/home/jay-dave/chrome114/chrome-linux64/chrome"
-    chromedriver_path = "/home/jay-dave/chromedriver114/chromedriver"
-
-    options = webdriver.ChromeOptions()
-    options.binary_location = chrome_binary_path
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--remote-debugging-port=9222")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    )
-    service = Service(executable_path=chromedriver_path)
-    return webdriver.Chrome(service=service, options=options)
+    return new_driver(user_agent=USER_AGENT)
+
+
+def product_row(card, query, seen_at):
+    """An `olx_products` row for an extracted card, or None without a title or link."""
+    if not card.get("url") or not card.get("title"):
+        return None
+    item_id = ITEM_ID.search(card["url"])
+    digits = re.sub(r"\D", "", card.get("price") or "")
+    return {
+        "url": card["url"],
+        "item_id": item_id.group(1) if item_id else None,
+        "title": card["title"],
+        "price": card.get("price"),
+        "price_value": int(digits) if digits else None,
+        "location": card.get("location"),
+        "query": query,
+        "last_seen": seen_at,
+    }
+
+
+def load_more(driver, count):
+    """Ask for more results; False once no new cards turn up."""
+    clicked = driver.execute_script(LOAD_MORE_JS, LOAD_MORE_SELECTOR)
+    try:
+        wait_until(
+            driver,
+            lambda d: d.execute_script(COUNT_CARDS_JS, CARD_SELECTOR) > count,
+            OLX_LOAD_TIMEOUT if clicked else SCROLL_SETTLE_SECONDS,
+        )
+    except TimeoutException:
+        return False
+    return True
 
 
-def scrape_olx_products(url):
+def scrape_query(driver, query, writer, max_pages=OLX_MAX_PAGES):
+    """Scrape one search into `writer`; returns the number of cards read."""
+    url = OLX_SEARCH_URL.format(query=quote(query))
+    seen_at = datetime.now(timezone.utc)
+    count = 0
+    with page_timer(f"OLX '{query}'", driver):
+        driver.get(url)
+        try:
+            wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, CARD_SELECTOR)))
+        except TimeoutException:
+            logger.warning(f"No results for '{query}'")
+            return 0
+
+        for _ in range(max_pages):
+            cards = json.loads(driver.execute_script(EXTRACT_CARDS_JS, CARD_SELECTOR, count))
+            count += len(cards)
+            for card in cards:
+                row = product_row(card, query, seen_at)
+                if row:
+                    writer.add(row)
+            if not load_more(driver, count):
+                break
+    logger.info(f"'{query}': {count} products")
+    return count
+
+
+def olx_writer(**kwargs):
+    kwargs.setdefault("model", OlxProduct)
+    kwargs.setdefault("key", "url")
+    kwargs.setdefault("ignore", ("query", "last_seen"))
+    kwargs.setdefault("changed_at", "last_changed")
+    return BatchWriter(**kwargs)
+
+
+def scrape_olx_products(queries, workers=POOL_SIZE, max_pages=OLX_MAX_PAGES):
     """
-    Scrapes product information from OLX website using Selenium
-    Args:
-        url (str): The URL of the OLX page to scrape
-    Returns:
-        list: List of dictionaries containing product details
+    Run every search in `queries` across a pool of `workers` drivers,
+    writing products to the database as they come in. Returns cards read
+    per query (None for a query that failed).
     """
-    driver = setup_driver()
-    items = []
+    pool = DriverPool(setup_driver, size=min(workers, len(queries)))
+    writer = olx_writer()
+    results = {}
 
-    try:
-        logger.info(f"Attempting to fetch URL: {url}")
-        driver.get(url)
-
-        # Wait for product cards to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "[data-aut-id='itemBox3']")
-            )
-        )
-
-        # Find all product cards
-        products = driver.find_elements(By.CSS_SELECTOR, "[data-aut-id='itemBox3']")
-        logger.info(f"Found {len(products)} product cards on the page")
-
-        for i in range(len(products)):
-            try:
-                # Re-locate the product card to avoid stale element reference
-                product = driver.find_elements(
-                    By.CSS_SELECTOR, "[data-aut-id='itemBox3']"
-                )[i]
-
-                # Extract product details
-                title = product.find_element(
-                    By.CSS_SELECTOR, "[data-aut-id='itemTitle']"
-                ).text
-
-                price = product.find_element(
-                    By.CSS_SELECTOR, "[data-aut-id='itemPrice']"
-                ).text
-
-                location = product.find_element(
-                    By.CSS_SELECTOR, "[data-aut-id='item-location']"
-                ).text
-
-                # Get product URL
-                product_url = product.find_element(By.TAG_NAME, "a").get_attribute(
-                    "href"
-                )
-
-                items.append(
-                    {
-                        "Title": title,
-                        "Price": price,
-                        "Location": location,
-                        "Product URL": product_url,
-                    }
-                )
-
-                logger.info(f"Successfully extracted details for: {title}")
-
-            except Exception as e:
-                logger.error(f"Error extracting product details: {e}")
-                continue
-
-    except Exception as e:
-        logger.error(f"Error during scraping: {e}")
+    def run(query):
+        with pool.lease() as driver:
+            return scrape_query(driver, query, writer, max_pages)
 
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            futures = {executor.submit(run, query): query for query in queries}
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    logger.error(f"Error scraping '{query}': {e}")
+                    results[query] = None
     finally:
-        driver.quit()
+        pool.close()
+        writer.close()
 
-    return items
+    totals = writer.totals
+    logger.info(
+        f"{totals['inserted']} inserted, {totals['updated']} updated, "
+        f"{totals['unchanged']} unchanged"
+    )
+    return results
 
 
 def main():
-    url = "https://www.olx.in/items/q-car-cover"
-    logger.info("Starting OLX scraper")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("queries", nargs="*", default=["car-cover"])
+    parser.add_argument("--workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--pages", type=int, default=OLX_MAX_PAGES)
+    args = parser.parse_args()
 
-    # Scrape product details
-    products = scrape_olx_products(url)
-
-    if products:
-        # Save the product details to a CSV file
-        output_file = "olx_products.csv"
-        df = pd.DataFrame(products)
-        df.to_csv(output_file, index=False, encoding="utf-8")
-        logger.info(f"Product details saved successfully to {output_file}")
-    else:
-        logger.warning("No products found or failed to scrape the page")
+    logger.info("Starting OLX scraper")
+    results = scrape_olx_products(args.queries, args.workers, args.pages)
+    if not any(results.values()):
+        logger.warning("No products found or failed to scrape the pages")
 
 
 if __name__ == "__main__":
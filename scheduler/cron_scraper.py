@@ -0,0 +1,305 @@
+"""
+In-process scheduler for the periodic refreshes (RERA projects, AMFI NAV).
+
+    python -m scheduler.cron_scraper            # run until interrupted
+    python -m scheduler.cron_scraper --list     # show the next run of each job
+    python -m scheduler.cron_scraper --run nav  # run one job now
+
+Each job fires on a cron expression plus random jitter. A job never
+overlaps itself: a fire while it is still running is skipped (or queued to
+run once it finishes). The interval adapts to what the runs find: busy
+runs schedule extra polls between cron fires, empty runs skip fires. Every
+run is recorded in `scheduler_runs`.
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from db.jobs import FINISHED_STATUSES, cancel_job, enqueue_job, get_job
+from db.migrate import migrate_on_startup
+from db.scheduler_runs import finish_run, last_factor, start_run
+
+SCHEDULER_TZ = ZoneInfo(os.getenv("SCHEDULER_TZ", "Asia/Kolkata"))
+SCHEDULER_RERA_CRON = os.getenv("SCHEDULER_RERA_CRON", "0 */6 * * *")
+SCHEDULER_RERA_PAGES = int(os.getenv("SCHEDULER_RERA_PAGES", "10"))
+# A RERA job not finished by then (no worker, or one that died) is cancelled
+SCHEDULER_RERA_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_RERA_TIMEOUT_SECONDS", "10800"))
+# AMFI publishes the day's NAVs late in the evening
+SCHEDULER_NAV_CRON = os.getenv("SCHEDULER_NAV_CRON", "30 23 * * *")
+SCHEDULER_JITTER_SECONDS = float(os.getenv("SCHEDULER_JITTER_SECONDS", "300"))
+# A run that finds at least this many new/changed rows makes the job poll more often
+SCHEDULER_BUSY_THRESHOLD = int(os.getenv("SCHEDULER_BUSY_THRESHOLD", "20"))
+MIN_FACTOR = 0.25
+MAX_FACTOR = 8.0
+JOB_WAIT_POLL_SECONDS = 10
+
+# (low, high) of minute, hour, day of month, month, day of week (7 = Sunday too)
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+def parse_field(text, low, high):
+    """Values matched by one cron field: *, a, a-b, */n, a-b/n and lists of these."""
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+            if step < 1:
+                raise ValueError(f"Bad step in cron field {text!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field {text!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Standard 5-field cron expression (minute hour day month weekday)."""
+
+    def __init__(self, text):
+        self.text = text
+        fields = MACROS.get(text.strip(), text).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {text!r}")
+        parsed = [
+            parse_field(field, low, high)
+            for field, (low, high) in zip(fields, FIELD_RANGES)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, restricting both day fields matches either of them.
+        # Like Vixie cron, a field starting with "*" (e.g. */2) counts as unrestricted.
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def _day_matches(self, moment):
+        in_days = moment.day in self.days
+        in_weekdays = moment.isoweekday() % 7 in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return in_weekdays
+        if self.any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, after):
+        """First matching minute strictly after `after`."""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 5):
+            if moment.month in self.months and self._day_matches(moment):
+                for hour in sorted(h for h in self.hours if h >= moment.hour):
+                    first = moment.minute if hour == moment.hour else 0
+                    minute = min((m for m in self.minutes if m >= first), default=None)
+                    if minute is not None:
+                        return moment.replace(hour=hour, minute=minute)
+            moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression {self.text!r} never matches")
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name,
+        cron,
+        run,
+        jitter=SCHEDULER_JITTER_SECONDS,
+        overlap="skip",
+        busy_threshold=SCHEDULER_BUSY_THRESHOLD,
+    ):
+        if overlap not in ("skip", "queue"):
+            raise ValueError("overlap must be 'skip' or 'queue'")
+        self.name = name
+        self.cron = CronExpression(cron)
+        self.run = run  # returns the number of new/changed rows, or None
+        self.jitter = jitter
+        self.overlap = overlap
+        self.busy_threshold = busy_threshold
+        self.factor = 1.0
+        self.next_run = None
+        self.running = False
+        self.pending = False
+
+    def schedule(self, now):
+        """
+        Pick the next run: the next cron fire, pulled earlier when recent
+        runs were busy (factor < 1) or pushed to a later fire when they found
+        nothing (factor > 1), plus jitter.
+        """
+        fire = self.cron.next_after(now)
+        interval = self.cron.next_after(fire) - fire
+        if self.factor > 1:
+            fire = self.cron.next_after(now + interval * (self.factor - 1))
+        elif self.factor < 1:
+            fire = min(fire, now + interval * self.factor)
+        self.next_run = fire + timedelta(seconds=random.uniform(0, self.jitter))
+        return self.next_run
+
+    def adapt(self, found):
+        if found is None:
+            return
+        if found >= self.busy_threshold:
+            self.factor = max(MIN_FACTOR, self.factor / 2)
+        elif found == 0:
+            self.factor = min(MAX_FACTOR, self.factor * 2)
+        else:
+            self.factor = 1.0
+
+
+class Scheduler:
+    def __init__(self, jobs, tz=SCHEDULER_TZ):
+        self.jobs = jobs
+        self.tz = tz
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def run_forever(self):
+        now = self.now()
+        for job in self.jobs:
+            job.factor = last_factor(job.name)
+            job.schedule(now)
+            print(f"[🗓️] {job.name}: next run {job.next_run:%Y-%m-%d %H:%M:%S %Z} (x{job.factor:g})")
+
+        while not self._stopping:
+            now = self.now()
+            with self._lock:
+                due = [(job, job.next_run) for job in self.jobs if job.next_run <= now]
+                for job, _ in due:
+                    job.schedule(now)
+            for job, scheduled_for in due:
+                self.fire(job, scheduled_for)
+            with self._lock:
+                next_run = min(job.next_run for job in self.jobs)
+            self._wake.wait(max(0.0, min((next_run - self.now()).total_seconds(), 60)))
+            self._wake.clear()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    def fire(self, job, scheduled_for):
+        with self._lock:
+            if job.running:
+                if job.overlap == "queue":
+                    job.pending = True
+                    print(f"[⏳] {job.name}: still running, queued another run")
+                else:
+                    start_run(job.name, scheduled_for, status="skipped")
+                    print(f"[⏭️] {job.name}: still running, skipped this run")
+                return
+            job.running = True
+        threading.Thread(target=self._run, args=(job, scheduled_for), daemon=True).start()
+
+    def _run(self, job, scheduled_for):
+        run_id = start_run(job.name, scheduled_for)
+        started = time.monotonic()
+        status, error, found = "ok", None, None
+        print(f"[▶️] {job.name}: started")
+        try:
+            found = job.run()
+        except Exception as e:
+            status, error = "failed", repr(e)
+            print(f"[❌] {job.name} failed: {e}")
+
+        with self._lock:
+            job.adapt(found)
+            job.running = False
+            again, job.pending = job.pending, False
+            job.schedule(self.now())
+        finish_run(run_id, status=status, found=found, error=error, factor=job.factor)
+        print(
+            f"[⏹️] {job.name}: {status} in {time.monotonic() - started:.0f}s, "
+            f"found {found}, next run {job.next_run:%Y-%m-%d %H:%M %Z} (x{job.factor:g})"
+        )
+        self._wake.set()
+        if again:
+            self.fire(job, self.now())
+
+
+def refresh_rera(pages=SCHEDULER_RERA_PAGES, timeout=SCHEDULER_RERA_TIMEOUT_SECONDS):
+    """
+    Queue an incremental RERA crawl for the job workers and wait for it, at
+    most `timeout` seconds; then the job is cancelled and the run fails.
+    """
+    job_id, created = enqueue_job("rera", pages, incremental=True)
+    if not created:
+        print(f"[⏭️] RERA job {job_id} is already queued or running")
+        return None
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(job_id)
+        if job.status in FINISHED_STATUSES:
+            break
+        if time.monotonic() >= deadline:
+            cancel_job(job_id)
+            raise RuntimeError(
+                f"RERA job {job_id} still {job.status} after {timeout:.0f}s, cancelled"
+            )
+        time.sleep(JOB_WAIT_POLL_SECONDS)
+    if job.status == "failed":
+        raise RuntimeError(job.error or f"RERA job {job_id} failed")
+    return job.inserted + job.updated
+
+
+def refresh_nav():
+    """Stream the day's AMFI NAVs into `scheme_nav`, then archive old months."""
+    from db.nav_store import archive_old_months
+    from scraper.nav_ingest import ingest_nav
+
+    changed = ingest_nav()["changed"]
+    archive_old_months()
+    return changed
+
+
+def default_jobs():
+    return [
+        ScheduledJob("rera", SCHEDULER_RERA_CRON, refresh_rera),
+        ScheduledJob("nav", SCHEDULER_NAV_CRON, refresh_nav),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--list", action="store_true", help="print the next runs and exit")
+    parser.add_argument("--run", metavar="JOB", help="run one job now and exit")
+    args = parser.parse_args()
+
+    migrate_on_startup()
+    jobs = default_jobs()
+    scheduler = Scheduler(jobs)
+    if args.list:
+        now = scheduler.now()
+        for job in jobs:
+            job.factor = last_factor(job.name)
+            print(f"{job.name:<6} {job.cron.text:<16} x{job.factor:<5g} next {job.schedule(now):%Y-%m-%d %H:%M %Z}")
+    elif args.run:
+        job = next(job for job in jobs if job.name == args.run)
+        job.running = True
+        scheduler._run(job, scheduler.now())
+    else:
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
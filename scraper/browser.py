@@ -0,0 +1,199 @@
+"""
+The headless Chrome profile shared by every Selenium scraper.
+
+Requests the scrapers never need are blocked before they leave the browser:
+images are switched off in Chrome's prefs, and URL patterns for the
+categories in `BROWSER_BLOCK` (plus any in `BROWSER_BLOCKED_URLS`) are
+blocked over CDP with `Network.setBlockedURLs`. Pages are handed back once
+the DOM is ready (`BROWSER_PAGE_LOAD_STRATEGY=eager`) and each driver
+reuses an on-disk profile under `BROWSER_USER_DATA_DIR`, so the HTTP cache
+survives driver recycling and restarts.
+"""
+
+import os
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CHROME_BINARY_PATH = os.getenv("CHROME_BINARY_PATH", "/usr/bin/google-chrome")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/local/bin/chromedriver")
+# Comma-separated BLOCK_PATTERNS categories; empty blocks nothing
+BROWSER_BLOCK = os.getenv("BROWSER_BLOCK", "images,fonts,media,trackers")
+BROWSER_BLOCKED_URLS = os.getenv("BROWSER_BLOCKED_URLS", "")
+BROWSER_PAGE_LOAD_STRATEGY = os.getenv("BROWSER_PAGE_LOAD_STRATEGY", "eager")
+# Empty gives every driver a throwaway profile
+BROWSER_USER_DATA_DIR = os.getenv("BROWSER_USER_DATA_DIR", "data/chrome-profiles")
+
+BLOCK_PATTERNS = {
+    "images": [
+        f"*.{ext}*" for ext in ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico")
+    ],
+    "fonts": [f"*.{ext}*" for ext in ("woff", "woff2", "ttf", "otf", "eot")]
+    + ["*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "media": [f"*.{ext}*" for ext in ("mp4", "webm", "m3u8", "mp3", "ogg")],
+    "stylesheets": ["*.css*"],
+    "trackers": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*googlesyndication.com*",
+        "*doubleclick.net*",
+        "*adservice.google.*",
+        "*connect.facebook.net*",
+        "*hotjar.com*",
+        "*clarity.ms*",
+        "*branch.io*",
+        "*newrelic.com*",
+        "*nr-data.net*",
+    ],
+}
+
+# Bytes fetched since the last call: the document itself (once) plus every
+# resource, then the resource buffer is cleared so in-place re-renders are
+# counted from there. Cross-origin responses without Timing-Allow-Origin
+# report 0; blocked requests never appear.
+TRANSFER_JS = """
+let bytes = 0, requests = 0;
+const nav = performance.getEntriesByType('navigation')[0];
+if (nav && !window.__navCounted) {
+    window.__navCounted = true;
+    bytes += nav.transferSize || 0;
+    requests += 1;
+}
+for (const entry of performance.getEntriesByType('resource')) {
+    bytes += entry.transferSize || 0;
+    requests += 1;
+}
+performance.clearResourceTimings();
+return [bytes, requests];
+"""
+
+_totals_lock = threading.Lock()
+_totals = {"pages": 0, "bytes": 0, "requests": 0}
+
+
+def blocked_url_patterns(block=BROWSER_BLOCK, extra=BROWSER_BLOCKED_URLS):
+    patterns = []
+    for category in filter(None, (c.strip() for c in block.split(","))):
+        if category not in BLOCK_PATTERNS:
+            raise ValueError(f"Unknown BROWSER_BLOCK category: {category}")
+        patterns.extend(BLOCK_PATTERNS[category])
+    patterns.extend(p.strip() for p in extra.split(",") if p.strip())
+    return patterns
+
+
+def claim_profile_dir(base=BROWSER_USER_DATA_DIR):
+    """
+    The first profile directory under `base` no running driver holds, and
+    the open lock file holding it. Chrome refuses to share a profile, so
+    each concurrent driver (in any process) gets its own slot, and slots
+    are reused by the next driver once released.
+    """
+    os.makedirs(base, exist_ok=True)
+    if fcntl is None:
+        return os.path.join(base, f"profile-{os.getpid()}-{threading.get_ident()}"), None
+    slot = 0
+    while True:
+        lock = open(os.path.join(base, f"profile-{slot}.lock"), "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            slot += 1
+            continue
+        return os.path.join(base, f"profile-{slot}"), lock
+
+
+class ProfiledChrome(webdriver.Chrome):
+    """Chrome that gives its profile slot back on quit."""
+
+    profile_lock = None
+
+    def quit(self):
+        try:
+            super().quit()
+        finally:
+            if self.profile_lock:
+                self.profile_lock.close()
+                self.profile_lock = None
+
+
+def chrome_options(user_agent=None, user_data_dir=None, block=BROWSER_BLOCK):
+    options = Options()
+    options.binary_location = CHROME_BINARY_PATH
+    options.page_load_strategy = BROWSER_PAGE_LOAD_STRATEGY
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--mute-audio")
+    if user_agent:
+        options.add_argument(f"--user-agent={user_agent}")
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+
+    prefs = {
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_setting_values.geolocation": 2,
+    }
+    if "images" in [c.strip() for c in block.split(",")]:
+        prefs["profile.managed_default_content_settings.images"] = 2
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def new_driver(user_agent=None, block=BROWSER_BLOCK, user_data_dir=BROWSER_USER_DATA_DIR):
+    """A headless Chrome with the shared blocking profile applied."""
+    profile, lock = claim_profile_dir(user_data_dir) if user_data_dir else (None, None)
+    try:
+        driver = ProfiledChrome(
+            service=Service(executable_path=CHROMEDRIVER_PATH),
+            options=chrome_options(user_agent, profile, block),
+        )
+    except Exception:
+        if lock:
+            lock.close()
+        raise
+    driver.profile_lock = lock
+
+    patterns = blocked_url_patterns(block)
+    if patterns:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception:
+            driver.quit()
+            raise
+    return driver
+
+
+def page_transfer(driver):
+    """(bytes, requests) the page fetched since the last call; added to the totals."""
+    try:
+        transferred, requests = driver.execute_script(TRANSFER_JS)
+    except Exception:
+        return None
+    with _totals_lock:
+        _totals["pages"] += 1
+        _totals["bytes"] += transferred
+        _totals["requests"] += requests
+    return transferred, requests
+
+
+def transfer_summary(reset=False):
+    """Bytes and requests across the pages measured since the last reset."""
+    with _totals_lock:
+        totals = dict(_totals)
+        if reset:
+            _totals.update(pages=0, bytes=0, requests=0)
+    totals["bytes_per_page"] = totals["bytes"] / totals["pages"] if totals["pages"] else 0
+    return totals
@@ -0,0 +1,61 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from db.known_keys import REFRESH_TTL_HOURS, KnownKeys, ProjectFingerprints
+from db.writer import project_writer
+from scraper.parsers import card_fingerprint
+
+
+class CrawlFilter:
+    """
+    Decides which listing cards need their detail page fetched in this run.
+
+    By default only unknown RERA numbers are fetched. In incremental mode a
+    known project is re-fetched when its listing card changed or its details
+    are older than `ttl_hours`; the others just get `last_seen` bumped once
+    per page. `writer` is the BatchWriter the run should persist through.
+    """
+
+    def __init__(self, incremental=False, ttl_hours=REFRESH_TTL_HOURS):
+        self.incremental = incremental
+        self.known = None
+        self.fingerprints = None
+        if incremental:
+            self.fingerprints = ProjectFingerprints.load(ttl=timedelta(hours=ttl_hours))
+        else:
+            self.known = KnownKeys.load()
+        self.writer = project_writer(known=self.known)
+        self.queued = set()
+        self.unchanged = 0
+        self._seen_unchanged = []
+        self._lock = threading.Lock()
+
+    def wants(self, project):
+        with self._lock:
+            return self._wants(project)
+
+    def _wants(self, project):
+        rera_no = project["rera_no"]
+        if rera_no in self.queued:
+            return False
+
+        if self.incremental:
+            card_hash = card_fingerprint(project)
+            if not self.fingerprints.needs_refresh(rera_no, card_hash):
+                print(f"[=] Unchanged: {project['project_name']}")
+                self._seen_unchanged.append(rera_no)
+                return False
+        elif rera_no in self.known:
+            print(f"[!] Skipped (already exists): {project['project_name']}")
+            return False
+
+        self.queued.add(rera_no)
+        return True
+
+    def end_page(self):
+        """Record that this page's unchanged projects are still listed."""
+        with self._lock:
+            seen, self._seen_unchanged = self._seen_unchanged, []
+        if seen:
+            self.writer.touch(seen, last_seen=datetime.now(timezone.utc))
+            self.unchanged += len(seen)
@@ -1,235 +1,463 @@
-import os
-import time
+import argparse
+import queue
+import threading
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from db.database import SessionLocal
-from db.models import Project
-
-chrome_binary_path = os.getenv("CHROME_BINARY_PATH", "/usr/bin/google-chrome")
-chromedriver_path = os.getenv("CHROMEDRIVER_PATH", "/usr/local/bin/chromedriver")
+from db.checkpoints import finish_checkpoint, start_checkpoint
+from db.jobs import (
+    DuplicateJob,
+    JobHeartbeat,
+    JobProgress,
+    create_job,
+    find_resumable_job,
+    get_job,
+    update_job,
+)
+from db.promoters import PromoterResolver
+from scraper.browser import new_driver, transfer_summary
+from scraper.crawl_filter import CrawlFilter
+from scraper.driver_pool import POOL_SIZE, DriverPool
+from scraper.http_fetch import (
+    FETCH_MODE,
+    RERA_PAGE_URLS,
+    FetchUnavailable,
+    HttpFetcher,
+    build_session,
+    listing_page_url,
+)
+from scraper.parsers import (
+    BASE_URL,
+    PROMOTER_FIELDS,
+    parse_listing_html,
+    parse_promoter_html,
+    project_row,
+)
+from scraper.waits import (
+    dismiss_swal_if_present,
+    outer_html,
+    page_timer,
+    text_of,
+    wait_for_text_change,
+    wait_summary,
+    wait_until,
+)
+from telemetry.metrics import span, stage_summary, stage_totals
+from telemetry.profiling import profile_thread
+
+PROJECT_CARD_SELECTOR = "div.card.project-card.mb-3"
+FIRST_RERA_NO_SELECTOR = f"{PROJECT_CARD_SELECTOR} span.fw-bold"
+PROMOTER_SECTION_SELECTOR = "div.card-body"
+MAX_DETAIL_ATTEMPTS = 2
+CHECKPOINT_SOURCE = "rera"
 
 
 def get_driver():
-    options = Options()
-    options.binary_location = chrome_binary_path
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    service = Service(executable_path=chromedriver_path)
-    return webdriver.Chrome(service=service, options=options)
+    return new_driver()
 
 
 def scrape_promoter_details(driver):
-    wait = WebDriverWait(driver, 10)
-
     # 🔁 Try to click the "Promoter Details" tab
-    try:
-        promoter_tab = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, '//a[contains(text(),"Promoter Details")]')
+    with span("tab_click"):
+        try:
+            promoter_tab = wait_until(
+                driver,
+                EC.element_to_be_clickable(
+                    (By.XPATH, '//a[contains(text(),"Promoter Details")]')
+                ),
             )
-        )
-        driver.execute_script("arguments[0].click();", promoter_tab)
-        time.sleep(2)
-    except Exception as e:
-        print(f"[❌] Failed to click Promoter Details tab: {e}")
-        return {}
+            driver.execute_script("arguments[0].click();", promoter_tab)
+        except Exception as e:
+            print(f"[❌] Failed to click Promoter Details tab: {e}")
+            return {}
 
-    # ✅ Wait for promoter section to appear
-    try:
-        wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//label[contains(text(), "Company Name")]')
+        # ✅ Wait for promoter section to appear
+        try:
+            wait_until(
+                driver,
+                EC.presence_of_element_located(
+                    (By.XPATH, '//label[contains(text(), "Company Name")]')
+                ),
             )
-        )
-    except Exception as e:
-        print(f"[❌] Promoter details not loaded in time: {e}")
-        return {}
+        except Exception as e:
+            print(f"[❌] Promoter details not loaded in time: {e}")
+            return {}
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    promoter_section = soup.find("div", class_="card-body")
-    if not promoter_section:
+    # Only the promoter section crosses the wire, not the whole page.
+    with span("parse"):
+        promoter_details = parse_promoter_html(outer_html(driver, PROMOTER_SECTION_SELECTOR))
+    if not promoter_details:
         print("[❌] Promoter section not found.")
         return {}
 
-    def safe_get_text(label_name):
-        label = promoter_section.find("label", string=label_name)
-        if label:
-            strong = label.find_next("strong")
-            if strong:
-                return strong.get_text(strip=True)
-        return None
-
-    # 🔍 Extract each field clearly
-    fields = {
-        "company_name": "Company Name",
-        "registration_no": "Registration No.",
-        "correspondence_office_address": "Correspondence Office Address",
-        "registered_office_address": "Registered Office Address",
-        "entity": "Entity",
-        "email_id": "Email Id",
-        "mobile": "Mobile",
-        "telephone_no": "Telephone No.",
-        "gst_no": "GST No.",
-    }
-
-    promoter_details = {}
-    for key, label in fields.items():
-        value = safe_get_text(label)
-        if not value:
+    for key, label in PROMOTER_FIELDS.items():
+        if not promoter_details[key]:
             print(f"[⚠️] Missing: {label}")
-        promoter_details[key] = value
 
     return promoter_details
 
 
-def scrape_projects(pages=2):
-    driver = get_driver()
-    base_url = "https://rera.odisha.gov.in/projects/project-list"
-    driver.get(base_url)
-    time.sleep(4)
+def wait_for_project_cards(driver):
+    wait_until(
+        driver,
+        EC.presence_of_element_located((By.CSS_SELECTOR, PROJECT_CARD_SELECTOR)),
+    )
+
+
+def click_next_page(driver):
+    """Advance the listing by one page; returns False on the last page."""
+    with span("pagination"):
+        return _click_next_page(driver)
+
+
+def _click_next_page(driver):
+    # Wait until the pagination bar appears again
+    next_button = wait_until(
+        driver,
+        EC.presence_of_element_located((By.XPATH, '//button[@aria-label="Next"]')),
+    )
+
+    if "disabled" in next_button.get_attribute("class"):
+        return False
 
-    db = SessionLocal()
+    # The listing re-renders in place, so wait for the first card to change
+    # rather than sleeping after the click.
+    first_rera_no = text_of(driver, FIRST_RERA_NO_SELECTOR)
+    driver.execute_script("arguments[0].click();", next_button)
+    wait_for_text_change(driver, FIRST_RERA_NO_SELECTOR, first_rera_no)
+    return True
 
-    for page in range(1, pages + 1):
-        print(f"[📄] Scraping page {page}...")
 
-        # Handle modal after each page load
+def open_listing_page(driver, page):
+    """Open listing `page`; returns False if the listing has fewer pages."""
+    if RERA_PAGE_URLS and page > 1:
+        with span("navigation"):
+            driver.get(listing_page_url(page))
+            wait_for_project_cards(driver)
+        return True
+
+    with span("navigation"):
+        driver.get(BASE_URL)
+        wait_for_project_cards(driver)
+    for _ in range(page - 1):
         close_swal_modal_if_present(driver)
+        if not click_next_page(driver):
+            return False
+    return True
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        project_cards = soup.find_all("div", class_="card project-card mb-3")
 
-        for index, card in enumerate(project_cards[:2]):
-            try:
-                project_name = card.find("h5", class_="card-title").get_text(strip=True)
-                promoter_name = (
-                    card.find("small").get_text(strip=True).replace("by ", "")
-                )
-                address = (
-                    card.find("label", string="Address")
-                    .find_next("strong")
-                    .get_text(strip=True)
-                )
-                rera_no = card.find("span", class_="fw-bold").get_text(strip=True)
-
-                existing = db.query(Project).filter(Project.rera_no == rera_no).first()
-                if existing:
-                    print(f"[!] Skipped (already exists): {project_name}")
-                    continue
-
-                # Find "View Details" button via Selenium
-                project_elements = driver.find_elements(
-                    By.CSS_SELECTOR, "div.card.project-card.mb-3"
-                )
-                project_element = project_elements[index]
-
-                # 🔒 Handle modal if it appears before interaction
-                close_swal_modal_if_present(driver)
-
-                view_details_button = project_element.find_element(
-                    By.XPATH, './/a[contains(text(), "View Details")]'
-                )
-                driver.execute_script("arguments[0].click();", view_details_button)
-
-                # Wait for project detail tabs to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "li.nav-item"))
-                )
-
-                # 🔒 Handle modal again just in case it appears after navigation
-                close_swal_modal_if_present(driver)
-
-                # Scrape promoter details
-                promoter_details = scrape_promoter_details(driver)
-
-                project = Project(
-                    rera_no=rera_no,
-                    project_name=project_name,
-                    promoter_name=promoter_name,
-                    promoter_address=address,
-                    promoter_company_name=promoter_details.get("company_name"),
-                    promoter_registration_no=promoter_details.get("registration_no"),
-                    promoter_correspondence_office_address=promoter_details.get(
-                        "correspondence_office_address"
-                    ),
-                    promoter_registered_office_address=promoter_details.get(
-                        "registered_office_address"
-                    ),
-                    promoter_entity=promoter_details.get("entity"),
-                    promoter_email=promoter_details.get("email_id"),
-                    promoter_mobile=promoter_details.get("mobile"),
-                    promoter_telephone=promoter_details.get("telephone_no"),
-                    promoter_gst_no=promoter_details.get("gst_no"),
-                )
-                db.add(project)
-                db.commit()
-                print(f"[+] Inserted: {project_name}")
-
-                # Go back to listing
-                driver.back()
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "div.card.project-card.mb-3")
-                    )
-                )
-                time.sleep(2)
+def open_project_detail(driver, project):
+    # Includes replaying the listing's pagination for cards without a link
+    with span("navigation"):
+        _open_project_detail(driver, project)
 
-            except Exception as e:
-                print(f"[❌] Failed to process project '{project_name}': {e}")
+    # 🔒 Handle modal again just in case it appears after navigation
+    close_swal_modal_if_present(driver)
 
-        # Next page
-        try:
-            # Wait until the pagination bar appears again
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//button[@aria-label="Next"]')
-                )
-            )
-            next_button = driver.find_element(By.XPATH, '//button[@aria-label="Next"]')
 
-            if "disabled" in next_button.get_attribute("class"):
-                break
+def _open_project_detail(driver, project):
+    if project["detail_url"]:
+        driver.get(project["detail_url"])
+    else:
+        # No direct link: replay the listing up to the card and click through.
+        if not open_listing_page(driver, project["page"]):
+            raise RuntimeError(f"Listing has fewer than {project['page']} pages")
+        project_element = driver.find_elements(By.CSS_SELECTOR, PROJECT_CARD_SELECTOR)[
+            project["index"]
+        ]
 
-            driver.execute_script("arguments[0].click();", next_button)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "div.card.project-card.mb-3")
-                )
-            )
-            time.sleep(2)
-        except Exception as e:
-            print(f"[⚠️] Could not navigate to next page: {e}")
-            break
+        # 🔒 Handle modal if it appears before interaction
+        close_swal_modal_if_present(driver)
 
-    db.close()
-    driver.quit()
-    print("[✅] Scraping completed.")
+        view_details_button = project_element.find_element(
+            By.XPATH, './/a[contains(text(), "View Details")]'
+        )
+        driver.execute_script("arguments[0].click();", view_details_button)
 
+    # Wait for project detail tabs to load
+    wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "li.nav-item")))
 
-def close_swal_modal_if_present(driver, timeout=5):
+
+def fetch_promoter_details(pool, fetcher, project):
+    """Promoter details over HTTP when possible, otherwise through a pooled browser."""
+    if fetcher:
+        try:
+            return fetcher.fetch_promoter_details(project)
+        except FetchUnavailable as e:
+            if not pool:
+                raise
+            print(f"[🌐] HTTP fetch unavailable for {project['rera_no']}: {e}")
+
+    with pool.lease() as driver, page_timer(
+        f"Project {project['rera_no']}", driver
+    ):
+        open_project_detail(driver, project)
+        return scrape_promoter_details(driver)
+
+
+def resolve_promoter(pool, fetcher, promoters, project):
+    """Promoter record for a project, scraping the promoter tab only if its details are stale."""
+    name = project["promoter_name"]
+    with promoters.lock_for(name):
+        with span("promoter_lookup"):
+            record = promoters.fresh(name)
+        if record:
+            print(f"[♻️] Promoter cached: {name}")
+            return record
+        promoter_details = fetch_promoter_details(pool, fetcher, project)
+        with span("promoter_save"):
+            return promoters.save(name, promoter_details)
+
+
+def detail_worker(pool, fetcher, tasks, writer, progress, promoters, cancelled):
+    """Pull projects off the shared queue and link them to their promoter."""
+    with profile_thread():
+        _detail_worker(pool, fetcher, tasks, writer, progress, promoters, cancelled)
+
+
+def _detail_worker(pool, fetcher, tasks, writer, progress, promoters, cancelled):
+    while True:
+        project = tasks.get()
+        if project is None:
+            tasks.task_done()
+            break
+        if cancelled.is_set():
+            # Left unfinished, so the page is not checkpointed as done
+            tasks.task_done()
+            continue
+        try:
+            promoter = resolve_promoter(pool, fetcher, promoters, project)
+            writer.add(project_row(project, promoter))
+            print(f"[+] Scraped: {project['project_name']}")
+            progress.project_done(project["page"])
+        except Exception as e:
+            project["attempts"] = project.get("attempts", 0) + 1
+            if project["attempts"] < MAX_DETAIL_ATTEMPTS:
+                print(f"[🔁] Retrying '{project['project_name']}': {e}")
+                tasks.put(project)
+            else:
+                print(f"[❌] Failed to process project '{project['project_name']}': {e}")
+                progress.project_done(project["page"], failed=True)
+        finally:
+            tasks.task_done()
+
+
+def iter_listing_pages(pool, fetcher, pages, start_page=1):
+    """Yield (page, projects) over HTTP when possible, falling back to a browser."""
+    page = start_page
+    if fetcher:
+        try:
+            while page <= pages:
+                print(f"[📄] Fetching page {page}...")
+                projects = fetcher.fetch_listing(page)
+                if not projects:
+                    return
+                yield page, projects
+                page += 1
+            return
+        except FetchUnavailable as e:
+            if not pool:
+                raise
+            print(f"[🌐] HTTP listing unavailable on page {page}, using browser: {e}")
+
+    with pool.lease() as driver:
+        opened = False
+        while page <= pages:
+            print(f"[📄] Scraping page {page}...")
+            try:
+                with page_timer(f"Listing page {page}", driver):
+                    more = click_next_page(driver) if opened else open_listing_page(driver, page)
+                    opened = True
+                    if not more:
+                        print(f"[ℹ️] The listing ends before page {page}.")
+                        break
+
+                    # Handle modal after each page load
+                    close_swal_modal_if_present(driver)
+                    with span("parse"):
+                        projects = parse_listing_html(
+                            outer_html(driver, PROJECT_CARD_SELECTOR, all=True),
+                            driver.current_url,
+                        )
+            except Exception as e:
+                print(f"[⚠️] Could not navigate to page {page}: {e}")
+                raise
+
+            yield page, projects
+            page += 1
+
+
+def scrape_projects(
+    pages=2,
+    workers=None,
+    fetch_mode=FETCH_MODE,
+    incremental=False,
+    resume=False,
+    job_id=None,
+):
+    """
+    Walk `pages` listing pages and fan the new projects out to `workers`
+    threads (defaults to SCRAPER_CONCURRENCY) for detail scraping.
+
+    `fetch_mode` is "auto" (plain HTTP, Selenium as fallback), "http" or
+    "browser"; see scraper.http_fetch. With `incremental`, known projects
+    are also re-fetched when their card changed or their data went stale
+    (see scraper.crawl_filter).
+
+    Every run is a `CrawlJob` checkpointed after each completed page. Pass
+    `resume=True` to continue the last crashed or unfinished job, or
+    `job_id` to run a specific one (e.g. claimed by scraper.worker), from
+    the page after its checkpoint. The checkpointed page is read again
+    first, and scraped again if its first card moved since. The job
+    heartbeats while it runs and stops after the page in progress once it
+    is cancelled; Ctrl-C drops the projects still queued. Nothing starts
+    while another job for the source is queued or running.
+    """
+    job = get_job(job_id) if job_id is not None else None
+    if job is None and resume:
+        job = find_resumable_job(CHECKPOINT_SOURCE)
+    try:
+        if job:
+            job_id, pages, incremental = job.id, job.pages, job.incremental
+            start_page = job.current_page + 1
+            update_job(job_id, status="running", error=None)
+            print(f"[⏩] Job {job_id}: starting at page {start_page} of {pages}")
+            if job.cursor and job.current_page:
+                # Read the checkpointed page again to see if the listing moved.
+                start_page -= 1
+        else:
+            job_id = create_job(CHECKPOINT_SOURCE, pages, incremental)
+            start_page = 1
+            print(f"[🆕] Job {job_id}: scraping {pages} pages")
+    except DuplicateJob as e:
+        blocking = get_job(e.job_id)
+        state = blocking.status if blocking else "active"
+        if blocking and blocking.worker:
+            state += f" on {blocking.worker}"
+        print(
+            f"[⛔] Not starting: job {e.job_id} for {CHECKPOINT_SOURCE} is already {state}. "
+            "Cancel it or wait for it to finish."
+        )
+        return
+
+    size = workers or POOL_SIZE
+    fetcher = HttpFetcher(session=build_session(size)) if fetch_mode != "browser" else None
+    pool = None
+    if fetch_mode != "http":
+        pool = DriverPool(get_driver, size=size, warmup_url=BASE_URL)
+        if not fetcher:
+            pool.start()
+
+    wait_summary(reset=True)
+    transfer_summary(reset=True)
+    stages_before = stage_totals()
+    start_checkpoint(CHECKPOINT_SOURCE)
+    crawl_filter = CrawlFilter(incremental=incremental)
+    writer = crawl_filter.writer
+    progress = JobProgress(job_id, start_page, writer, job=job)
+    promoters = PromoterResolver()
+    heartbeat = JobHeartbeat(job_id)
+    tasks = queue.Queue()
+    threads = [
+        threading.Thread(
+            target=detail_worker,
+            args=(pool, fetcher, tasks, writer, progress, promoters, heartbeat.cancelled),
+            daemon=True,
+        )
+        for _ in range(size)
+    ]
+    for thread in threads:
+        thread.start()
+
+    heartbeat.start()
+    pages_done = 0
+    status, error = "completed", None
     try:
-        wait = WebDriverWait(driver, timeout)
-        modal_ok_button = wait.until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "button.swal2-confirm"))
+        for page, projects in iter_listing_pages(pool, fetcher, pages, start_page):
+            if heartbeat.cancelled.is_set():
+                print(f"[🛑] Job {job_id} cancelled before page {page}")
+                status = "cancelled"
+                break
+            listed = projects
+            if job and job.cursor and page == job.current_page:
+                if projects and projects[0]["rera_no"] == job.cursor:
+                    listed = []  # done before the restart
+                else:
+                    # Cards moved up from the next page would be skipped otherwise.
+                    print(f"[⚠️] Page {page} changed since its checkpoint, scraping it again")
+            for project in listed:
+                with span("crawl_filter"):
+                    wanted = crawl_filter.wants(project)
+                if wanted:
+                    project["page"] = page
+                    progress.project_queued(page)
+                    tasks.put(project)
+            crawl_filter.end_page()
+            progress.page_listed(page, projects[0]["rera_no"] if projects else None)
+            pages_done = page
+    except BaseException as e:
+        status, error = "failed", repr(e)
+        if not isinstance(e, Exception):
+            # Ctrl-C: workers drop the queued projects instead of scraping them.
+            heartbeat.cancelled.set()
+        raise
+    finally:
+        tasks.join()
+        for _ in threads:
+            tasks.put(None)
+        for thread in threads:
+            thread.join()
+        if pool:
+            pool.close()
+        writer.close()
+        heartbeat.stop()
+        progress.save(status=status, error=error)
+
+    totals = writer.totals
+    finish_checkpoint(
+        CHECKPOINT_SOURCE,
+        pages=pages_done,
+        refreshed=totals["inserted"] + totals["updated"],
+        unchanged=totals["unchanged"] + crawl_filter.unchanged,
+    )
+    print(
+        f"[💾] {totals['inserted']} inserted, {totals['updated']} updated, "
+        f"{totals['unchanged']} unchanged"
+    )
+    print(
+        f"[🏢] Promoters: {promoters.stats['saved']} saved, "
+        f"{promoters.stats['hits']} cache hits, {promoters.stats['misses']} DB lookups"
+    )
+    summary = wait_summary()
+    if summary["pages"]:
+        print(
+            f"[⏱️] {summary['pages']} browser pages in {summary['total']:.1f}s, "
+            f"{summary['wait_share']:.0%} of it waiting on the page"
+        )
+    transfer = transfer_summary()
+    if transfer["pages"]:
+        print(
+            f"[📶] {transfer['bytes'] / 1024 / 1024:.1f} MiB over {transfer['requests']} requests, "
+            f"{transfer['bytes_per_page'] / 1024:.0f} KiB per page"
         )
-        print("[⚠️] SweetAlert2 modal detected. Clicking OK...")
-        modal_ok_button.click()
+    stages = stage_summary(stages_before)
+    if stages:
+        print(
+            "[⏱️] Stages: "
+            + ", ".join(f"{stage} {seconds:.1f}s/{count}" for stage, (count, seconds) in stages.items())
+        )
+    print(f"[✅] Scraping {status}.")
+
 
-        # Optional: wait for modal to disappear
-        wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "swal2-popup")))
-        print("[✔️] Modal dismissed successfully.")
-        time.sleep(1)
-    except Exception as e:
-        print("[ℹ️] No modal present or already dismissed.")
+def close_swal_modal_if_present(driver, timeout=5):
+    return dismiss_swal_if_present(driver, timeout)
 
 
 if __name__ == "__main__":
-    scrape_projects(pages=2)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+    scrape_projects(pages=args.pages, incremental=args.incremental, resume=args.resume)
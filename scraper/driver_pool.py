@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+POOL_SIZE = int(os.getenv("SCRAPER_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "50"))
+DRIVER_MAX_AGE_SECONDS = int(os.getenv("DRIVER_MAX_AGE_SECONDS", "1800"))
+DRIVER_MAX_HEAP_MB = int(os.getenv("DRIVER_MAX_HEAP_MB", "512"))
+
+
+class PooledDriver:
+    """A Chrome driver plus the bookkeeping used to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+    def is_expired(self, max_uses, max_age):
+        return self.uses >= max_uses or time.monotonic() - self.created_at >= max_age
+
+    def is_healthy(self):
+        # A crashed browser raises here; a leaking one reports a bloated JS heap.
+        try:
+            heap = self.driver.execute_script(
+                "return (window.performance && performance.memory"
+                " && performance.memory.usedJSHeapSize) || 0;"
+            )
+        except Exception:
+            return False
+        return (heap or 0) / (1024 * 1024) < DRIVER_MAX_HEAP_MB
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    """
+    Fixed-size pool of reusable headless drivers.
+
+    Drivers are created lazily (or eagerly via `start()`), warmed up on
+    `warmup_url`, health-checked on every checkout and recycled once they
+    crash, exceed `max_uses` navigations or live longer than `max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        factory,
+        size=POOL_SIZE,
+        warmup_url=None,
+        max_uses=DRIVER_MAX_USES,
+        max_age=DRIVER_MAX_AGE_SECONDS,
+    ):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.warmup_url = warmup_url
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _spawn(self):
+        driver = self.factory()
+        if self.warmup_url:
+            try:
+                driver.get(self.warmup_url)
+            except Exception as e:
+                print(f"[⚠️] Driver warm-up failed: {e}")
+        return PooledDriver(driver)
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _free_slot(self):
+        with self._lock:
+            self._created -= 1
+
+    def start(self):
+        """Create and warm up every driver in parallel."""
+        threads = []
+        for _ in range(self.size):
+            if not self._reserve_slot():
+                break
+            threads.append(threading.Thread(target=self._start_one, daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"[🚀] Driver pool ready ({self._idle.qsize()}/{self.size} warm)")
+
+    def _start_one(self):
+        try:
+            self._idle.put(self._spawn())
+        except Exception as e:
+            self._free_slot()
+            print(f"[❌] Failed to start driver: {e}")
+
+    def acquire(self, timeout=None):
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                try:
+                    pooled = self._spawn()
+                except Exception:
+                    self._free_slot()
+                    raise
+            else:
+                pooled = self._idle.get(timeout=timeout)
+
+        if pooled.is_expired(self.max_uses, self.max_age) or not pooled.is_healthy():
+            print(f"[♻️] Recycling driver after {pooled.uses} uses")
+            pooled.quit()
+            try:
+                pooled = self._spawn()
+            except Exception:
+                self._free_slot()
+                raise
+
+        pooled.uses += 1
+        return pooled
+
+    def release(self, pooled, broken=False):
+        if broken or self._closed:
+            pooled.quit()
+            self._free_slot()
+            return
+        self._idle.put(pooled)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Check out a driver; it is recycled if it died while in use."""
+        pooled = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not pooled.is_healthy()
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            pooled.quit()
+            self._free_slot()
@@ -0,0 +1,294 @@
+"""
+asyncio scraping engine: fetch -> parse -> persist with bounded stages.
+
+    python -m scraper.engine rera --pages 5
+    python -m scraper.engine olx --query car-cover --query bike-cover
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from scraper.http_fetch import USER_AGENT
+
+MAX_IN_FLIGHT = int(os.getenv("ENGINE_MAX_IN_FLIGHT", "100"))
+HOST_RATE = float(os.getenv("ENGINE_HOST_RATE", "2"))  # requests/second per host
+HOST_BURST = int(os.getenv("ENGINE_HOST_BURST", "5"))
+MAX_RETRIES = int(os.getenv("ENGINE_MAX_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = float(os.getenv("ENGINE_BACKOFF_BASE_SECONDS", "1"))
+STAGE_QUEUE_SIZE = int(os.getenv("ENGINE_STAGE_QUEUE_SIZE", "200"))
+PERSIST_BATCH_SIZE = int(os.getenv("ENGINE_PERSIST_BATCH_SIZE", "100"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Request:
+    def __init__(self, url, source, callback=None, params=None, meta=None):
+        self.url = url
+        self.source = source
+        self.callback = callback or source.parse
+        self.params = params
+        self.meta = meta or {}
+        self.attempts = 0
+
+    @property
+    def host(self):
+        return urlsplit(self.url).netloc
+
+
+class Source:
+    """
+    A site plugin. `start_requests()` seeds the crawl, callbacks turn a
+    response into follow-up `Request`s and item dicts, and `persist()` stores
+    a batch of items (it runs in a worker thread, so it may block).
+    """
+
+    name = "source"
+    host_rate = None
+    host_burst = None
+
+    def start_requests(self):
+        return []
+
+    def parse(self, request, response):
+        return []
+
+    def persist(self, items):
+        pass
+
+    def close(self):
+        pass
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, honouring a server Retry-After."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, BACKOFF_BASE_SECONDS * 2**attempt)
+
+
+class Engine:
+    def __init__(
+        self,
+        sources,
+        max_in_flight=MAX_IN_FLIGHT,
+        host_rate=HOST_RATE,
+        host_burst=HOST_BURST,
+        max_retries=MAX_RETRIES,
+        queue_size=STAGE_QUEUE_SIZE,
+        batch_size=PERSIST_BATCH_SIZE,
+        parse_workers=None,
+    ):
+        self.sources = sources
+        self.max_in_flight = max_in_flight
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.parse_workers = parse_workers or min(8, os.cpu_count() or 1)
+        self.buckets = {}
+        self._retries = set()
+        self.stats = {"fetched": 0, "retried": 0, "failed": 0, "items": 0}
+
+    def _bucket(self, request):
+        bucket = self.buckets.get(request.host)
+        if bucket is None:
+            rate = request.source.host_rate or self.host_rate
+            burst = request.source.host_burst or self.host_burst
+            bucket = self.buckets[request.host] = TokenBucket(rate, burst)
+        return bucket
+
+    async def run(self):
+        # The frontier is unbounded (requests are tiny and parse workers must
+        # never block on it); responses and items flow through bounded queues,
+        # so a slow parser or database stalls the fetchers instead of memory.
+        self.frontier = asyncio.Queue()
+        self.responses = asyncio.Queue(maxsize=self.queue_size)
+        self.items = asyncio.Queue(maxsize=self.queue_size)
+        # Requests scheduled but not yet parsed (or given up on)
+        self.pending = 0
+        self.idle = asyncio.Event()
+
+        for source in self.sources:
+            for request in source.start_requests():
+                self._schedule(request)
+        if not self.pending:
+            self.idle.set()
+
+        started = time.monotonic()
+        limits = httpx.Limits(
+            max_connections=self.max_in_flight,
+            max_keepalive_connections=self.max_in_flight,
+        )
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(30.0),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        ) as client:
+            workers = [
+                asyncio.create_task(self._fetch_worker(client))
+                for _ in range(self.max_in_flight)
+            ]
+            workers += [
+                asyncio.create_task(self._parse_worker())
+                for _ in range(self.parse_workers)
+            ]
+            workers.append(asyncio.create_task(self._persist_worker()))
+
+            # Parsing can schedule more requests, so the crawl is only over
+            # once every request has been parsed; then drain the items.
+            await self.idle.wait()
+            await self.items.join()
+
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        for source in self.sources:
+            source.close()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"[✅] Engine finished in {elapsed:.1f}s: {self.stats['fetched']} fetched, "
+            f"{self.stats['retried']} retried, {self.stats['failed']} failed, "
+            f"{self.stats['items']} items"
+        )
+        return self.stats
+
+    def _schedule(self, request):
+        self.pending += 1
+        self.idle.clear()
+        self.frontier.put_nowait(request)
+
+    def _finish(self):
+        self.pending -= 1
+        if not self.pending:
+            self.idle.set()
+
+    async def _fetch_worker(self, client):
+        while True:
+            request = await self.frontier.get()
+            await self._bucket(request).acquire()
+            request.attempts += 1
+            retry_after = None
+            try:
+                response = await client.get(request.url, params=request.params)
+                error = None
+                if response.status_code in RETRY_STATUSES:
+                    retry_after = response.headers.get("Retry-After")
+                    error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                response, error = None, str(e) or type(e).__name__
+
+            if error is None:
+                self.stats["fetched"] += 1
+                await self.responses.put((request, response))
+            elif request.attempts <= self.max_retries:
+                self.stats["retried"] += 1
+                delay = backoff_delay(request.attempts, retry_after)
+                print(f"[🔁] {request.url} ({error}), retrying in {delay:.1f}s")
+                task = asyncio.create_task(self._requeue(request, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+            else:
+                self.stats["failed"] += 1
+                print(f"[❌] Giving up on {request.url}: {error}")
+                self._finish()
+
+    async def _requeue(self, request, delay):
+        await asyncio.sleep(delay)
+        self.frontier.put_nowait(request)
+
+    async def _parse_worker(self):
+        while True:
+            request, response = await self.responses.get()
+            try:
+                results = await asyncio.to_thread(
+                    lambda: list(request.callback(request, response) or [])
+                )
+                for result in results:
+                    if isinstance(result, Request):
+                        self._schedule(result)
+                    else:
+                        await self.items.put((request.source, result))
+            except Exception as e:
+                print(f"[❌] Failed to parse {request.url}: {e}")
+            finally:
+                self._finish()
+
+    async def _persist_worker(self):
+        while True:
+            batch = [await self.items.get()]
+            while len(batch) < self.batch_size and not self.items.empty():
+                batch.append(self.items.get_nowait())
+
+            by_source = {}
+            for source, item in batch:
+                by_source.setdefault(source, []).append(item)
+            for source, items in by_source.items():
+                try:
+                    await asyncio.to_thread(source.persist, items)
+                    self.stats["items"] += len(items)
+                except Exception as e:
+                    print(f"[❌] {source.name} failed to persist {len(items)} items: {e}")
+
+            for _ in batch:
+                self.items.task_done()
+
+
+def run_sources(sources, **engine_options):
+    return asyncio.run(Engine(sources, **engine_options).run())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", choices=("rera", "olx"))
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--query", action="append")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    if args.source == "rera":
+        from scraper.sources.rera import ReraSource
+
+        source = ReraSource(pages=args.pages)
+    else:
+        from scraper.sources.olx import OlxSource
+
+        source = OlxSource(queries=args.query or ["car-cover"])
+
+    run_sources([source], max_in_flight=args.max_in_flight)
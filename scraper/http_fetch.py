@@ -0,0 +1,138 @@
+import os
+from urllib.parse import quote, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scraper.parsers import (
+    BASE_URL,
+    parse_listing_html,
+    parse_listing_json,
+    parse_promoter_html,
+    parse_promoter_json,
+)
+from telemetry.metrics import span
+
+# auto: HTTP first, Selenium as fallback | http: never open a browser | browser: Selenium only
+FETCH_MODE = os.getenv("SCRAPER_FETCH_MODE", "auto")
+RERA_LISTING_URL = os.getenv("RERA_LISTING_URL", BASE_URL)
+RERA_PAGE_PARAM = os.getenv("RERA_PAGE_PARAM", "page")
+# Set to 1 if the browser listing honours RERA_PAGE_PARAM, so a resumed crawl
+# can open page N directly instead of clicking "Next" N-1 times.
+RERA_PAGE_URLS = os.getenv("RERA_PAGE_URLS", "0") == "1"
+# Optional JSON/HTML endpoint for promoter data, e.g. ".../api/promoter?rera_no={rera_no}"
+RERA_PROMOTER_URL = os.getenv("RERA_PROMOTER_URL")
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+)
+
+
+class FetchUnavailable(Exception):
+    """The data could not be read without a browser (JS shell, HTTP error, ...)."""
+
+
+def build_session(pool_size=HTTP_POOL_SIZE):
+    """Keep-alive session with a connection pool sized for the worker threads."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(
+        {"User-Agent": USER_AGENT, "Accept": "application/json, text/html;q=0.9"}
+    )
+    return session
+
+
+def is_json(response):
+    return "json" in response.headers.get("Content-Type", "")
+
+
+def listing_page_url(page, listing_url=RERA_LISTING_URL, page_param=RERA_PAGE_PARAM):
+    parts = urlsplit(listing_url)
+    query = "&".join(filter(None, [parts.query, urlencode({page_param: page})]))
+    return urlunsplit(parts._replace(query=query))
+
+
+def promoter_url_for(project, template=RERA_PROMOTER_URL):
+    """URL holding a project's promoter details, or None if only a browser can reach it."""
+    if template:
+        return template.format(rera_no=quote(project["rera_no"], safe=""))
+    return project.get("detail_url")
+
+
+class HttpFetcher:
+    """Reads RERA listing and promoter data over plain HTTP."""
+
+    def __init__(
+        self,
+        session=None,
+        listing_url=RERA_LISTING_URL,
+        promoter_url=RERA_PROMOTER_URL,
+        page_param=RERA_PAGE_PARAM,
+        timeout=HTTP_TIMEOUT_SECONDS,
+    ):
+        self.session = session or build_session()
+        self.listing_url = listing_url
+        self.promoter_url = promoter_url
+        self.page_param = page_param
+        self.timeout = timeout
+        self._last_listing = None
+
+    def _get(self, url, params=None):
+        try:
+            with span("http_fetch"):
+                response = self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise FetchUnavailable(str(e)) from e
+        if response.status_code != 200:
+            raise FetchUnavailable(f"HTTP {response.status_code} for {url}")
+        return response
+
+    def fetch_listing(self, page):
+        """Projects on listing `page`; [] once the listing runs out of pages."""
+        response = self._get(self.listing_url, params={self.page_param: page})
+        with span("parse"):
+            if is_json(response):
+                return parse_listing_json(response.json(), base_url=response.url)
+            projects = parse_listing_html(response.text, base_url=response.url)
+        if not projects:
+            if page > 1 and self._last_listing:
+                # Earlier pages had cards over HTTP, so this one is past the end.
+                return []
+            raise FetchUnavailable(f"No project cards in the HTML for page {page}")
+
+        # A server that ignores the page parameter keeps returning page 1.
+        rera_nos = [p["rera_no"] for p in projects]
+        if page > 1 and rera_nos == self._last_listing:
+            raise FetchUnavailable(f"Listing ignored {self.page_param}={page}")
+        self._last_listing = rera_nos
+        return projects
+
+    def fetch_promoter_details(self, project):
+        url = promoter_url_for(project, self.promoter_url)
+        if not url:
+            raise FetchUnavailable(f"No detail URL for {project['rera_no']}")
+
+        response = self._get(url)
+        with span("parse"):
+            if is_json(response):
+                details = parse_promoter_json(response.json())
+            else:
+                details = parse_promoter_html(response.text)
+
+        if not any(details.values()):
+            raise FetchUnavailable(f"No promoter details at {url}")
+        return details
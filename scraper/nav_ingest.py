@@ -0,0 +1,307 @@
+"""
+Streaming AMFI NAV ingest into the `scheme_nav` table.
+
+    python -m scraper.nav_ingest                      # download NAVAll.txt
+    python -m scraper.nav_ingest --file NAVAll.txt    # a saved copy
+
+The feed is read line by line and never held in memory. On PostgreSQL the
+rows are COPYed into a temporary staging table and upserted from there on
+(scheme_code, nav_date); other databases get batched upserts. The same
+transaction creates any missing monthly partitions and moves
+`scheme_nav_latest` forward (see db.nav_store).
+"""
+
+import argparse
+import csv
+import io
+import os
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+import requests
+from sqlalchemy import select, text, tuple_
+
+from db.database import SessionLocal
+from db.generations import NAV, bump_generation
+from db.models import SchemeNav
+from db.nav_store import archived_until, ensure_partitions, refresh_latest
+from db.writer import upsert_statement
+from scraper.http_fetch import HTTP_TIMEOUT_SECONDS, USER_AGENT
+
+AMFI_NAV_URL = os.getenv("AMFI_NAV_URL", "https://www.amfiindia.com/spages/NAVAll.txt")
+NAV_BATCH_SIZE = int(os.getenv("NAV_BATCH_SIZE", "5000"))  # non-PostgreSQL upserts
+
+NAV_COLUMNS = (
+    "scheme_code",
+    "isin_growth",
+    "isin_reinvestment",
+    "scheme_name",
+    "nav",
+    "nav_date",
+    "fund_house",
+    "category",
+)
+NAV_KEY = ("scheme_code", "nav_date")
+NAV_COMPARE_COLUMNS = [c for c in NAV_COLUMNS if c not in NAV_KEY]
+NAV_UPDATE_COLUMNS = NAV_COMPARE_COLUMNS + ["ingested_at"]
+
+
+def _isin(value):
+    value = value.strip()
+    return value if value and value != "-" else None
+
+
+def parse_nav_lines(lines, stats=None):
+    """
+    Yield `scheme_nav` rows from NAVAll.txt lines. Data lines are
+    `code;isin growth;isin reinvestment;name;nav;dd-Mon-yyyy`; the headings
+    between them name the scheme category and then the fund house.
+    Lines without a usable NAV or date (e.g. "N.A.") are counted as skipped.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("rows", 0)
+    stats.setdefault("skipped", 0)
+    category = fund_house = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        fields = line.split(";")
+        if len(fields) < 6:
+            if "Schemes(" in line:
+                category, fund_house = line, None
+            else:
+                fund_house = line
+            continue
+        if not fields[0].strip().isdigit():
+            continue  # column header
+
+        try:
+            nav = Decimal(fields[4].strip())
+            nav_date = datetime.strptime(fields[5].strip(), "%d-%b-%Y").date()
+        except (InvalidOperation, ValueError):
+            stats["skipped"] += 1
+            continue
+        if not nav.is_finite():
+            stats["skipped"] += 1
+            continue
+
+        stats["rows"] += 1
+        yield {
+            "scheme_code": int(fields[0]),
+            "isin_growth": _isin(fields[1]),
+            "isin_reinvestment": _isin(fields[2]),
+            "scheme_name": fields[3].strip(),
+            "nav": nav,
+            "nav_date": nav_date,
+            "fund_house": fund_house,
+            "category": category,
+        }
+
+
+def current_rows(rows, stats, until=None):
+    """
+    Drop rows for months already archived (dated before `until`) and note
+    the first and last NAV date seen.
+    """
+    for row in rows:
+        if until and row["nav_date"] < until:
+            stats["archived"] = stats.get("archived", 0) + 1
+            continue
+        day = row["nav_date"]
+        if "first_date" not in stats or day < stats["first_date"]:
+            stats["first_date"] = day
+        if "last_date" not in stats or day > stats["last_date"]:
+            stats["last_date"] = day
+        yield row
+
+
+class CsvStream(io.TextIOBase):
+    """Read-only file over rows rendered as CSV on demand, for COPY FROM STDIN."""
+
+    def __init__(self, rows, columns=NAV_COLUMNS):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def readable(self):
+        return True
+
+    def _next_line(self):
+        row = next(self._rows, None)
+        if row is None:
+            return ""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(
+            ["" if row[c] is None else row[c] for c in self._columns]
+        )
+        return self._buffer.getvalue()
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            line = self._next_line()
+            if not line:
+                break
+            self._pending += line
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def readline(self, size=-1):
+        return self._next_line()
+
+
+def _copy_upsert(session, rows):
+    """COPY rows into a temp staging table, then upsert the changed ones."""
+    columns = ", ".join(NAV_COLUMNS)
+    session.execute(
+        text(
+            "CREATE TEMP TABLE scheme_nav_staging "
+            "(LIKE scheme_nav INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY scheme_nav_staging ({columns}) FROM STDIN WITH (FORMAT csv)",
+            CsvStream(rows),
+        )
+    finally:
+        cursor.close()
+
+    first, last = session.execute(
+        text("SELECT min(nav_date), max(nav_date) FROM scheme_nav_staging")
+    ).one()
+    if first is not None:
+        ensure_partitions(session, first, last)
+
+    # Partitioned tables can't RETURN xmax to tell inserts from updates, so
+    # new keys are counted first.
+    inserted = session.execute(
+        text(
+            """
+            SELECT count(*) FROM (
+                SELECT DISTINCT scheme_code, nav_date FROM scheme_nav_staging
+            ) AS incoming
+            WHERE NOT EXISTS (
+                SELECT 1 FROM scheme_nav
+                WHERE scheme_nav.scheme_code = incoming.scheme_code
+                AND scheme_nav.nav_date = incoming.nav_date
+            )
+            """
+        )
+    ).scalar()
+
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in NAV_UPDATE_COLUMNS)
+    current = ", ".join(f"scheme_nav.{c}" for c in NAV_COMPARE_COLUMNS)
+    incoming = ", ".join(f"EXCLUDED.{c}" for c in NAV_COMPARE_COLUMNS)
+    changed = session.execute(
+        text(
+            f"""
+            INSERT INTO scheme_nav ({columns}, ingested_at)
+            SELECT DISTINCT ON (scheme_code, nav_date) {columns}, now()
+            FROM scheme_nav_staging
+            ORDER BY scheme_code, nav_date
+            ON CONFLICT (scheme_code, nav_date) DO UPDATE SET {updates}
+            WHERE ({current}) IS DISTINCT FROM ({incoming})
+            """
+        )
+    ).rowcount
+    updated = changed - inserted
+    return inserted, updated
+
+
+def _batched_upsert(session, rows, batch_size=NAV_BATCH_SIZE):
+    dialect = session.get_bind().dialect.name
+    inserted = changed = 0
+    batch = []
+    for row in rows:
+        batch.append({**row, "ingested_at": datetime.now(timezone.utc)})
+        if len(batch) >= batch_size:
+            new, count = _upsert_batch(session, dialect, batch)
+            inserted, changed = inserted + new, changed + count
+            batch = []
+    if batch:
+        new, count = _upsert_batch(session, dialect, batch)
+        inserted, changed = inserted + new, changed + count
+    return inserted, changed - inserted
+
+
+def _upsert_batch(session, dialect, batch):
+    """Upsert one batch; returns (new keys, rows inserted or changed)."""
+    keys = {(row["scheme_code"], row["nav_date"]) for row in batch}
+    existing = session.execute(
+        select(SchemeNav.scheme_code, SchemeNav.nav_date).where(
+            tuple_(SchemeNav.scheme_code, SchemeNav.nav_date).in_(keys)
+        )
+    ).all()
+    result = session.execute(
+        upsert_statement(
+            dialect, SchemeNav, batch, NAV_KEY, NAV_UPDATE_COLUMNS, NAV_COMPARE_COLUMNS
+        )
+    )
+    return len(keys - set(map(tuple, existing))), result.rowcount
+
+
+def ingest_nav_lines(lines, session_factory=SessionLocal):
+    """Parse and upsert NAV lines in one transaction; returns the counters."""
+    stats = {}
+    started = time.monotonic()
+    session = session_factory()
+    try:
+        rows = current_rows(parse_nav_lines(lines, stats), stats, archived_until(session))
+        if session.get_bind().dialect.name == "postgresql":
+            inserted, updated = _copy_upsert(session, rows)
+        else:
+            inserted, updated = _batched_upsert(session, rows)
+        stats["inserted"], stats["updated"] = inserted, updated
+        stats["changed"] = inserted + updated
+        if stats["changed"]:
+            refresh_latest(session, stats["first_date"], stats["last_date"])
+            bump_generation(session, NAV)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    stats["seconds"] = round(time.monotonic() - started, 2)
+    print(
+        f"[💹] NAV ingest: {stats['rows']} rows, {stats['skipped']} skipped, "
+        f"{stats['changed']} new or changed in {stats['seconds']}s"
+    )
+    return stats
+
+
+def ingest_nav(url=AMFI_NAV_URL, timeout=HTTP_TIMEOUT_SECONDS):
+    """Stream the AMFI NAV feed at `url` into `scheme_nav`."""
+    with requests.get(
+        url, stream=True, timeout=timeout, headers={"User-Agent": USER_AGENT}
+    ) as response:
+        response.raise_for_status()
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        return ingest_nav_lines(response.iter_lines(decode_unicode=True))
+
+
+def ingest_nav_file(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return ingest_nav_lines(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=AMFI_NAV_URL)
+    parser.add_argument("--file", help="ingest a saved NAVAll.txt instead")
+    args = parser.parse_args()
+
+    if args.file:
+        ingest_nav_file(args.file)
+    else:
+        ingest_nav(args.url)
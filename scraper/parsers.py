@@ -0,0 +1,234 @@
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+BASE_URL = "https://rera.odisha.gov.in/projects/project-list"
+
+# Promoter detail field -> label shown on the "Promoter Details" tab
+PROMOTER_FIELDS = {
+    "company_name": "Company Name",
+    "registration_no": "Registration No.",
+    "correspondence_office_address": "Correspondence Office Address",
+    "registered_office_address": "Registered Office Address",
+    "entity": "Entity",
+    "email_id": "Email Id",
+    "mobile": "Mobile",
+    "telephone_no": "Telephone No.",
+    "gst_no": "GST No.",
+}
+
+# Key spellings seen in (or expected from) the site's JSON payloads, compared
+# after lower-casing and dropping everything but letters and digits.
+PROMOTER_JSON_KEYS = {
+    "company_name": ("companyname", "promotercompanyname", "promotername"),
+    "registration_no": ("registrationno", "registrationnumber", "regno"),
+    "correspondence_office_address": (
+        "correspondenceofficeaddress",
+        "correspondenceaddress",
+    ),
+    "registered_office_address": ("registeredofficeaddress", "registeredaddress"),
+    "entity": ("entity", "entitytype", "promotertype"),
+    "email_id": ("emailid", "email"),
+    "mobile": ("mobile", "mobileno", "mobilenumber"),
+    "telephone_no": ("telephoneno", "telephone", "phone"),
+    "gst_no": ("gstno", "gstnumber", "gstin"),
+}
+
+PROJECT_JSON_KEYS = {
+    "project_name": ("projectname", "name"),
+    "promoter_name": ("promotername", "promoter"),
+    "address": ("address", "projectaddress", "district"),
+    "rera_no": ("rerano", "reraregistrationno", "projectregistrationno"),
+    "detail_url": ("detailurl", "url", "link"),
+}
+
+
+# Listing-card fields that feed the card fingerprint
+CARD_FIELDS = ("project_name", "promoter_name", "address", "rera_no")
+
+
+def _normalise_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _map_json(record, key_map):
+    normalised = {_normalise_key(k): v for k, v in record.items()}
+    mapped = {}
+    for field, aliases in key_map.items():
+        value = next((normalised[a] for a in aliases if normalised.get(a)), None)
+        mapped[field] = str(value).strip() if value is not None else None
+    return mapped
+
+
+def _json_records(payload):
+    """Find the list of records in a JSON payload, however deeply it is wrapped."""
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in ("data", "results", "items", "projects", "records"):
+            if key in payload:
+                return _json_records(payload[key])
+    return []
+
+
+def _text(element):
+    """Stripped text of every descendant string, joined like bs4's get_text(strip=True)."""
+    return "".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# Compiled once; each is evaluated against a single card or section.
+PROJECT_CARDS = etree.XPath(
+    f'//div[{_has_class("card")} and {_has_class("project-card")} and {_has_class("mb-3")}]'
+)
+CARD_TITLE = etree.XPath(f'.//h5[{_has_class("card-title")}]')
+CARD_PROMOTER = etree.XPath(".//small")
+CARD_ADDRESS = etree.XPath('.//label[normalize-space()="Address"]/following::strong[1]')
+CARD_RERA_NO = etree.XPath(f'.//span[{_has_class("fw-bold")}]')
+CARD_DETAILS_HREF = etree.XPath('.//a[contains(., "View Details")]/@href')
+PROMOTER_SECTION = etree.XPath(f'(//div[{_has_class("card-body")}])[1]')
+NEXT_STRONG = etree.XPath("following::strong[1]")
+PROMOTER_LABELS = {label: key for key, label in PROMOTER_FIELDS.items()}
+
+
+def parse_html(html):
+    """lxml tree of a whole page or of a fragment (e.g. a card's outerHTML); None if empty."""
+    if not html or not html.strip():
+        return None
+    return lxml.html.fromstring(html)
+
+
+def parse_project_card(card, base_url=BASE_URL):
+    project_name = _text(CARD_TITLE(card)[0])
+    promoter_name = _text(CARD_PROMOTER(card)[0]).replace("by ", "")
+    address = _text(CARD_ADDRESS(card)[0])
+    rera_no = _text(CARD_RERA_NO(card)[0])
+
+    # Follow the "View Details" link directly when it is a real URL, so any
+    # pooled driver can open the project without replaying the listing.
+    detail_url = None
+    hrefs = CARD_DETAILS_HREF(card)
+    href = hrefs[0] if hrefs else None
+    if href and not href.startswith(("#", "javascript")):
+        detail_url = urljoin(base_url, href)
+
+    return {
+        "project_name": project_name,
+        "promoter_name": promoter_name,
+        "address": address,
+        "rera_no": rera_no,
+        "detail_url": detail_url,
+    }
+
+
+def parse_listing_html(html, base_url=BASE_URL):
+    """
+    Parse every project card on a listing page, skipping malformed ones.
+    `html` may be the whole page or just the cards' outerHTML.
+    """
+    root = parse_html(html)
+    if root is None:
+        return []
+    projects = []
+    for index, card in enumerate(PROJECT_CARDS(root)):
+        try:
+            project = parse_project_card(card, base_url)
+        except Exception as e:
+            print(f"[❌] Failed to parse card: {e}")
+            continue
+        # Position on the page, needed to click through when there is no URL
+        project["index"] = index
+        projects.append(project)
+    return projects
+
+
+def parse_listing_json(payload, base_url=BASE_URL):
+    projects = []
+    for index, record in enumerate(_json_records(payload)):
+        project = _map_json(record, PROJECT_JSON_KEYS)
+        if not project["rera_no"] or not project["project_name"]:
+            continue
+        if project["detail_url"]:
+            project["detail_url"] = urljoin(base_url, project["detail_url"])
+        project["index"] = index
+        projects.append(project)
+    return projects
+
+
+def parse_promoter_html(html):
+    """
+    Extract PROMOTER_FIELDS from the promoter tab (the whole page or the
+    section's outerHTML) in one pass over its labels; {} if not rendered.
+    """
+    root = parse_html(html)
+    section = PROMOTER_SECTION(root) if root is not None else None
+    if not section:
+        return {}
+
+    details = dict.fromkeys(PROMOTER_FIELDS)
+    seen = set()
+    for label in section[0].iter("label"):
+        key = PROMOTER_LABELS.get(_text(label))
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        value = label.getnext()
+        if value is None or value.tag != "strong":
+            following = NEXT_STRONG(label)
+            value = following[0] if following else None
+        if value is not None:
+            details[key] = _text(value)
+    return details
+
+
+def parse_promoter_json(payload):
+    if isinstance(payload, dict):
+        for key in ("promoter", "promoterDetails", "data"):
+            if isinstance(payload.get(key), dict):
+                return parse_promoter_json(payload[key])
+    if not isinstance(payload, dict):
+        return {}
+    return _map_json(payload, PROMOTER_JSON_KEYS)
+
+
+def fingerprint(values):
+    """Stable SHA-256 of a dict of scraped values."""
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def card_fingerprint(project):
+    """Hash of what the listing card shows; a change means the detail page may have changed."""
+    return fingerprint({field: project.get(field) for field in CARD_FIELDS})
+
+
+def project_row(project, promoter=None):
+    """
+    Column values for a `Project` row from a listing card and its promoter's
+    record (see db.promoters.PromoterResolver). The content hash covers the
+    promoter's details too, so a changed email or GST number counts as a
+    change to the project.
+    """
+    row = {
+        "rera_no": project["rera_no"],
+        "project_name": project["project_name"],
+        "promoter_address": project["address"],
+        "promoter_id": promoter["id"] if promoter else None,
+    }
+    details = promoter["details"] if promoter else None
+    now = datetime.now(timezone.utc)
+    row.update(
+        card_hash=card_fingerprint(project),
+        content_hash=fingerprint({**row, "promoter": details}),
+        last_seen=now,
+        last_fetched=now,
+    )
+    return row
@@ -1,81 +1,50 @@
-import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from db.promoters import PromoterResolver
+from db.writer import project_writer
+from scraper.browser import new_driver
+from scraper.parsers import BASE_URL, parse_listing_html, project_row
+from scraper.waits import outer_html, wait_until
 
-from db.database import SessionLocal
-from db.models import Project
-
-chrome_binary_path = "/home/jay-dave/chrome114/chrome-linux64/chrome"
-chromedriver_path = "/home/jay-dave/chromedriver114/chromedriver"
-
-options = Options()
-options.binary_location = chrome_binary_path
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-
-service = Service(executable_path=chromedriver_path)
-driver = webdriver.Chrome(service=service, options=options)
+PROJECT_CARD_SELECTOR = "div.card.project-card.mb-3"
 
 
 def get_driver():
-    chrome_binary_path = "/home/jay-dave/chrome114/chrome-linux64/chrome"
-    chromedriver_path = "/home/jay-dave/chromedriver114/chromedriver"
-
-    options = Options()
-    options.binary_location = chrome_binary_path
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    service = Service(executable_path=chromedriver_path)
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    return new_driver()
 
 
 def scrape_projects():
     driver = get_driver()
-    driver.get("https://rera.odisha.gov.in/projects/project-list")
-
-    time.sleep(3)  # wait for JS to render
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    project_cards = soup.find_all("div", class_="card project-card mb-3")[:6]
-
-    db = SessionLocal()
-    for card in project_cards:
-        try:
-            project_name = card.find("h5", class_="card-title").get_text(strip=True)
-            promoter_name = card.find("small").get_text(strip=True).replace("by ", "")
-            address = (
-                card.find("label", string="Address")
-                .find_next("strong")
-                .get_text(strip=True)
-            )
-            rera_no = card.find("span", class_="fw-bold").get_text(strip=True)
-
-            project = Project(
-                rera_no=rera_no,
-                project_name=project_name,
-                promoter_name=promoter_name,
-                promoter_address=address,
-            )
-
-            # Check duplicate by RERA No
-            existing = db.query(Project).filter(Project.rera_no == rera_no).first()
-            if not existing:
-                db.add(project)
-                print(f"[+] Inserted: {project_name}")
-            else:
-                print(f"[!] Skipped (already exists): {project_name}")
-        except Exception as e:
-            print(f"[❌] Failed to parse card: {e}")
-    db.commit()
-    db.close()
-    driver.quit()
+    try:
+        driver.get(BASE_URL)
+
+        # wait for JS to render the cards
+        wait_until(
+            driver,
+            EC.presence_of_element_located((By.CSS_SELECTOR, PROJECT_CARD_SELECTOR)),
+        )
+        projects = parse_listing_html(
+            outer_html(driver, PROJECT_CARD_SELECTOR, all=True), driver.current_url
+        )[:6]
+    finally:
+        driver.quit()
+
+    # Cards only name the promoter: link to the known row, or a bare one
+    # whose details the detail scraper fills in later.
+    promoters = PromoterResolver()
+    writer = project_writer()
+    for project in projects:
+        name = project["promoter_name"]
+        promoter = promoters.lookup(name) or promoters.save(name, {})
+        writer.add(project_row(project, promoter))
+        print(f"[+] Listed: {project['project_name']}")
+    writer.close()
+    totals = writer.totals
+    print(
+        f"[💾] {totals['inserted']} inserted, {totals['updated']} updated, "
+        f"{totals['unchanged']} unchanged"
+    )
 
 
 if __name__ == "__main__":
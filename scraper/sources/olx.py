@@ -0,0 +1,65 @@
+import csv
+import os
+from urllib.parse import quote, urljoin
+
+from bs4 import BeautifulSoup
+
+from scraper.engine import Request, Source
+
+OLX_SEARCH_URL = os.getenv("OLX_SEARCH_URL", "https://www.olx.in/items/q-{query}")
+OLX_FIELDS = ["Title", "Price", "Location", "Product URL"]
+
+
+def parse_olx_html(html, base_url):
+    """Product cards on an OLX search results page."""
+    soup = BeautifulSoup(html, "html.parser")
+    items = []
+    for product in soup.select("[data-aut-id='itemBox3']"):
+        title = product.select_one("[data-aut-id='itemTitle']")
+        price = product.select_one("[data-aut-id='itemPrice']")
+        location = product.select_one("[data-aut-id='item-location']")
+        link = product.find("a", href=True)
+        if not title:
+            continue
+        items.append(
+            {
+                "Title": title.get_text(strip=True),
+                "Price": price.get_text(strip=True) if price else None,
+                "Location": location.get_text(strip=True) if location else None,
+                "Product URL": urljoin(base_url, link["href"]) if link else None,
+            }
+        )
+    return items
+
+
+class OlxSource(Source):
+    """OLX search results, appended to a CSV as they are parsed."""
+
+    name = "olx"
+
+    def __init__(self, queries, output_file="olx_products.csv", search_url=OLX_SEARCH_URL):
+        self.queries = queries
+        self.output_file = output_file
+        self.search_url = search_url
+
+    def start_requests(self):
+        for query in self.queries:
+            yield Request(
+                self.search_url.format(query=quote(query)), self, meta={"query": query}
+            )
+
+    def parse(self, request, response):
+        if response.status_code != 200:
+            print(f"[❌] {request.url} returned HTTP {response.status_code}")
+            return []
+        items = parse_olx_html(response.text, str(response.url))
+        print(f"[🛒] {request.meta['query']}: {len(items)} products")
+        return items
+
+    def persist(self, items):
+        write_header = not os.path.exists(self.output_file)
+        with open(self.output_file, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=OLX_FIELDS)
+            if write_header:
+                writer.writeheader()
+            writer.writerows(items)
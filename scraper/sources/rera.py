@@ -0,0 +1,147 @@
+import threading
+
+from db.promoters import PromoterResolver, name_key
+from scraper.crawl_filter import CrawlFilter
+from scraper.engine import Request, Source
+from scraper.http_fetch import (
+    RERA_LISTING_URL,
+    RERA_PAGE_PARAM,
+    RERA_PROMOTER_URL,
+    is_json,
+    promoter_url_for,
+)
+from scraper.parsers import (
+    parse_listing_html,
+    parse_listing_json,
+    parse_promoter_html,
+    parse_promoter_json,
+    project_row,
+)
+
+
+class ReraSource(Source):
+    """
+    Odisha RERA projects over plain HTTP. Cards without a fetchable detail
+    URL are reported and left to the Selenium scraper.
+
+    Each promoter's details are fetched once: projects of a promoter that is
+    fresh in the `PromoterResolver` are written straight away, and projects
+    whose promoter is already being fetched wait for that response. If that
+    response has no promoter details, they are written linked to the promoter
+    by name alone; if it never comes, `close()` reports them.
+    """
+
+    name = "rera"
+
+    def __init__(
+        self,
+        pages=2,
+        listing_url=RERA_LISTING_URL,
+        promoter_url=RERA_PROMOTER_URL,
+        page_param=RERA_PAGE_PARAM,
+        incremental=False,
+    ):
+        self.pages = pages
+        self.incremental = incremental
+        self.listing_url = listing_url
+        self.promoter_url = promoter_url
+        self.page_param = page_param
+        self.crawl_filter = None
+        self.promoters = None
+        self._last_listing = None
+        # promoter name key -> projects waiting on its promoter request
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def listing_request(self, page):
+        return Request(
+            self.listing_url,
+            self,
+            callback=self.parse_listing,
+            params={self.page_param: page},
+            meta={"page": page},
+        )
+
+    def start_requests(self):
+        self.crawl_filter = CrawlFilter(incremental=self.incremental)
+        self.promoters = PromoterResolver()
+        yield self.listing_request(1)
+
+    def parse_listing(self, request, response):
+        page = request.meta["page"]
+        if response.status_code != 200:
+            print(f"[❌] Listing page {page} returned HTTP {response.status_code}")
+            return
+
+        url = str(response.url)
+        if is_json(response):
+            projects = parse_listing_json(response.json(), base_url=url)
+        else:
+            projects = parse_listing_html(response.text, base_url=url)
+
+        rera_nos = [p["rera_no"] for p in projects]
+        if not projects or rera_nos == self._last_listing:
+            print(f"[ℹ️] No new listing data on page {page}, stopping.")
+            return
+        self._last_listing = rera_nos
+        print(f"[📄] Page {page}: {len(projects)} projects")
+
+        for project in projects:
+            if not self.crawl_filter.wants(project):
+                continue
+            project["page"] = page
+            record = self.promoters.fresh(project["promoter_name"])
+            if record:
+                yield project_row(project, record)
+                continue
+
+            key = name_key(project["promoter_name"])
+            with self._lock:
+                if key in self._waiting:
+                    self._waiting[key].append(project)
+                    continue
+            detail_url = promoter_url_for(project, self.promoter_url)
+            if not detail_url:
+                print(f"[🌐] Needs a browser, skipped: {project['project_name']}")
+                continue
+
+            with self._lock:
+                self._waiting[key] = [project]
+            yield Request(
+                detail_url,
+                self,
+                callback=self.parse_promoter,
+                meta={"project": project, "promoter_key": key},
+            )
+        self.crawl_filter.end_page()
+
+        if page < self.pages:
+            yield self.listing_request(page + 1)
+
+    def parse_promoter(self, request, response):
+        project = request.meta["project"]
+        promoter_details = {}
+        if response.status_code != 200:
+            print(f"[❌] Promoter page for {project['rera_no']}: HTTP {response.status_code}")
+        elif is_json(response):
+            promoter_details = parse_promoter_json(response.json())
+        else:
+            promoter_details = parse_promoter_html(response.text)
+        if response.status_code == 200 and not any(promoter_details.values()):
+            print(f"[❌] Promoter section not found for {project['rera_no']}")
+
+        # Without details the promoter is matched by name (or created bare,
+        # to be fetched again next run), so its waiting projects still land.
+        record = self.promoters.save(project["promoter_name"], promoter_details)
+        with self._lock:
+            waiting = self._waiting.pop(request.meta["promoter_key"], [project])
+        for waiting_project in waiting:
+            yield project_row(waiting_project, record)
+
+    def persist(self, items):
+        self.crawl_filter.writer.write(items)
+
+    def close(self):
+        stranded = sum(len(projects) for projects in self._waiting.values())
+        if stranded:
+            print(f"[⚠️] {stranded} projects not written: their promoter fetch failed")
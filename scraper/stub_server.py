@@ -0,0 +1,243 @@
+"""
+Local stand-in for the scraped sites, serving captured pages from disk.
+
+    python -m scraper.stub_server --port 8001
+    python -m scraper.stub_server --projects 10000 --nav-schemes 20000
+
+then point the scrapers at it, e.g. RERA_LISTING_URL=http://127.0.0.1:8001/projects/project-list
+
+With `--projects` the RERA listing (HTML and JSON) is paginated over that
+many synthetic projects, `--page-size` per page, each with its own
+promoter record; past the last page the JSON listing is empty. With
+`--nav-schemes` NAVAll.txt lists that many synthetic schemes. Any
+/items/q-... search returns the captured OLX page.
+"""
+
+import argparse
+import json
+import os
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MISC_DIR = os.path.join(os.path.dirname(FIXTURES_DIR), "..", "misc")
+
+# Request path -> file served for it (query strings are ignored)
+ROUTES = {
+    "/projects/project-list": os.path.join(FIXTURES_DIR, "rera_project_list.html"),
+    "/projects/project-details": os.path.join(
+        FIXTURES_DIR, "rera_project_details.html"
+    ),
+    "/api/projects": os.path.join(FIXTURES_DIR, "rera_project_list.json"),
+    "/api/promoter": os.path.join(FIXTURES_DIR, "rera_promoter.json"),
+    "/items/q-car-cover": os.path.join(MISC_DIR, "olx_page_content.txt"),
+    "/spages/NAVAll.txt": os.path.join(FIXTURES_DIR, "amfi_nav_all.txt"),
+}
+
+CONTENT_TYPES = {".json": "application/json", ".txt": "text/plain"}
+
+SYNTHETIC_PAGE_SIZE = 10
+PROJECTS_PER_PROMOTER = 5
+SYNTHETIC_SCHEME_CODE = 900000
+DISTRICTS = ["Angul", "Khordha", "Cuttack", "Puri", "Ganjam", "Sambalpur"]
+
+CARD_HTML = """
+  <div class="card project-card mb-3">
+    <div class="card-body">
+      <h5 class="card-title">{project_name}</h5>
+      <small>by {promoter_name}</small>
+      <div class="row">
+        <div class="col"><label>Address</label><strong>{address}</strong></div>
+        <div class="col">RERA Regd. No. <span class="fw-bold">{rera_no}</span></div>
+      </div>
+      <a class="btn btn-primary" href="/projects/project-details?rera_no={rera_no}">View Details</a>
+    </div>
+  </div>"""
+LISTING_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Project List | Odisha RERA</title></head>
+<body>
+<div class="container project-list">{cards}
+</div>
+<nav><button class="page-link{disabled}" aria-label="Next">Next</button></nav>
+</body>
+</html>
+"""
+
+
+def synthetic_project(n):
+    return {
+        "project_name": f"Synthetic Enclave {n}",
+        "promoter_name": synthetic_promoter_name(n // PROJECTS_PER_PROMOTER),
+        "address": DISTRICTS[n % len(DISTRICTS)],
+        "rera_no": f"RP/SYN/{n:06d}",
+    }
+
+
+def synthetic_promoter_name(i):
+    return f"SYNTHETIC PROMOTER {i} PVT. LTD"
+
+
+def synthetic_promoter(rera_no):
+    """Promoter JSON for a synthetic project, or None for an unknown RERA number."""
+    number = rera_no.rsplit("/", 1)[-1]
+    if not rera_no.startswith("RP/SYN/") or not number.isdigit():
+        return None
+    i = int(number) // PROJECTS_PER_PROMOTER
+    return {
+        "companyName": synthetic_promoter_name(i),
+        "registrationNo": f"U45201OR2025SYN{i:06d}",
+        "correspondenceOfficeAddress": f"Plot No. {i}, Saheed Nagar, Bhubaneswar, 751007",
+        "registeredOfficeAddress": f"Plot No. {i}, Saheed Nagar, Bhubaneswar, 751007",
+        "entity": "Company",
+        "emailId": f"promoter{i}@synthetic.example",
+        "mobile": f"94{i:08d}",
+        "telephoneNo": "0674-2540000",
+        "gstNo": f"21SYN{i:06d}Z5",
+    }
+
+
+def synthetic_nav_lines(schemes, day=None):
+    """NAVAll.txt lines for `schemes` synthetic schemes on `day` (today)."""
+    day = day or date.today()
+    yield "Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date"
+    yield "Open Ended Schemes(Equity Scheme - Large Cap Fund)"
+    for n in range(schemes):
+        if n % 500 == 0:
+            yield f"Synthetic Mutual Fund {n // 500}"
+        code = SYNTHETIC_SCHEME_CODE + n
+        yield (
+            f"{code};INFSYN{n:06d};-;Synthetic Fund {n} - Direct - Growth;"
+            f"{10 + (n * 7919) % 49000 / 100:.4f};{day:%d-%b-%Y}"
+        )
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    routes = ROUTES
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.routes.get(urlsplit(self.path).path)
+        if not path or not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        content_type = CONTENT_TYPES.get(os.path.splitext(path)[1], "text/html")
+        self.send_body(body, content_type)
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ScaledFixtureHandler(FixtureHandler):
+    """The fixture site with synthetic RERA projects, promoters and NAVs."""
+
+    projects = 0
+    page_size = SYNTHETIC_PAGE_SIZE
+    nav_schemes = 0
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if parts.path == "/projects/project-list":
+            self.send_body(self.listing_html(params).encode(), "text/html")
+        elif parts.path == "/api/projects":
+            body = json.dumps({"data": self.listing_json(params)})
+            self.send_body(body.encode(), "application/json")
+        elif parts.path == "/api/promoter":
+            promoter = synthetic_promoter(params.get("rera_no", ""))
+            if promoter is None:
+                return super().do_GET()
+            self.send_body(json.dumps({"promoter": promoter}).encode(), "application/json")
+        elif parts.path == "/projects/project-details":
+            self.send_body(self.details_html(params).encode(), "text/html")
+        elif parts.path.startswith("/items/q-"):
+            self.path = "/items/q-car-cover"
+            super().do_GET()
+        elif parts.path == "/spages/NAVAll.txt" and self.nav_schemes:
+            body = "\n".join(synthetic_nav_lines(self.nav_schemes)) + "\n"
+            self.send_body(body.encode(), "text/plain")
+        else:
+            super().do_GET()
+
+    def page_projects(self, params):
+        page = int(params.get("page") or 1)
+        start = (page - 1) * self.page_size
+        end = min(self.projects, start + self.page_size)
+        return page, [synthetic_project(n) for n in range(max(0, start), end)]
+
+    def listing_html(self, params):
+        page, projects = self.page_projects(params)
+        cards = "".join(CARD_HTML.format(**project) for project in projects)
+        last = page * self.page_size >= self.projects
+        return LISTING_HTML.format(cards=cards, disabled=" disabled" if last else "")
+
+    def listing_json(self, params):
+        return [
+            {
+                "projectName": project["project_name"],
+                "promoterName": project["promoter_name"],
+                "address": project["address"],
+                "reraNo": project["rera_no"],
+                "detailUrl": f"/api/promoter?rera_no={project['rera_no']}",
+            }
+            for project in self.page_projects(params)[1]
+        ]
+
+    def details_html(self, params):
+        with open(ROUTES["/projects/project-details"], encoding="utf-8") as f:
+            html = f.read()
+        promoter = synthetic_promoter(params.get("rera_no", ""))
+        if promoter:
+            html = html.replace(
+                "M/S. NEELACHAL INFRA DEVELOPERS PVT. LTD", promoter["companyName"]
+            ).replace("U45201OR2011PTC013456", promoter["registrationNo"])
+        return html
+
+
+def serve_fixtures(port=0, routes=None, projects=0, page_size=SYNTHETIC_PAGE_SIZE, nav_schemes=0):
+    """
+    Start the stub server on a background thread; returns (server, base_url).
+    `projects` and `nav_schemes` switch on the synthetic site (see above).
+    """
+    handler = FixtureHandler
+    if projects or nav_schemes:
+        handler = type(
+            "ScaledFixtureHandler",
+            (ScaledFixtureHandler,),
+            {"projects": projects, "page_size": page_size, "nav_schemes": nav_schemes},
+        )
+    if routes is not None:
+        handler = type("FixtureHandler", (handler,), {"routes": routes})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--projects", type=int, default=0, help="synthetic RERA projects")
+    parser.add_argument("--page-size", type=int, default=SYNTHETIC_PAGE_SIZE)
+    parser.add_argument("--nav-schemes", type=int, default=0, help="synthetic NAV schemes")
+    args = parser.parse_args()
+
+    server, base_url = serve_fixtures(
+        args.port, projects=args.projects, page_size=args.page_size, nav_schemes=args.nav_schemes
+    )
+    print(f"[🧪] Serving fixtures on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,164 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraper.browser import page_transfer
+from telemetry.metrics import span
+
+POLL_SECONDS = 0.1
+
+# Installs (once per document) a MutationObserver that confirms any
+# SweetAlert2 modal the moment it is inserted, then returns the confirm button
+# if a modal is already showing, else null. One round trip, no polling: a
+# missing modal is the normal case.
+SWAL_PROBE_JS = """
+if (!window.__swalWatcher && document.body) {
+    window.__swalWatcher = new MutationObserver(() => {
+        const button = document.querySelector('.swal2-popup button.swal2-confirm');
+        if (button) { button.click(); }
+    });
+    window.__swalWatcher.observe(document.body, {childList: true, subtree: true});
+}
+const popup = document.querySelector('.swal2-popup');
+if (!popup || popup.offsetParent === null) { return null; }
+return popup.querySelector('button.swal2-confirm');
+"""
+
+_local = threading.local()
+_totals_lock = threading.Lock()
+_totals = {"pages": 0, "wait": 0.0, "total": 0.0}
+
+
+class PageTimer:
+    """Splits the wall-clock time spent on one page into waiting and working."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.monotonic()
+        self.waited = 0.0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+@contextmanager
+def page_timer(label, driver=None):
+    """
+    Time the current thread's work on a page; waits inside are attributed to
+    it. With `driver`, the bytes the page transferred are reported too.
+    """
+    timer = PageTimer(label)
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = None
+        elapsed = timer.elapsed
+        with _totals_lock:
+            _totals["pages"] += 1
+            _totals["wait"] += timer.waited
+            _totals["total"] += elapsed
+        transfer = page_transfer(driver) if driver else None
+        transferred = (
+            f", {transfer[0] / 1024:.0f} KiB in {transfer[1]} requests" if transfer else ""
+        )
+        print(
+            f"[⏱️] {label}: {elapsed:.2f}s "
+            f"(waiting {timer.waited:.2f}s, working {elapsed - timer.waited:.2f}s{transferred})"
+        )
+
+
+@contextmanager
+def waiting():
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        timer = getattr(_local, "timer", None)
+        if timer:
+            timer.waited += time.monotonic() - started
+
+
+def wait_until(driver, condition, timeout=10):
+    """WebDriverWait on an exact DOM condition, counted as waiting time."""
+    with waiting():
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS).until(
+            condition
+        )
+
+
+def dismiss_swal_if_present(driver, timeout=5):
+    """Click away a SweetAlert2 modal if one is showing; returns immediately if not."""
+    with span("modal"):
+        return _dismiss_swal(driver, timeout)
+
+
+def _dismiss_swal(driver, timeout):
+    try:
+        confirm = driver.execute_script(SWAL_PROBE_JS)
+    except Exception:
+        return False
+    if not confirm:
+        return False
+
+    print("[⚠️] SweetAlert2 modal detected. Clicking OK...")
+    try:
+        driver.execute_script("arguments[0].click();", confirm)
+        wait_until(
+            driver,
+            EC.invisibility_of_element_located((By.CLASS_NAME, "swal2-container")),
+            timeout,
+        )
+        print("[✔️] Modal dismissed successfully.")
+    except Exception as e:
+        print(f"[⚠️] Modal did not close: {e}")
+    return True
+
+
+def text_of(driver, css):
+    """textContent of the first element matching `css`, or None."""
+    return driver.execute_script(
+        "const el = document.querySelector(arguments[0]);"
+        " return el ? el.textContent.trim() : null;",
+        css,
+    )
+
+
+def outer_html(driver, css, all=False):
+    """
+    outerHTML of the first element matching `css` (or of every match,
+    concatenated), so only that subtree crosses the wire and gets parsed.
+    Empty string if nothing matches.
+    """
+    return driver.execute_script(
+        "const els = arguments[1] ? Array.from(document.querySelectorAll(arguments[0]))"
+        " : [document.querySelector(arguments[0])].filter(Boolean);"
+        " return els.map(el => el.outerHTML).join('');",
+        css,
+        all,
+    )
+
+
+def wait_for_text_change(driver, css, old_text, timeout=10):
+    """After a client-side re-render, wait until `css` shows something other than `old_text`."""
+    return wait_until(
+        driver,
+        lambda d: (text_of(d, css) or old_text) != old_text,
+        timeout,
+    )
+
+
+def wait_summary(reset=False):
+    """Wait/work totals across the pages timed since the last reset."""
+    with _totals_lock:
+        totals = dict(_totals)
+        if reset:
+            _totals.update(pages=0, wait=0.0, total=0.0)
+    share = totals["wait"] / totals["total"] if totals["total"] else 0.0
+    return {**totals, "wait_share": share}
+
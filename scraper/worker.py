@@ -0,0 +1,102 @@
+"""
+Scrape job worker: claims queued `crawl_jobs` rows and runs them, one at a
+time per process, outside the API.
+
+    python -m scraper.worker --processes 2
+
+Each process serves its scraper stage histograms on /metrics at
+`WORKER_METRICS_PORT` (9101) plus its index (0, 1, ...); 0 turns this off. Jobs
+queued with `profile` run under cProfile (see telemetry.profiling).
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from db.jobs import claim_job, get_job, update_job, worker_name
+from db.migrate import migrate_on_startup
+from telemetry.metrics import serve_metrics
+from telemetry.profiling import job_profile_path, profile_run
+
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9101"))  # 0 disables
+
+
+def run_rera(job):
+    # Imported here so the API can enqueue jobs without loading Selenium.
+    from scraper.detail_scraper import scrape_projects
+
+    scrape_projects(job_id=job.id)
+
+
+JOB_RUNNERS = {"rera": run_rera}
+
+
+def run_job(job_id):
+    job = get_job(job_id)
+    runner = JOB_RUNNERS.get(job.source)
+    if runner is None:
+        update_job(job_id, status="failed", error=f"No runner for source {job.source!r}")
+        print(f"[❌] Job {job_id}: no runner for source {job.source!r}")
+        return
+    try:
+        if job.profile:
+            with profile_run(job_profile_path(job_id)):
+                runner(job)
+        else:
+            runner(job)
+    except Exception as e:
+        # The runner records the failure on the job; keep the worker alive.
+        print(f"[❌] Job {job_id} failed: {e}")
+
+
+def run_worker(poll_seconds=JOB_POLL_SECONDS, once=False, metrics_port=None):
+    """Claim and run jobs until interrupted (or one job, with `once`)."""
+    if metrics_port:
+        try:
+            serve_metrics(metrics_port)
+        except OSError as e:
+            # e.g. a second worker started on the same host; jobs still run.
+            print(f"[⚠️] No metrics on port {metrics_port}: {e}")
+    name = worker_name()
+    print(f"[👷] Worker {name} waiting for jobs")
+    while True:
+        job_id = claim_job(name)
+        if job_id is None:
+            if once:
+                return
+            time.sleep(poll_seconds)
+            continue
+        print(f"[👷] Worker {name} claimed job {job_id}")
+        run_job(job_id)
+        if once:
+            return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--once", action="store_true", help="run at most one job")
+    args = parser.parse_args()
+
+    migrate_on_startup()
+    if args.processes == 1:
+        run_worker(once=args.once, metrics_port=WORKER_METRICS_PORT)
+    else:
+        # Spawned, not forked: each process builds its own DB pool and drivers.
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=run_worker,
+                kwargs={
+                    "once": args.once,
+                    "metrics_port": WORKER_METRICS_PORT + i if WORKER_METRICS_PORT else None,
+                },
+            )
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
@@ -0,0 +1,155 @@
+"""
+In-process timing histograms in the Prometheus text format.
+
+    with span("navigation"):
+        driver.get(url)
+
+Spans feed the `scraper_stage_seconds` histogram, labelled by stage. The
+API serves every histogram of its process on /metrics; job workers serve
+their own on `WORKER_METRICS_PORT`, 9101 by default (see scraper.worker),
+since scrapes run there. No client library is needed: histograms are kept
+here and written out as text any Prometheus server can scrape.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per combination of label values."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self):
+        """{label values: (count, sum)}, e.g. to diff around a run."""
+        with self._lock:
+            return {labels: (series[2], series[1]) for labels, series in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(b), s, c) for labels, (b, s, c) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            for bound, bucket in zip(self.buckets, counts):
+                le = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {bucket}")
+            le = ",".join(pairs + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def histogram(name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """The histogram registered under `name`, created on first use."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, help, labelnames, buckets)
+        return _registry[name]
+
+
+STAGE_SECONDS = histogram(
+    "scraper_stage_seconds", "Time spent in each scraper stage.", ("stage",)
+)
+
+
+@contextmanager
+def span(stage):
+    """Time the block into `scraper_stage_seconds{stage=...}`, even if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+
+
+def stage_totals():
+    return {labels[0]: totals for labels, totals in STAGE_SECONDS.totals().items()}
+
+
+def stage_summary(before):
+    """Per-stage (count, seconds) since the `stage_totals()` snapshot `before`, slowest first."""
+    summary = {}
+    for stage, (count, seconds) in stage_totals().items():
+        old_count, old_seconds = before.get(stage, (0, 0.0))
+        if count > old_count:
+            summary[stage] = (count - old_count, seconds - old_seconds)
+    return dict(sorted(summary.items(), key=lambda item: -item[1][1]))
+
+
+def gauge_lines(prefix, values, help=""):
+    """Prometheus gauges for the numeric entries of `values`, e.g. pool_status()."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {help or key}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+def render(extra_lines=()):
+    """Every registered histogram plus `extra_lines`, as exposition text."""
+    with _registry_lock:
+        histograms = list(_registry.values())
+    lines = []
+    for h in histograms:
+        lines.extend(h.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port, host="0.0.0.0"):
+    """Serve this process's metrics on http://host:port/metrics from a background thread."""
+    # Only workers serve metrics this way; the API keeps http.server out of its imports.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[📈] Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
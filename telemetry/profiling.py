@@ -0,0 +1,86 @@
+"""
+On-demand cProfile dumps of a whole scrape, worker threads included.
+
+A job queued with `profile=true` runs inside `profile_run(path)`; threads
+that wrap their work in `profile_thread()` get a profiler of their own for
+the duration. At the end the profiles are merged into `<path>.prof` (for
+pstats, snakeviz, ...) and the top functions by cumulative time are
+written to `<path>.txt`.
+"""
+
+import cProfile
+import io
+import os
+import threading
+from contextlib import contextmanager
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_TOP = 60
+
+_active = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def profile_run(path):
+    """Profile the calling thread, and every profile_thread() block, into `path`.*"""
+    global _active
+    profiles = []
+    main = cProfile.Profile()
+    profiles.append(main)
+    with _lock:
+        _active = profiles
+    main.enable()
+    try:
+        yield
+    finally:
+        main.disable()
+        with _lock:
+            _active = None
+        _dump(profiles, path)
+
+
+@contextmanager
+def profile_thread():
+    """Profile this thread while a profile_run() is active; a no-op otherwise."""
+    with _lock:
+        profiles = _active
+    if profiles is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        with _lock:
+            profiles.append(profile)
+
+
+def _dump(profiles, path):
+    import pstats  # only needed once a profile is written
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    stats = None
+    for profile in profiles:
+        profile.create_stats()
+        if not profile.stats:
+            continue
+        if stats is None:
+            stats = pstats.Stats(profile)
+        else:
+            stats.add(profile)
+    if stats is None:
+        return
+    stats.dump_stats(f"{path}.prof")
+    report = io.StringIO()
+    stats.stream = report
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+    with open(f"{path}.txt", "w") as f:
+        f.write(report.getvalue())
+    print(f"[🔬] Profile of {len(profiles)} threads saved to {path}.prof")
+
+
+def job_profile_path(job_id, directory=PROFILE_DIR):
+    return os.path.join(directory, f"job-{job_id}")
@@ -0,0 +1,116 @@
+"""HttpFetcher and the RERA parsers against the stub server's fixtures."""
+
+import json
+import os
+
+import pytest
+
+from scraper.detail_scraper import iter_listing_pages
+from scraper.http_fetch import FetchUnavailable, HttpFetcher
+from scraper.parsers import parse_listing_json, parse_promoter_html
+from scraper.stub_server import FIXTURES_DIR, serve_fixtures
+
+NEELACHAL = {
+    "company_name": "M/S. NEELACHAL INFRA DEVELOPERS PVT. LTD",
+    "registration_no": "U45201OR2011PTC013456",
+    "email_id": "info@neelachalinfra.example",
+    "gst_no": "21AABCN1234F1Z5",
+}
+
+
+def fixture_text(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def site():
+    server, base_url = serve_fixtures()
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def synthetic_site():
+    server, base_url = serve_fixtures(projects=25, page_size=10)
+    yield base_url
+    server.shutdown()
+
+
+def test_parse_listing_json():
+    projects = parse_listing_json(
+        json.loads(fixture_text("rera_project_list.json")), base_url="http://rera.example/"
+    )
+    assert [p["rera_no"] for p in projects] == ["RP/01/2025/01362", "RP/19/2025/01358"]
+    assert projects[0]["project_name"] == "Basanti Enclave"
+    assert projects[0]["promoter_name"] == NEELACHAL["company_name"]
+    assert projects[0]["detail_url"] == "http://rera.example/api/promoter?rera_no=RP/01/2025/01362"
+
+
+def test_parse_promoter_html():
+    details = parse_promoter_html(fixture_text("rera_project_details.html"))
+    for field, value in NEELACHAL.items():
+        assert details[field] == value
+
+
+def test_parse_promoter_html_without_section():
+    assert not any(parse_promoter_html("<html><body>Loading...</body></html>").values())
+
+
+def test_fetch_listing_html(site):
+    fetcher = HttpFetcher(listing_url=f"{site}/projects/project-list")
+    projects = fetcher.fetch_listing(1)
+    assert len(projects) == 3
+    assert projects[0]["rera_no"] == "RP/01/2025/01362"
+    assert projects[0]["detail_url"].startswith(f"{site}/projects/project-details?")
+
+
+def test_fetch_listing_ignoring_page_param(site):
+    fetcher = HttpFetcher(listing_url=f"{site}/projects/project-list")
+    fetcher.fetch_listing(1)
+    with pytest.raises(FetchUnavailable, match="ignored"):
+        fetcher.fetch_listing(2)
+
+
+def test_fetch_listing_json(site):
+    projects = HttpFetcher(listing_url=f"{site}/api/projects").fetch_listing(1)
+    assert [p["project_name"] for p in projects] == ["Basanti Enclave", "Sai Residency"]
+
+
+def test_fetch_listing_unavailable(site):
+    with pytest.raises(FetchUnavailable, match="HTTP 404"):
+        HttpFetcher(listing_url=f"{site}/missing").fetch_listing(1)
+
+
+def test_fetch_promoter_json(site):
+    fetcher = HttpFetcher(listing_url=f"{site}/api/projects")
+    details = fetcher.fetch_promoter_details(fetcher.fetch_listing(1)[0])
+    for field, value in NEELACHAL.items():
+        assert details[field] == value
+
+
+def test_fetch_promoter_html(site):
+    fetcher = HttpFetcher(listing_url=f"{site}/projects/project-list")
+    details = fetcher.fetch_promoter_details(fetcher.fetch_listing(1)[0])
+    for field, value in NEELACHAL.items():
+        assert details[field] == value
+
+
+def test_fetch_promoter_without_url(site):
+    with pytest.raises(FetchUnavailable, match="No detail URL"):
+        HttpFetcher().fetch_promoter_details({"rera_no": "RP/X", "detail_url": None})
+
+
+@pytest.mark.parametrize("path", ["/projects/project-list", "/api/projects"])
+def test_listing_past_the_end(synthetic_site, path):
+    fetcher = HttpFetcher(listing_url=f"{synthetic_site}{path}")
+    assert [len(fetcher.fetch_listing(page)) for page in (1, 2, 3, 4)] == [10, 10, 5, 0]
+
+
+def test_iter_listing_pages_stops_at_the_end(synthetic_site):
+    fetcher = HttpFetcher(listing_url=f"{synthetic_site}/projects/project-list")
+    pages = [
+        (page, len(projects))
+        for page, projects in iter_listing_pages(None, fetcher, pages=6)
+    ]
+    assert pages == [(1, 10), (2, 10), (3, 5)]
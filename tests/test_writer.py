@@ -0,0 +1,79 @@
+"""BatchWriter against an in-memory SQLite database."""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.generations import read_generation
+from db.models import Base, Project
+from db.writer import project_writer
+
+
+@pytest.fixture
+def session_factory():
+    # One shared connection, so every session sees the same in-memory database
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def rows(**changes):
+    batch = [
+        {"rera_no": f"RP/{n}", "project_name": f"Enclave {n}", "promoter_address": "Angul"}
+        for n in range(3)
+    ]
+    batch[1].update(changes)
+    return batch
+
+
+def test_write_counts_inserts_updates_and_unchanged(session_factory):
+    writer = project_writer(session_factory=session_factory, batch_size=10)
+    assert writer.write(rows()) == {"inserted": 3, "updated": 0, "unchanged": 0}
+    assert writer.write(rows(project_name="Renamed")) == {
+        "inserted": 0,
+        "updated": 1,
+        "unchanged": 2,
+    }
+    assert writer.totals == {"inserted": 3, "updated": 1, "unchanged": 2}
+
+    session = session_factory()
+    try:
+        stored = dict(session.execute(select(Project.rera_no, Project.project_name)).all())
+        changed = dict(session.execute(select(Project.rera_no, Project.last_changed)).all())
+    finally:
+        session.close()
+    assert stored == {"RP/0": "Enclave 0", "RP/1": "Renamed", "RP/2": "Enclave 2"}
+    assert all(changed.values())
+    # Both writes changed rows, so both bumped the projects generation.
+    assert read_generation(session_factory=session_factory)[0] == 2
+
+
+def test_failed_flush_keeps_rows(session_factory):
+    failures = []
+
+    def flaky():
+        if not failures:
+            failures.append(1)
+            raise ConnectionError("database went away")
+        return session_factory()
+
+    writer = project_writer(session_factory=flaky, batch_size=10)
+    for row in rows():
+        writer.add(row)
+    with pytest.raises(ConnectionError):
+        writer.flush()
+    assert len(writer._rows) == 3
+
+    # A newer row for a buffered key wins over the one put back.
+    writer.add({**rows()[1], "project_name": "Newer"})
+    assert writer.flush() == {"inserted": 3, "updated": 0, "unchanged": 0}
+    assert writer._rows == {}
+
+    session = session_factory()
+    try:
+        names = session.execute(select(Project.project_name).order_by(Project.rera_no)).scalars()
+        assert list(names) == ["Enclave 0", "Newer", "Enclave 2"]
+    finally:
+        session.close()